@@ -0,0 +1,346 @@
+"""Transport-independent parts of the manager HTTP API.
+
+src.app (Flask on the blocking drivers) and src.asgi_app (Starlette on the
+asyncio drivers) only differ in how they read requests, await I/O and write
+responses. Validation, scheduling decisions and status payloads live here so
+both stacks answer the same way.
+"""
+
+from typing import Callable, cast
+
+import orjson
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from src.core import config
+from src.models import CrackRequest, TaskCursor
+from src.services import LookupTable, StatusCache
+from src.utils import (
+    calculate_total_combinations,
+    cursor_progress,
+    validate_hash,
+    validate_max_length,
+    validate_priority,
+)
+
+NDJSON = "application/x-ndjson"
+SSE_KEEPALIVE = b": keepalive\n\n"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+class ApiError(Exception):
+    """A client-facing error: message, HTTP status and extra payload fields."""
+
+    def __init__(self, message: str, status_code: int = 400, **extra: object) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.payload = {"error": message, **extra}
+
+
+def _require_json(data: object) -> dict:
+    if not data or not isinstance(data, dict):
+        raise ApiError("Invalid JSON")
+    return data
+
+
+def _parse_options(data: dict) -> tuple[object, bool, object]:
+    return (
+        data.get("maxLength"),
+        bool(data.get("findAll", False)),
+        data.get("priority", config.MIN_PRIORITY),
+    )
+
+
+def _validate_options(max_length: object, priority: object) -> None:
+    if not validate_max_length(max_length):  # type: ignore[arg-type]
+        raise ApiError(
+            f"maxLength must be integer between {config.MIN_ALLOWED_LENGTH} and {config.MAX_ALLOWED_LENGTH}"
+        )
+    if not validate_priority(priority):  # type: ignore[arg-type]
+        raise ApiError(
+            f"priority must be integer between {config.MIN_PRIORITY} and {config.MAX_PRIORITY}"
+        )
+
+
+def parse_crack(data: object) -> tuple[str, int, bool, int]:
+    """Validate a /api/hash/crack body into (hash, maxLength, findAll, priority)."""
+    data = _require_json(data)
+    target_hash = data.get("hash")
+    max_length, find_all, priority = _parse_options(data)
+
+    if not target_hash or not max_length:
+        raise ApiError("Missing hash or maxLength")
+    if not isinstance(target_hash, str) or not validate_hash(target_hash):
+        raise ApiError("Invalid MD5 hash")
+    _validate_options(max_length, priority)
+    return target_hash.lower(), max_length, find_all, priority  # type: ignore[return-value]
+
+
+def parse_crack_batch(data: object) -> tuple[list[str], int, bool, int]:
+    """Validate a /api/hash/crack/batch body; hashes come back lowercased and deduplicated."""
+    data = _require_json(data)
+    hashes = data.get("hashes")
+    max_length, find_all, priority = _parse_options(data)
+
+    if not hashes or not isinstance(hashes, list) or not max_length:
+        raise ApiError("Missing hashes or maxLength")
+    if len(hashes) > config.MAX_BATCH_SIZE:
+        raise ApiError(f"At most {config.MAX_BATCH_SIZE} hashes per batch")
+
+    invalid = [h for h in hashes if not isinstance(h, str) or not validate_hash(h)]
+    if invalid:
+        raise ApiError("Invalid MD5 hash", hashes=invalid)
+    _validate_options(max_length, priority)
+    return list(dict.fromkeys(h.lower() for h in hashes)), max_length, find_all, priority  # type: ignore[return-value]
+
+
+def parse_status_batch(data: object) -> list[list[str]]:
+    """Validate a /api/hash/status/batch body into deduplicated chunks of requestIds."""
+    data = _require_json(data)
+    request_ids = data.get("requestIds")
+    if (
+        not request_ids
+        or not isinstance(request_ids, list)
+        or not all(isinstance(request_id, str) for request_id in request_ids)
+    ):
+        raise ApiError("Missing requestIds")
+    if len(request_ids) > config.MAX_STATUS_BATCH_SIZE:
+        raise ApiError(f"At most {config.MAX_STATUS_BATCH_SIZE} requestIds per batch")
+
+    request_ids = list(dict.fromkeys(request_ids))
+    return [
+        request_ids[offset : offset + config.STATUS_BATCH_CHUNK_SIZE]
+        for offset in range(0, len(request_ids), config.STATUS_BATCH_CHUNK_SIZE)
+    ]
+
+
+def wants_ndjson(accept: str | None) -> bool:
+    """Whether an Accept header prefers NDJSON over a single JSON document."""
+    offered = ["application/json", NDJSON]
+    best: str | None = parse_accept_header(accept, MIMEAccept).best_match(offered)
+    return best == NDJSON
+
+
+def parse_long_poll(timeout: str | None, progress: str | None) -> tuple[float, int | None]:
+    """Validate the timeout and last-seen progress of a long poll."""
+    try:
+        wait = float(timeout) if timeout is not None else config.STATUS_LONG_POLL_TIMEOUT
+        known_progress = int(progress) if progress is not None else None
+    except ValueError as e:
+        raise ApiError("timeout and progress must be numbers") from e
+    return min(wait, config.STATUS_LONG_POLL_TIMEOUT), known_progress
+
+
+def add_table_matches(
+    lookup_table: LookupTable,
+    target_hash: str,
+    max_length: int,
+    results: list[str],
+    searched_length: int,
+) -> tuple[list[str], int]:
+    """Extend what the solved index knows about a hash with the lookup table."""
+    if lookup_table.max_length and searched_length < max_length:
+        found = [r for r in lookup_table.lookup(target_hash) if len(r) <= max_length]
+        results = list(dict.fromkeys(results + found))
+        searched_length = max(searched_length, min(lookup_table.max_length, max_length))
+    return results, searched_length
+
+
+def is_answered(results: list[str], searched_length: int, max_length: int, find_all: bool) -> bool:
+    """Whether known plaintexts make searching the keyspace unnecessary."""
+    return searched_length >= max_length or bool(results and not find_all)
+
+
+def can_follow(leader: dict, cursor: dict | None, find_all: bool) -> bool:
+    """Whether a request may follow the in-flight search behind a leader's cursor."""
+    if cursor is None:
+        # A leader claims its search before its cursor is inserted.
+        return bool(leader.get("leading")) and (leader["findAll"] or not find_all)
+    if cursor["cancelled"]:
+        return False
+    return cursor["findAll"] or not find_all
+
+
+def build_cursor(
+    owner_id: str,
+    max_length: int,
+    target_hash: str | None = None,
+    target_hashes: list[str] | None = None,
+    find_all: bool = False,
+    searched_length: int = 0,
+    rainbow_table: dict | None = None,
+    priority: int = 0,
+) -> TaskCursor:
+    # Lengths up to searched_length were fully enumerated by an earlier request,
+    # so the keyspace walk starts right after them.
+    start_index = calculate_total_combinations(searched_length)
+    if rainbow_table is not None:
+        # Tasks cover chain columns of the table; the cursor is replaced by a
+        # brute-force one starting at fallback_index if every column misses.
+        return TaskCursor(
+            owner_id=owner_id,
+            max_length=max_length,
+            total_combinations=rainbow_table["chainLength"],
+            task_size=config.RAINBOW_COLUMNS_PER_TASK,
+            target_hash=target_hash,
+            target_hashes=target_hashes,
+            find_all=find_all,
+            task_type="rainbow",
+            table_id=rainbow_table["tableId"],
+            fallback_index=start_index,
+            priority=priority,
+        )
+    return TaskCursor(
+        owner_id=owner_id,
+        max_length=max_length,
+        total_combinations=calculate_total_combinations(max_length),
+        target_hash=target_hash,
+        target_hashes=target_hashes,
+        find_all=find_all,
+        start_index=start_index,
+        priority=priority,
+    )
+
+
+def build_batch(
+    batch_id: str,
+    max_length: int,
+    find_all: bool,
+    known: dict[str, tuple[list[str], int]],
+) -> tuple[list[CrackRequest], list[str], int]:
+    """Create the requests of a batch from what is already known about each hash.
+
+    Returns the requests, the hashes still to search and the length every
+    pending hash has been searched up to.
+    """
+    request_objs = []
+    pending_hashes = []
+    searched_length = max_length
+    for target_hash, (results, searched) in known.items():
+        request_obj = CrackRequest(target_hash, max_length, batch_id)
+        request_obj.results = results
+        if is_answered(results, searched, max_length, find_all):
+            request_obj.status = "READY"
+        else:
+            pending_hashes.append(target_hash)
+            searched_length = min(searched_length, searched)
+        request_objs.append(request_obj)
+    return request_objs, pending_hashes, searched_length
+
+
+def batch_response(batch_id: str, request_objs: list[CrackRequest]) -> dict:
+    return {
+        "batchId": batch_id,
+        "requests": [
+            {"hash": request_obj.hash, "requestId": request_obj.request_id}
+            for request_obj in request_objs
+        ],
+    }
+
+
+def status_owner(request_data: dict) -> str:
+    """The cursor owner (requestId or batchId) whose progress a request reports."""
+    return cast(str, request_data.get("batchId", request_data["requestId"]))
+
+
+def finish_status(
+    request_id: str,
+    request_data: dict,
+    max_length: int,
+    cursor: dict | None,
+    status_cache: StatusCache,
+    generation: int,
+) -> tuple[dict, int, str]:
+    """Turn the document a request reports and its owner's cursor into a cached payload.
+
+    generation is the status cache generation taken before the documents were read.
+    """
+    owner_id = status_owner(request_data)
+    progress = cursor_progress(cursor) if cursor is not None else None
+    payload = CrackRequest.status_payload(request_data, max_length, progress)
+    status_cache.put(request_id, payload, owner_id, generation)
+    return payload, 200, owner_id
+
+
+def cached_statuses(
+    request_ids: list[str], status_cache: StatusCache
+) -> tuple[dict[str, dict], list[str]]:
+    """Split requestIds into tagged payloads served by the cache and the ones it missed."""
+    statuses = {}
+    for request_id in request_ids:
+        cached = status_cache.get(request_id)
+        if cached is not None:
+            statuses[request_id] = {"requestId": request_id, **cached[0]}
+    return statuses, [request_id for request_id in request_ids if request_id not in statuses]
+
+
+def status_sources(request_ids: list[str], found: dict[str, dict]) -> dict[str, dict]:
+    """Map each found requestId to the document its status is read from.
+
+    Followers report the leader's state, trimmed to their own maxLength.
+    """
+    sources = {}
+    for request_id in request_ids:
+        request_data = found.get(request_id)
+        if request_data is not None:
+            leader_id = request_data.get("leaderId")
+            sources[request_id] = found.get(leader_id, request_data) if leader_id else request_data
+    return sources
+
+
+def missing_leaders(found: dict[str, dict]) -> list[str]:
+    return list({r["leaderId"] for r in found.values() if r.get("leaderId")} - found.keys())
+
+
+def owners_in_progress(sources: dict[str, dict]) -> list[str]:
+    return list({status_owner(r) for r in sources.values() if r["status"] == "IN_PROGRESS"})
+
+
+def build_statuses(
+    request_ids: list[str],
+    found: dict[str, dict],
+    sources: dict[str, dict],
+    progress: dict[str, int | None],
+    status_cache: StatusCache,
+    generation: int,
+) -> dict[str, dict]:
+    statuses = {}
+    for request_id in request_ids:
+        source = sources.get(request_id)
+        if source is None:
+            statuses[request_id] = {"requestId": request_id, "error": "Request not found"}
+            continue
+        owner_id = status_owner(source)
+        payload = CrackRequest.status_payload(
+            source, found[request_id]["maxLength"], progress.get(owner_id)
+        )
+        status_cache.put(request_id, payload, owner_id, generation)
+        statuses[request_id] = {"requestId": request_id, **payload}
+    return statuses
+
+
+def stream_wait(now: float, refresh_at: float, deadline: float | None) -> float | None:
+    """Seconds a status follower may block for its next event, None once its deadline passed."""
+    if deadline is not None and now >= deadline:
+        return None
+    wait = min(config.STATUS_STREAM_KEEPALIVE, refresh_at - now)
+    if deadline is not None:
+        wait = min(wait, deadline - now)
+    return max(wait, 0)
+
+
+def sse_event(payload: dict) -> bytes:
+    return b"event: status\ndata: " + orjson.dumps(payload) + b"\n\n"
+
+
+def health_report(checks: dict[str, Callable[[], object]]) -> tuple[dict, int]:
+    """Run blocking component checks into a /health payload and status code."""
+    report: dict = {"status": "healthy", "components": {}}
+    for component, check in checks.items():
+        try:
+            check()
+            report["components"][component] = "healthy"
+        except Exception as e:
+            report["status"] = "unhealthy"
+            report["components"][component] = f"unhealthy: {str(e)}"
+    return report, 200 if report["status"] == "healthy" else 503
@@ -1,21 +1,65 @@
+import queue
+import threading
+import time
+import uuid
 from argparse import ArgumentParser, Namespace
+from contextlib import closing
+from typing import Generator, Iterator
 
+import orjson
 from flask import Flask, Response, jsonify, request
-from prometheus_client import generate_latest, REGISTRY, Counter, Gauge
+from prometheus_client import REGISTRY, Counter, generate_latest
 from prometheus_flask_exporter import PrometheusMetrics
-from pymongo.read_preferences import ReadPreference
 from waitress import serve
 
+from src.api import (
+    NDJSON,
+    SSE_HEADERS,
+    SSE_KEEPALIVE,
+    ApiError,
+    add_table_matches,
+    batch_response,
+    build_batch,
+    build_cursor,
+    build_statuses,
+    cached_statuses,
+    can_follow,
+    finish_status,
+    health_report,
+    is_answered,
+    missing_leaders,
+    owners_in_progress,
+    parse_crack,
+    parse_crack_batch,
+    parse_long_poll,
+    parse_status_batch,
+    sse_event,
+    status_owner,
+    status_sources,
+    stream_wait,
+    wants_ndjson,
+)
 from src.core import config
 from src.core.logging import get_logger, setup_logging
-from src.models import CrackRequest, Task
-from src.services import MongoDBManager, RabbitMQManager, TaskRetryManager
+from src.models import CrackRequest, TaskCursor
+from src.services import (
+    LookupTable,
+    MongoDBManager,
+    RabbitMQManager,
+    RainbowCatalog,
+    SolvedHashCache,
+    StatusBus,
+    StatusCache,
+    TaskDispatcher,
+    TaskRetryManager,
+    ThroughputEstimator,
+)
 from src.utils import (
-    calculate_total_combinations,
-    create_task_partitions,
+    REQUEST_STATUS_LABELS,
+    TASK_STATUSES,
     track_request,
-    validate_hash,
-    validate_max_length,
+    update_request_counts,
+    update_task_counts,
 )
 
 
@@ -32,16 +76,51 @@ logger = get_logger("app")
 app = Flask(__name__)
 metrics = PrometheusMetrics(app)
 
-manager_requests_total = Counter('manager_requests_total', 'Total requests to manager', ['endpoint', 'method'])
-manager_requests_in_progress = Gauge('manager_requests_in_progress', 'Requests currently in progress')
-manager_tasks_total = Gauge('manager_tasks_total', 'Total tasks in system', ['status'])
-manager_requests_total_by_status = Gauge('manager_requests_total_by_status', 'Total requests by status', ['status'])
+manager_requests_total = Counter(
+    "manager_requests_total", "Total requests to manager", ["endpoint", "method"]
+)
 
 mongo = MongoDBManager()
-rabbitmq = RabbitMQManager(mongo)
+solved_cache = SolvedHashCache(mongo)
+lookup_table = LookupTable()
+rainbow_catalog = RainbowCatalog()
+throughput = ThroughputEstimator()
+status_bus = StatusBus()
+status_cache = StatusCache()
+stream_slots = threading.BoundedSemaphore(config.MAX_STATUS_STREAMS)
+rabbitmq = RabbitMQManager(
+    mongo,
+    solved_cache,
+    throughput,
+    status_bus,
+    status_cache,
+    consume=config.RUN_BACKGROUND_SERVICES,
+)
 
 retry_manager = TaskRetryManager(mongo, rabbitmq)
-retry_manager.start()
+dispatcher = TaskDispatcher(mongo, rabbitmq, throughput)
+if config.RUN_BACKGROUND_SERVICES:
+    retry_manager.start()
+    dispatcher.start()
+
+
+def schedule_tasks(cursor: TaskCursor) -> None:
+    mongo.insert_cursor(cursor.to_dict())
+    dispatcher.wake()
+
+
+def lookup_known(target_hash: str, max_length: int) -> tuple[list[str], int]:
+    """Return plaintexts already known for a hash and the length searched without the queue."""
+    results, searched_length = solved_cache.lookup(target_hash, max_length)
+    return add_table_matches(lookup_table, target_hash, max_length, results, searched_length)
+
+
+def find_leader(target_hash: str, max_length: int, find_all: bool) -> dict | None:
+    """Find an in-flight request whose search already covers this one."""
+    for candidate in mongo.find_leader_requests(target_hash, max_length):
+        if can_follow(candidate, mongo.get_cursor(status_owner(candidate)), find_all):
+            return candidate
+    return None
 
 
 @app.route("/api/hash/crack", methods=["POST"])
@@ -49,67 +128,198 @@ retry_manager.start()
 @track_request
 def crack_hash() -> tuple[Response, int]:
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "Invalid JSON"}), 400
-
-        target_hash = data.get("hash")
-        max_length = data.get("maxLength")
-
-        if not target_hash or not max_length:
-            return jsonify({"error": "Missing hash or maxLength"}), 400
-
-        if not validate_hash(target_hash):
-            return jsonify({"error": "Invalid MD5 hash"}), 400
-
-        if not validate_max_length(max_length):
-            return (
-                jsonify(
-                    {
-                        "error": f"maxLength must be integer between {config.MIN_ALLOWED_LENGTH} and {config.MAX_ALLOWED_LENGTH}"
-                    }
-                ),
-                400,
-            )
+        target_hash, max_length, find_all, priority = parse_crack(request.get_json(silent=True))
 
         request_obj = CrackRequest(target_hash, max_length)
+        request_obj.results, searched_length = lookup_known(request_obj.hash, max_length)
+
+        if is_answered(request_obj.results, searched_length, max_length, find_all):
+            request_obj.status = "READY"
+            mongo.insert_request(request_obj.to_dict())
+            logger.info(f"Request {request_obj.request_id} answered without scheduling tasks")
+            return jsonify({"requestId": request_obj.request_id}), 202
+
+        cursor = build_cursor(
+            request_obj.request_id,
+            max_length,
+            target_hash=request_obj.hash,
+            find_all=find_all,
+            searched_length=searched_length,
+            rainbow_table=None if find_all else rainbow_catalog.find(max_length),
+            priority=priority,
+        )
+
+        leader = find_leader(request_obj.hash, max_length, find_all)
+        if leader is None and mongo.claim_search(request_obj.to_dict(), find_all):
+            schedule_tasks(cursor)
+            return jsonify({"requestId": request_obj.request_id}), 202
+        if leader is None:
+            # An identical request claimed the search since the lookup.
+            leader = find_leader(request_obj.hash, max_length, find_all)
+
+        if leader is not None:
+            request_obj.leader_id = leader["requestId"]
+            mongo.insert_request(request_obj.to_dict())
+            if max_length < leader["maxLength"]:
+                mongo.add_follower_length(status_owner(leader), max_length)
+            logger.info(
+                f"Request {request_obj.request_id} follows in-flight request {leader['requestId']}"
+            )
+            return jsonify({"requestId": request_obj.request_id}), 202
 
         mongo.insert_request(request_obj.to_dict())
+        schedule_tasks(cursor)
 
-        total_combinations = calculate_total_combinations(max_length)
-        partitions = create_task_partitions(total_combinations, config.TASK_SIZE)
+        return jsonify({"requestId": request_obj.request_id}), 202
 
-        tasks = [
-            Task(
-                request_id=request_obj.request_id,
-                start_index=partition["start_index"],
-                count=partition["count"],
-                target_hash=target_hash,
-                max_length=max_length,
-            )
-            for partition in partitions
-        ]
+    except ApiError as e:
+        return jsonify(e.payload), e.status_code
+    except Exception as e:
+        logger.error(f"Error processing crack request: {e}")
+        return jsonify({"error": "Internal server error"}), 500
 
-        if tasks:
-            mongo.insert_tasks([task.to_dict() for task in tasks])
 
-        failed_tasks = []
-        for task in tasks:
-            if not rabbitmq.publish_task(task.to_message()):
-                failed_tasks.append(task.task_id)
-                task.mark_queued()
-                mongo.update_task_status(task.task_id, "QUEUED")
+@app.route("/api/hash/crack/batch", methods=["POST"])
+@metrics.counter("crack_batch_requests_total", "Total batch crack requests")
+@track_request
+def crack_hash_batch() -> tuple[Response, int]:
+    try:
+        target_hashes, max_length, find_all, priority = parse_crack_batch(
+            request.get_json(silent=True)
+        )
 
-        if failed_tasks:
-            logger.warning(f"Failed to publish tasks: {failed_tasks}")
+        batch_id = str(uuid.uuid4())
+        known = {
+            target_hash: lookup_known(target_hash, max_length) for target_hash in target_hashes
+        }
+        request_objs, pending_hashes, searched_length = build_batch(
+            batch_id, max_length, find_all, known
+        )
 
-        return jsonify({"requestId": request_obj.request_id}), 202
+        mongo.insert_requests([request_obj.to_dict() for request_obj in request_objs])
+
+        if pending_hashes:
+            schedule_tasks(
+                build_cursor(
+                    batch_id,
+                    max_length,
+                    target_hashes=pending_hashes,
+                    find_all=find_all,
+                    searched_length=searched_length,
+                    priority=priority,
+                )
+            )
+
+        return jsonify(batch_response(batch_id, request_objs)), 202
 
+    except ApiError as e:
+        return jsonify(e.payload), e.status_code
     except Exception as e:
-        logger.error(f"Error processing crack request: {e}")
+        logger.error(f"Error processing batch crack request: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
 
+def read_status(request_id: str, use_secondary: bool = True) -> tuple[dict, int, str | None]:
+    """Build the status payload of a request.
+
+    Returns the payload, its HTTP status code and the cursor owner whose
+    status bus events update it. Secondary reads are served from the status
+    cache when possible; primary reads bypass it but refresh it.
+    """
+    if use_secondary:
+        cached = status_cache.get(request_id)
+        if cached is not None:
+            payload, owner_id = cached
+            return payload, 200, owner_id
+
+    generation = status_cache.generation
+    request_data = mongo.get_request(request_id, use_secondary)
+
+    if not request_data:
+        return {"error": "Request not found"}, 404, None
+
+    max_length = request_data["maxLength"]
+    if request_data.get("leaderId"):
+        # Followers report the leader's state, trimmed to their own maxLength.
+        leader_data = mongo.get_request(request_data["leaderId"], use_secondary)
+        if leader_data:
+            request_data = leader_data
+
+    cursor = None
+    if request_data["status"] == "IN_PROGRESS":
+        if mongo.cursors is None:
+            return {"error": "Database not available"}, 503, None
+
+        cursor = mongo.get_cursor(status_owner(request_data))
+
+    return finish_status(request_id, request_data, max_length, cursor, status_cache, generation)
+
+
+def read_statuses(request_ids: list[str]) -> list[dict]:
+    """Status payloads, tagged with their requestId, for many requests at once.
+
+    Requests in the status cache are answered from it. For the rest this
+    uses one $in query for the requests, one more for the leaders of any
+    followers among them, and one aggregation over the cursors of those
+    still in progress.
+    """
+    statuses, missed = cached_statuses(request_ids, status_cache)
+    if missed:
+        generation = status_cache.generation
+        found = {r["requestId"]: r for r in mongo.get_requests(missed)}
+        leader_ids = missing_leaders(found)
+        if leader_ids:
+            found.update((r["requestId"], r) for r in mongo.get_requests(leader_ids))
+
+        sources = status_sources(missed, found)
+        owners = owners_in_progress(sources)
+        progress = mongo.get_cursors_progress(owners) if owners else {}
+        statuses.update(build_statuses(missed, found, sources, progress, status_cache, generation))
+    return [statuses[request_id] for request_id in request_ids]
+
+
+def follow_status(
+    request_id: str, payload: dict, owner_id: str, timeout: float | None = None
+) -> Generator[dict | None, None, None]:
+    """Yield the status payload each time it changes, and None as a keepalive tick.
+
+    Progress comes from the status bus. The request itself is only re-read
+    once the bus reports it finished, and every STATUS_STREAM_REFRESH seconds
+    to pick up results consumed by another manager replica.
+    """
+    updates: queue.SimpleQueue[dict] = queue.SimpleQueue()
+    unsubscribe = status_bus.subscribe(owner_id, updates.put)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    refresh_at = time.monotonic() + config.STATUS_STREAM_REFRESH
+    try:
+        while payload.get("status") == "IN_PROGRESS":
+            wait = stream_wait(time.monotonic(), refresh_at, deadline)
+            if wait is None:
+                return
+
+            try:
+                event: dict | None = updates.get(timeout=wait)
+            except queue.Empty:
+                event = None
+
+            if event is None and time.monotonic() < refresh_at:
+                yield None
+                continue
+
+            if event is None or event["status"] != "IN_PROGRESS":
+                refresh_at = time.monotonic() + config.STATUS_STREAM_REFRESH
+                event, code, _ = read_status(request_id, use_secondary=False)
+                if code != 200:
+                    yield event
+                    return
+
+            if event != payload:
+                payload = event
+                yield payload
+    finally:
+        unsubscribe()
+
+
 @app.route("/api/hash/status", methods=["GET"])
 @metrics.counter("status_requests_total", "Total status requests")
 @track_request
@@ -120,108 +330,133 @@ def get_status() -> tuple[Response, int] | Response:
         if not request_id:
             return jsonify({"error": "Missing requestId"}), 400
 
-        request_data = mongo.get_request(request_id)
-
-        if not request_data:
-            return jsonify({"error": "Request not found"}), 404
+        payload, code, _ = read_status(request_id)
+        return jsonify(payload), code
 
-        status = request_data["status"]
+    except Exception as e:
+        logger.error(f"Error getting status: {e}")
+        return jsonify({"error": "Internal server error"}), 500
 
-        if status == "IN_PROGRESS":
-            if mongo.tasks is None:
-                return jsonify({"error": "Database not available"}), 503
-            total_tasks = mongo.tasks.count_documents({"requestId": request_id})
-            completed_tasks = mongo.tasks.count_documents(
-                {"requestId": request_id, "status": "DONE"}
-            )
 
-            if total_tasks > 0:
-                progress = int((completed_tasks / total_tasks) * 100)
-                return jsonify({"status": status, "progress": progress})
+@app.route("/api/hash/status/batch", methods=["POST"])
+@metrics.counter("status_batch_requests_total", "Total batch status requests")
+@track_request
+def get_status_batch() -> tuple[Response, int] | Response:
+    """Statuses of many requests, streamed chunk by chunk as NDJSON if the client accepts it."""
+    try:
+        chunks = parse_status_batch(request.get_json(silent=True))
 
-            return jsonify({"status": status})
+        if wants_ndjson(request.headers.get("Accept")):
 
-        elif status == "READY":
-            results = request_data.get("results", [])
-            return jsonify({"status": status, "results": results if results else []})
+            def lines() -> Iterator[bytes]:
+                for chunk in chunks:
+                    for status in read_statuses(chunk):
+                        yield orjson.dumps(status) + b"\n"
 
-        elif status == "ERROR":
-            return jsonify({"status": status})
+            return Response(lines(), mimetype=NDJSON)
 
-        else:
-            return jsonify({"status": status})
+        statuses = [status for chunk in chunks for status in read_statuses(chunk)]
+        return jsonify({"statuses": statuses})
 
+    except ApiError as e:
+        return jsonify(e.payload), e.status_code
     except Exception as e:
-        logger.error(f"Error getting status: {e}")
+        logger.error(f"Error getting batch status: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
 
-@app.route("/health", methods=["GET"])
-def health() -> tuple[Response, int]:
-    health_status = {"status": "healthy", "components": {}}
+def acquire_stream_slot() -> None:
+    """Reserve one of the waitress threads status streams may hold.
 
-    try:
-        if mongo.client is None:
-            raise Exception("MongoDB client not initialized")
-        mongo.ensure_connection()
-        mongo.client.admin.command("ping")
-        health_status["components"]["mongodb"] = "healthy"  # type: ignore[index]
-    except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["components"]["mongodb"] = f"unhealthy: {str(e)}"  # type: ignore[index]
+    Each stream blocks a thread for its whole lifetime, so without a cap a
+    handful of clients would leave none for /api/hash/crack and /health.
+    """
+    if not stream_slots.acquire(blocking=False):
+        raise ApiError("Too many status streams, retry later", 503)
+
+
+@app.route("/api/hash/status/stream", methods=["GET"])
+@metrics.counter("status_stream_requests_total", "Total status stream requests")
+def stream_status() -> tuple[Response, int] | Response:
+    """Push status changes as Server-Sent Events, or answer one long poll with mode=longpoll.
 
+    A long poll returns as soon as the status differs from the progress the
+    client passes, or with the unchanged status after the timeout.
+    """
     try:
-        rabbitmq.ensure_connection()
-        health_status["components"]["rabbitmq"] = "healthy"  # type: ignore[index]
+        request_id = request.args.get("requestId")
+
+        if not request_id:
+            return jsonify({"error": "Missing requestId"}), 400
+
+        payload, code, owner_id = read_status(request_id, use_secondary=False)
+        if code != 200 or owner_id is None:
+            return jsonify(payload), code
+
+        if request.args.get("mode") == "longpoll":
+            timeout, known_progress = parse_long_poll(
+                request.args.get("timeout"), request.args.get("progress")
+            )
+            if payload.get("progress") == known_progress:
+                acquire_stream_slot()
+                try:
+                    with closing(follow_status(request_id, payload, owner_id, timeout)) as updates:
+                        for update in updates:
+                            if update is not None:
+                                payload = update
+                                break
+                finally:
+                    stream_slots.release()
+            return jsonify(payload), 200
+
+        def events() -> Iterator[bytes]:
+            yield sse_event(payload)
+            for update in follow_status(request_id, payload, owner_id):
+                yield SSE_KEEPALIVE if update is None else sse_event(update)
+
+        acquire_stream_slot()
+        response = Response(events(), mimetype="text/event-stream", headers=SSE_HEADERS)
+        # waitress closes the body when the client goes away, even before the
+        # first event, so the slot cannot leak.
+        response.call_on_close(stream_slots.release)
+        return response
+
+    except ApiError as e:
+        return jsonify(e.payload), e.status_code
     except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["components"]["rabbitmq"] = f"unhealthy: {str(e)}"  # type: ignore[index]
+        logger.error(f"Error streaming status: {e}")
+        return jsonify({"error": "Internal server error"}), 500
 
-    status_code = 200 if health_status["status"] == "healthy" else 503
-    return jsonify(health_status), status_code
+
+def check_mongo() -> None:
+    mongo.ensure_connection()
+    mongo.ping()
+
+
+@app.route("/health", methods=["GET"])
+def health() -> tuple[Response, int]:
+    report, code = health_report({"mongodb": check_mongo, "rabbitmq": rabbitmq.ensure_connection})
+    return jsonify(report), code
 
 
 @app.route("/metrics", methods=["GET"])
 def manager_metrics() -> tuple[Response, int] | Response:
     try:
-        requests_collection = (
-            mongo.requests.with_options(read_preference=ReadPreference.PRIMARY)
-            if mongo.requests is not None
-            else None
-        )
-        tasks_collection = (
-            mongo.tasks.with_options(read_preference=ReadPreference.PRIMARY)
-            if mongo.tasks is not None
-            else None
-        )
-
-        if requests_collection is not None:
-            manager_requests_in_progress.set(
-                requests_collection.count_documents({"status": "IN_PROGRESS"})
+        if mongo.requests is not None:
+            update_request_counts(
+                {
+                    status: mongo.count_by_status(mongo.requests, status)
+                    for status in REQUEST_STATUS_LABELS
+                }
             )
 
-            in_progress = requests_collection.count_documents({"status": "IN_PROGRESS"})
-            completed = requests_collection.count_documents({"status": "READY"})
-            failed = requests_collection.count_documents({"status": "ERROR"})
-
-            manager_requests_total_by_status.labels(status='in_progress').set(in_progress)
-            manager_requests_total_by_status.labels(status='completed').set(completed)
-            manager_requests_total_by_status.labels(status='failed').set(failed)
-
-        if tasks_collection is not None:
-            pending_tasks = tasks_collection.count_documents({"status": "PENDING"})
-            queued_tasks = tasks_collection.count_documents({"status": "QUEUED"})
-            done_tasks = tasks_collection.count_documents({"status": "DONE"})
-            error_tasks = tasks_collection.count_documents({"status": "ERROR"})
-
-            manager_tasks_total.labels(status='pending').set(pending_tasks)
-            manager_tasks_total.labels(status='queued').set(queued_tasks)
-            manager_tasks_total.labels(status='done').set(done_tasks)
-            manager_tasks_total.labels(status='error').set(error_tasks)
+        if mongo.tasks is not None:
+            update_task_counts(
+                {status: mongo.count_by_status(mongo.tasks, status) for status in TASK_STATUSES}
+            )
 
         return Response(
-            generate_latest(REGISTRY),
-            mimetype='text/plain; version=0.0.4; charset=utf-8'
+            generate_latest(REGISTRY), mimetype="text/plain; version=0.0.4; charset=utf-8"
         )
     except Exception as e:
         logger.error(f"Error getting metrics: {e}")
@@ -231,7 +466,10 @@ def manager_metrics() -> tuple[Response, int] | Response:
 @app.route("/start", methods=["POST"])
 def start() -> tuple[Response, int]:
     logger.info("Received start signal")
+    if not config.RUN_BACKGROUND_SERVICES:
+        return jsonify({"error": "Background services are disabled on this instance"}), 409
     retry_manager.start()
+    dispatcher.start()
     return jsonify({"status": "started"}), 200
 
 
@@ -239,14 +477,17 @@ def start() -> tuple[Response, int]:
 def shutdown() -> tuple[Response, int]:
     logger.info("Received shutdown signal")
     retry_manager.stop()
+    dispatcher.stop()
     return jsonify({"status": "shutting down"}), 200
 
 
 if __name__ == "__main__":
     try:
-        serve(app, host="0.0.0.0", port=5055)
+        serve(app, host="0.0.0.0", port=5055, threads=config.WAITRESS_THREADS)
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received")
     finally:
         retry_manager.stop()
+        dispatcher.stop()
         rabbitmq.close()
+        lookup_table.close()
@@ -0,0 +1,516 @@
+import asyncio
+import time
+import uuid
+from argparse import ArgumentParser, Namespace
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
+
+import orjson
+import uvicorn
+from prometheus_client import REGISTRY, Counter, generate_latest
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from src.api import (
+    NDJSON,
+    SSE_HEADERS,
+    SSE_KEEPALIVE,
+    ApiError,
+    add_table_matches,
+    batch_response,
+    build_batch,
+    build_cursor,
+    build_statuses,
+    cached_statuses,
+    can_follow,
+    finish_status,
+    health_report,
+    is_answered,
+    missing_leaders,
+    owners_in_progress,
+    parse_crack,
+    parse_crack_batch,
+    parse_long_poll,
+    parse_status_batch,
+    sse_event,
+    status_owner,
+    status_sources,
+    stream_wait,
+    wants_ndjson,
+)
+from src.core import config
+from src.core.logging import get_logger, setup_logging
+from src.models import CrackRequest, TaskCursor
+from src.services import (
+    LookupTable,
+    MongoDBManager,
+    RabbitMQManager,
+    RainbowCatalog,
+    SolvedHashCache,
+    StatusBus,
+    StatusCache,
+    TaskDispatcher,
+    TaskRetryManager,
+    ThroughputEstimator,
+)
+from src.services.async_mongodb import AsyncMongoDBManager
+from src.utils import (
+    REQUEST_STATUS_LABELS,
+    TASK_STATUSES,
+    track_request,
+    update_request_counts,
+    update_task_counts,
+)
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Manager API on asyncio drivers behind uvicorn")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    return parser.parse_args()
+
+
+args = parse_arguments()
+setup_logging(args.verbose)
+
+logger = get_logger("asgi_app")
+
+crack_requests_total = Counter("crack_requests_total", "Total crack requests")
+crack_batch_requests_total = Counter("crack_batch_requests_total", "Total batch crack requests")
+status_requests_total = Counter("status_requests_total", "Total status requests")
+status_batch_requests_total = Counter("status_batch_requests_total", "Total batch status requests")
+status_stream_requests_total = Counter(
+    "status_stream_requests_total", "Total status stream requests"
+)
+
+# The background services are the same threads the Flask app runs; only the
+# request handlers below move to the asyncio drivers. When both stacks serve
+# the same deployment, exactly one of them may run with RUN_BACKGROUND_SERVICES
+# enabled: a second retry manager would republish every unfinished task on
+# start, and a second result consumer adds nothing but contention. Status
+# streams on a process without the consumer see no bus events and fall back
+# to re-reading every STATUS_STREAM_REFRESH seconds.
+mongo = MongoDBManager()
+solved_cache = SolvedHashCache(mongo)
+lookup_table = LookupTable()
+rainbow_catalog = RainbowCatalog()
+throughput = ThroughputEstimator()
+status_bus = StatusBus()
+status_cache = StatusCache()
+rabbitmq = RabbitMQManager(
+    mongo,
+    solved_cache,
+    throughput,
+    status_bus,
+    status_cache,
+    consume=config.RUN_BACKGROUND_SERVICES,
+)
+
+retry_manager = TaskRetryManager(mongo, rabbitmq)
+dispatcher = TaskDispatcher(mongo, rabbitmq, throughput)
+if config.RUN_BACKGROUND_SERVICES:
+    retry_manager.start()
+    dispatcher.start()
+
+amongo = AsyncMongoDBManager()
+
+
+def error(message: str, status_code: int, **extra: object) -> JSONResponse:
+    return JSONResponse({"error": message, **extra}, status_code=status_code)
+
+
+async def read_json(request: Request) -> object:
+    try:
+        return orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        return None
+
+
+async def schedule_tasks(cursor: TaskCursor) -> None:
+    await amongo.insert_cursor(cursor.to_dict())
+    dispatcher.wake()
+
+
+async def lookup_known(target_hash: str, max_length: int) -> tuple[list[str], int]:
+    """Return plaintexts already known for a hash and the length searched without the queue."""
+    results, searched_length = await solved_cache.lookup_async(
+        target_hash, max_length, amongo.get_solved
+    )
+    return add_table_matches(lookup_table, target_hash, max_length, results, searched_length)
+
+
+async def find_leader(target_hash: str, max_length: int, find_all: bool) -> dict | None:
+    """Find an in-flight request whose search already covers this one."""
+    for candidate in await amongo.find_leader_requests(target_hash, max_length):
+        if can_follow(candidate, await amongo.get_cursor(status_owner(candidate)), find_all):
+            return candidate
+    return None
+
+
+@track_request
+async def crack_hash(request: Request) -> JSONResponse:
+    crack_requests_total.inc()
+    try:
+        target_hash, max_length, find_all, priority = parse_crack(await read_json(request))
+
+        request_obj = CrackRequest(target_hash, max_length)
+        request_obj.results, searched_length = await lookup_known(request_obj.hash, max_length)
+
+        if is_answered(request_obj.results, searched_length, max_length, find_all):
+            request_obj.status = "READY"
+            await amongo.insert_request(request_obj.to_dict())
+            logger.info(f"Request {request_obj.request_id} answered without scheduling tasks")
+            return JSONResponse({"requestId": request_obj.request_id}, status_code=202)
+
+        cursor = build_cursor(
+            request_obj.request_id,
+            max_length,
+            target_hash=request_obj.hash,
+            find_all=find_all,
+            searched_length=searched_length,
+            rainbow_table=None if find_all else rainbow_catalog.find(max_length),
+            priority=priority,
+        )
+
+        leader = await find_leader(request_obj.hash, max_length, find_all)
+        if leader is None and await amongo.claim_search(request_obj.to_dict(), find_all):
+            await schedule_tasks(cursor)
+            return JSONResponse({"requestId": request_obj.request_id}, status_code=202)
+        if leader is None:
+            # An identical request claimed the search since the lookup.
+            leader = await find_leader(request_obj.hash, max_length, find_all)
+
+        if leader is not None:
+            request_obj.leader_id = leader["requestId"]
+            await amongo.insert_request(request_obj.to_dict())
+            if max_length < leader["maxLength"]:
+                await amongo.add_follower_length(status_owner(leader), max_length)
+            logger.info(
+                f"Request {request_obj.request_id} follows in-flight request {leader['requestId']}"
+            )
+            return JSONResponse({"requestId": request_obj.request_id}, status_code=202)
+
+        await amongo.insert_request(request_obj.to_dict())
+        await schedule_tasks(cursor)
+
+        return JSONResponse({"requestId": request_obj.request_id}, status_code=202)
+
+    except ApiError as e:
+        return JSONResponse(e.payload, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Error processing crack request: {e}")
+        return error("Internal server error", 500)
+
+
+@track_request
+async def crack_hash_batch(request: Request) -> JSONResponse:
+    crack_batch_requests_total.inc()
+    try:
+        target_hashes, max_length, find_all, priority = parse_crack_batch(await read_json(request))
+
+        batch_id = str(uuid.uuid4())
+        known = {
+            target_hash: await lookup_known(target_hash, max_length)
+            for target_hash in target_hashes
+        }
+        request_objs, pending_hashes, searched_length = build_batch(
+            batch_id, max_length, find_all, known
+        )
+
+        await amongo.insert_requests([request_obj.to_dict() for request_obj in request_objs])
+
+        if pending_hashes:
+            await schedule_tasks(
+                build_cursor(
+                    batch_id,
+                    max_length,
+                    target_hashes=pending_hashes,
+                    find_all=find_all,
+                    searched_length=searched_length,
+                    priority=priority,
+                )
+            )
+
+        return JSONResponse(batch_response(batch_id, request_objs), status_code=202)
+
+    except ApiError as e:
+        return JSONResponse(e.payload, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Error processing batch crack request: {e}")
+        return error("Internal server error", 500)
+
+
+async def read_status(request_id: str, use_secondary: bool = True) -> tuple[dict, int, str | None]:
+    """Build the status payload of a request; same contract as read_status in src.app."""
+    if use_secondary:
+        cached = status_cache.get(request_id)
+        if cached is not None:
+            payload, owner_id = cached
+            return payload, 200, owner_id
+
+    generation = status_cache.generation
+    request_data = await amongo.get_request(request_id, use_secondary)
+
+    if not request_data:
+        return {"error": "Request not found"}, 404, None
+
+    max_length = request_data["maxLength"]
+    if request_data.get("leaderId"):
+        # Followers report the leader's state, trimmed to their own maxLength.
+        leader_data = await amongo.get_request(request_data["leaderId"], use_secondary)
+        if leader_data:
+            request_data = leader_data
+
+    cursor = None
+    if request_data["status"] == "IN_PROGRESS":
+        if amongo.cursors is None:
+            return {"error": "Database not available"}, 503, None
+
+        cursor = await amongo.get_cursor(status_owner(request_data))
+
+    return finish_status(request_id, request_data, max_length, cursor, status_cache, generation)
+
+
+async def read_statuses(request_ids: list[str]) -> list[dict]:
+    """Status payloads, tagged with their requestId; same queries as read_statuses in src.app."""
+    statuses, missed = cached_statuses(request_ids, status_cache)
+    if missed:
+        generation = status_cache.generation
+        found = {r["requestId"]: r for r in await amongo.get_requests(missed)}
+        leader_ids = missing_leaders(found)
+        if leader_ids:
+            found.update((r["requestId"], r) for r in await amongo.get_requests(leader_ids))
+
+        sources = status_sources(missed, found)
+        owners = owners_in_progress(sources)
+        progress = await amongo.get_cursors_progress(owners) if owners else {}
+        statuses.update(build_statuses(missed, found, sources, progress, status_cache, generation))
+    return [statuses[request_id] for request_id in request_ids]
+
+
+async def follow_status(
+    request_id: str, payload: dict, owner_id: str, timeout: float | None = None
+) -> AsyncGenerator[dict | None, None]:
+    """Yield the status payload each time it changes, and None as a keepalive tick.
+
+    Same contract as follow_status in src.app; bus events arrive on the
+    result consumer thread and are handed to the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    updates: asyncio.Queue[dict] = asyncio.Queue()
+
+    def on_event(event: dict) -> None:
+        loop.call_soon_threadsafe(updates.put_nowait, event)
+
+    unsubscribe = status_bus.subscribe(owner_id, on_event)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    refresh_at = time.monotonic() + config.STATUS_STREAM_REFRESH
+    try:
+        while payload.get("status") == "IN_PROGRESS":
+            wait = stream_wait(time.monotonic(), refresh_at, deadline)
+            if wait is None:
+                return
+
+            try:
+                event: dict | None = await asyncio.wait_for(updates.get(), wait)
+            except TimeoutError:
+                event = None
+
+            if event is None and time.monotonic() < refresh_at:
+                yield None
+                continue
+
+            if event is None or event["status"] != "IN_PROGRESS":
+                refresh_at = time.monotonic() + config.STATUS_STREAM_REFRESH
+                event, code, _ = await read_status(request_id, use_secondary=False)
+                if code != 200:
+                    yield event
+                    return
+
+            if event != payload:
+                payload = event
+                yield payload
+    finally:
+        unsubscribe()
+
+
+@track_request
+async def get_status(request: Request) -> JSONResponse:
+    status_requests_total.inc()
+    try:
+        request_id = request.query_params.get("requestId")
+
+        if not request_id:
+            return error("Missing requestId", 400)
+
+        payload, code, _ = await read_status(request_id)
+        return JSONResponse(payload, status_code=code)
+
+    except Exception as e:
+        logger.error(f"Error getting status: {e}")
+        return error("Internal server error", 500)
+
+
+@track_request
+async def get_status_batch(request: Request) -> Response:
+    """Statuses of many requests, streamed chunk by chunk as NDJSON if the client accepts it."""
+    status_batch_requests_total.inc()
+    try:
+        chunks = parse_status_batch(await read_json(request))
+
+        if wants_ndjson(request.headers.get("accept")):
+
+            async def lines() -> AsyncIterator[bytes]:
+                for chunk in chunks:
+                    for status in await read_statuses(chunk):
+                        yield orjson.dumps(status) + b"\n"
+
+            return StreamingResponse(lines(), media_type=NDJSON)
+
+        statuses = []
+        for chunk in chunks:
+            statuses.extend(await read_statuses(chunk))
+        return JSONResponse({"statuses": statuses})
+
+    except ApiError as e:
+        return JSONResponse(e.payload, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Error getting batch status: {e}")
+        return error("Internal server error", 500)
+
+
+async def stream_status(request: Request) -> Response:
+    """Push status changes as Server-Sent Events, or answer one long poll with mode=longpoll."""
+    status_stream_requests_total.inc()
+    try:
+        request_id = request.query_params.get("requestId")
+
+        if not request_id:
+            return error("Missing requestId", 400)
+
+        payload, code, owner_id = await read_status(request_id, use_secondary=False)
+        if code != 200 or owner_id is None:
+            return JSONResponse(payload, status_code=code)
+
+        if request.query_params.get("mode") == "longpoll":
+            timeout, known_progress = parse_long_poll(
+                request.query_params.get("timeout"), request.query_params.get("progress")
+            )
+            if payload.get("progress") == known_progress:
+                async with aclosing(
+                    follow_status(request_id, payload, owner_id, timeout)
+                ) as updates:
+                    async for update in updates:
+                        if update is not None:
+                            payload = update
+                            break
+            return JSONResponse(payload)
+
+        async def events() -> AsyncIterator[bytes]:
+            yield sse_event(payload)
+            async with aclosing(follow_status(request_id, payload, owner_id)) as updates:
+                async for update in updates:
+                    yield SSE_KEEPALIVE if update is None else sse_event(update)
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    except ApiError as e:
+        return JSONResponse(e.payload, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Error streaming status: {e}")
+        return error("Internal server error", 500)
+
+
+def check_mongo() -> None:
+    mongo.ensure_connection()
+    mongo.ping()
+
+
+async def health(_request: Request) -> JSONResponse:
+    # The checks block, so they run on the threadpool against the same
+    # clients the background services use.
+    report, code = await run_in_threadpool(
+        health_report, {"mongodb": check_mongo, "rabbitmq": rabbitmq.ensure_connection}
+    )
+    return JSONResponse(report, status_code=code)
+
+
+async def manager_metrics(_request: Request) -> Response:
+    try:
+        if amongo.requests is not None:
+            update_request_counts(
+                {
+                    status: await amongo.count_by_status(amongo.requests, status)
+                    for status in REQUEST_STATUS_LABELS
+                }
+            )
+
+        if amongo.tasks is not None:
+            update_task_counts(
+                {
+                    status: await amongo.count_by_status(amongo.tasks, status)
+                    for status in TASK_STATUSES
+                }
+            )
+
+        return Response(
+            generate_latest(REGISTRY), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+    except Exception as e:
+        logger.error(f"Error getting metrics: {e}")
+        return Response("", status_code=500)
+
+
+async def start(_request: Request) -> JSONResponse:
+    logger.info("Received start signal")
+    if not config.RUN_BACKGROUND_SERVICES:
+        return error("Background services are disabled on this instance", 409)
+    retry_manager.start()
+    dispatcher.start()
+    return JSONResponse({"status": "started"})
+
+
+async def shutdown(_request: Request) -> JSONResponse:
+    logger.info("Received shutdown signal")
+    retry_manager.stop()
+    dispatcher.stop()
+    return JSONResponse({"status": "shutting down"})
+
+
+@asynccontextmanager
+async def lifespan(_app: Starlette) -> AsyncIterator[None]:
+    await amongo.connect()
+    try:
+        yield
+    finally:
+        await amongo.close()
+
+
+app = Starlette(
+    routes=[
+        Route("/api/hash/crack", crack_hash, methods=["POST"]),
+        Route("/api/hash/crack/batch", crack_hash_batch, methods=["POST"]),
+        Route("/api/hash/status", get_status, methods=["GET"]),
+        Route("/api/hash/status/batch", get_status_batch, methods=["POST"]),
+        Route("/api/hash/status/stream", stream_status, methods=["GET"]),
+        Route("/health", health, methods=["GET"]),
+        Route("/metrics", manager_metrics, methods=["GET"]),
+        Route("/start", start, methods=["POST"]),
+        Route("/shutdown", shutdown, methods=["POST"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    try:
+        uvicorn.run(app, host="0.0.0.0", port=config.ASYNC_API_PORT, log_config=None)
+    except KeyboardInterrupt:
+        logger.info("Keyboard interrupt received")
+    finally:
+        retry_manager.stop()
+        dispatcher.stop()
+        rabbitmq.close()
+        lookup_table.close()
@@ -0,0 +1,126 @@
+import time
+import uuid
+from argparse import ArgumentParser, Namespace
+from typing import Callable
+
+import orjson
+import pika
+from pika.adapters.blocking_connection import BlockingChannel
+
+from src.core import config
+from src.core.logging import get_logger, setup_logging
+from src.services.rabbitmq import TASK_EXCHANGE, RabbitMQManager
+
+logger = get_logger("benchmark_publish")
+
+QUEUE = "task.queue"
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(
+        description="Compare task publishing paths against the configured RabbitMQ. "
+        "Refuses to run unless task.queue is empty and unconsumed, and purges it afterwards."
+    )
+    parser.add_argument("--tasks", type=int, default=20_000, help="Tasks published per path")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    return parser.parse_args()
+
+
+def make_tasks(count: int) -> list[dict]:
+    return [
+        {
+            "taskId": str(uuid.uuid4()),
+            "requestId": "benchmark",
+            "startIndex": index * config.TASK_SIZE,
+            "count": config.TASK_SIZE,
+            "targetHash": "0" * 32,
+            "maxLength": 6,
+        }
+        for index in range(count)
+    ]
+
+
+def open_channel() -> tuple[pika.BlockingConnection, BlockingChannel]:
+    connection = pika.BlockingConnection(
+        pika.ConnectionParameters(
+            host=config.RABBITMQ_HOST,
+            port=config.RABBITMQ_PORT,
+            credentials=pika.PlainCredentials(config.RABBITMQ_USER, config.RABBITMQ_PASS),
+            **config.RABBITMQ_CONNECTION_SETTINGS,
+        )
+    )
+    return connection, connection.channel()
+
+
+def per_message(confirm: bool) -> Callable[[list[dict]], int]:
+    """One basic_publish per task, optionally waiting for each confirm in turn."""
+
+    def run(tasks: list[dict]) -> int:
+        connection, channel = open_channel()
+        if confirm:
+            channel.confirm_delivery()
+        properties = pika.BasicProperties(delivery_mode=2, content_type="application/json")
+        try:
+            for task in tasks:
+                channel.basic_publish(
+                    exchange=TASK_EXCHANGE,
+                    routing_key=QUEUE,
+                    body=orjson.dumps(task),
+                    properties=properties,
+                )
+        finally:
+            connection.close()
+        return len(tasks)
+
+    return run
+
+
+def batched(manager: RabbitMQManager) -> Callable[[list[dict]], int]:
+    """RabbitMQManager.publish_tasks: pipelined batches with publisher confirms."""
+
+    def run(tasks: list[dict]) -> int:
+        confirmed, _ = manager.publish_tasks(tasks)
+        return len(confirmed)
+
+    return run
+
+
+def main(args: Namespace) -> None:
+    # Only the publishing side of the manager is used, which never touches Mongo.
+    manager = RabbitMQManager(None, consume=False)  # type: ignore[arg-type]
+    connection, channel = open_channel()
+    declared = channel.queue_declare(queue=QUEUE, passive=True)
+    if declared.method.message_count or declared.method.consumer_count:
+        connection.close()
+        manager.close()
+        raise SystemExit(f"{QUEUE} is in use; run this against a scratch broker")
+
+    paths: dict[str, Callable[[list[dict]], int]] = {
+        "per-message": per_message(confirm=False),
+        "per-message+ack": per_message(confirm=True),
+        "batched+ack": batched(manager),
+    }
+
+    print(f"{'path':<16} {'tasks':>8} {'confirmed':>10} {'seconds':>8} {'tasks/s':>10}")
+    try:
+        for name, run in paths.items():
+            tasks = make_tasks(args.tasks)
+            started = time.perf_counter()
+            sent = run(tasks)
+            elapsed = time.perf_counter() - started
+            confirmed = "-" if name == "per-message" else str(sent)
+            print(
+                f"{name:<16} {len(tasks):>8} {confirmed:>10} {elapsed:>8.2f} "
+                f"{len(tasks) / elapsed:>10,.0f}"
+            )
+            channel.queue_purge(QUEUE)
+    finally:
+        channel.queue_purge(QUEUE)
+        connection.close()
+        manager.close()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    setup_logging(args.verbose)
+    main(args)
@@ -0,0 +1,116 @@
+import time
+import uuid
+from argparse import ArgumentParser, Namespace
+from typing import Callable
+
+from pymongo.read_preferences import ReadPreference
+
+from src.core import config
+from src.core.logging import get_logger, setup_logging
+from src.models import TaskCursor
+from src.services import MongoDBManager
+
+logger = get_logger("benchmark_results")
+
+FINISHED = ["DONE", "ERROR", "CANCELLED"]
+INSERT_CHUNK = 10_000
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(
+        description="Measure result handling throughput as the number of tasks per request grows. "
+        "Writes benchmark-* owners to the configured MongoDB and deletes them afterwards."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000, 1_000_000],
+        help="Tasks per request",
+    )
+    parser.add_argument("--results", type=int, default=2_000, help="Results handled per size")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    return parser.parse_args()
+
+
+def seed_owner(mongo: MongoDBManager, tasks: int) -> tuple[str, list[str]]:
+    """Create a cursor whose tasks are all dispatched and unfinished."""
+    assert mongo.tasks is not None and mongo.cursors is not None
+    owner_id = f"benchmark-{uuid.uuid4()}"
+    cursor = TaskCursor(owner_id, max_length=8, total_combinations=tasks).to_dict()
+    cursor.update(nextIndex=tasks, outstanding=tasks, exhausted=True)
+    mongo.cursors.insert_one(cursor)
+
+    task_ids = [str(uuid.uuid4()) for _ in range(tasks)]
+    for offset in range(0, tasks, INSERT_CHUNK):
+        mongo.tasks.insert_many(
+            [
+                {"taskId": task_id, "requestId": owner_id, "status": "QUEUED", "count": 1}
+                for task_id in task_ids[offset : offset + INSERT_CHUNK]
+            ],
+            ordered=False,
+        )
+    return owner_id, task_ids
+
+
+def count_scans(mongo: MongoDBManager, owner_id: str, task_ids: list[str]) -> None:
+    """The pre-counter path: finish each task, then count the request's tasks twice."""
+    assert mongo.tasks is not None
+    primary_tasks = mongo.tasks.with_options(read_preference=ReadPreference.PRIMARY)
+    for task_id in task_ids:
+        mongo.tasks.update_one(
+            {"taskId": task_id, "status": {"$nin": FINISHED}}, {"$set": {"status": "DONE"}}
+        )
+        total = primary_tasks.count_documents({"requestId": owner_id})
+        completed = primary_tasks.count_documents(
+            {"requestId": owner_id, "status": {"$in": FINISHED}}
+        )
+        if completed == total:
+            logger.debug(f"{owner_id} complete")
+
+
+def counters(mongo: MongoDBManager, owner_id: str, task_ids: list[str]) -> None:
+    """The current path: batches through mark_tasks_done_once and the returned cursor."""
+    for offset in range(0, len(task_ids), config.RESULT_BATCH_SIZE):
+        results = [
+            {"taskId": task_id, "requestId": owner_id, "status": "DONE", "results": []}
+            for task_id in task_ids[offset : offset + config.RESULT_BATCH_SIZE]
+        ]
+        cursor = mongo.mark_tasks_done_once(results).get(owner_id)
+        if cursor is not None and cursor["exhausted"] and cursor["outstanding"] <= 0:
+            logger.debug(f"{owner_id} complete")
+
+
+def main(args: Namespace) -> None:
+    mongo = MongoDBManager()
+    assert mongo.tasks is not None and mongo.cursors is not None
+    paths: dict[str, Callable[[MongoDBManager, str, list[str]], None]] = {
+        "count-scans": count_scans,
+        "counters": counters,
+    }
+    owners: list[str] = []
+
+    print(f"{'path':<12} {'tasks/req':>10} {'results':>8} {'seconds':>8} {'results/s':>10}")
+    try:
+        for size in args.sizes:
+            for name, handle in paths.items():
+                owner_id, task_ids = seed_owner(mongo, size)
+                owners.append(owner_id)
+                handled = task_ids[: args.results]
+
+                started = time.perf_counter()
+                handle(mongo, owner_id, handled)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{name:<12} {size:>10} {len(handled):>8} {elapsed:>8.2f} "
+                    f"{len(handled) / elapsed:>10,.0f}"
+                )
+    finally:
+        mongo.tasks.delete_many({"requestId": {"$in": owners}})
+        mongo.cursors.delete_many({"ownerId": {"$in": owners}})
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    setup_logging(args.verbose)
+    main(args)
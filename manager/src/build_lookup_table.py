@@ -0,0 +1,25 @@
+from argparse import ArgumentParser, Namespace
+
+from src.core import config
+from src.core.logging import get_logger, setup_logging
+from src.services.lookup_table import LookupTable
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Build the precomputed md5 lookup table")
+    parser.add_argument("--path", default=config.LOOKUP_TABLE_PATH, help="Output table file")
+    parser.add_argument(
+        "--length",
+        type=int,
+        default=config.LOOKUP_TABLE_LENGTH,
+        help="Longest candidate length stored in the table",
+    )
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    setup_logging(args.verbose)
+    get_logger("build_lookup_table").info(f"Building lookup table up to length {args.length}")
+    LookupTable.build(args.path, args.length)
@@ -3,6 +3,12 @@ from typing import Final
 from decouple import config
 
 TASK_SIZE: Final = int(config("TASK_SIZE", default="100000"))
+TARGET_TASK_DURATION: Final = float(config("TARGET_TASK_DURATION", default="5"))
+MIN_TASK_SIZE: Final = int(config("MIN_TASK_SIZE", default="10000"))
+MAX_TASK_SIZE: Final = int(config("MAX_TASK_SIZE", default="50000000"))
+THROUGHPUT_SMOOTHING: Final = 0.2
+MIN_SPLIT_SIZE: Final = int(config("MIN_SPLIT_SIZE", default="100000"))
+SPLIT_ACK_TIMEOUT: Final = float(config("SPLIT_ACK_TIMEOUT", default="30"))
 
 ALPHABET: Final = "abcdefghijklmnopqrstuvwxyz0123456789"
 ALPHABET_SIZE: Final = len(ALPHABET)
@@ -24,12 +30,49 @@ RABBITMQ_PORT: Final = int(config("RABBITMQ_PORT", default="5672"))
 RABBITMQ_USER: Final = config("RABBITMQ_USER", default="guest")
 RABBITMQ_PASS: Final = config("RABBITMQ_PASS", default="guest")
 RABBITMQ_CONNECTION_SETTINGS = {"heartbeat": 600, "blocked_connection_timeout": 300}
+PUBLISH_BATCH_SIZE: Final = int(config("PUBLISH_BATCH_SIZE", default="500"))
+PUBLISH_CONFIRM_TIMEOUT: Final = 30
+CANCEL_EXCHANGE: Final = "cancel.exchange"
+RESULT_BATCH_SIZE: Final = int(config("RESULT_BATCH_SIZE", default="100"))
+RESULT_BATCH_TIMEOUT: Final = float(config("RESULT_BATCH_TIMEOUT", default="0.05"))
+RESULT_MAX_ATTEMPTS: Final = 2
+CURSOR_FINISH_TOKENS: Final = 256
 
 MAX_RETRIES: Final = 5
 RETRY_DELAY: Final = 2
 RETRY_CHECK_INTERVAL: Final = 30
 RETRY_BACKOFF_MULTIPLIER: Final = 1.5
 
+DISPATCH_WINDOW: Final = int(config("DISPATCH_WINDOW", default="1000"))
+DISPATCH_INTERVAL: Final = 1.0
+QUEUE_DEPTH_PER_CONSUMER: Final = int(config("QUEUE_DEPTH_PER_CONSUMER", default="4"))
+QUEUE_MIN_DEPTH: Final = int(config("QUEUE_MIN_DEPTH", default="10"))
+
+ASYNC_API_PORT: Final = int(config("ASYNC_API_PORT", default="5056"))
+RUN_BACKGROUND_SERVICES: Final = config("RUN_BACKGROUND_SERVICES", default="true", cast=bool)
+STATUS_STREAM_KEEPALIVE: Final = float(config("STATUS_STREAM_KEEPALIVE", default="15"))
+STATUS_STREAM_REFRESH: Final = float(config("STATUS_STREAM_REFRESH", default="30"))
+MAX_STATUS_BATCH_SIZE: Final = int(config("MAX_STATUS_BATCH_SIZE", default="100000"))
+STATUS_BATCH_CHUNK_SIZE: Final = int(config("STATUS_BATCH_CHUNK_SIZE", default="1000"))
+STATUS_LONG_POLL_TIMEOUT: Final = float(config("STATUS_LONG_POLL_TIMEOUT", default="30"))
+WAITRESS_THREADS: Final = int(config("WAITRESS_THREADS", default="32"))
+# Streams and long polls hold a waitress thread each; the rest serve short requests.
+MAX_STATUS_STREAMS: Final = int(config("MAX_STATUS_STREAMS", default="16"))
+
 MAX_HASH_LENGTH: Final = 32
 MAX_ALLOWED_LENGTH: Final = 8
 MIN_ALLOWED_LENGTH: Final = 1
+MIN_PRIORITY: Final = 0
+MAX_PRIORITY: Final = 9
+MAX_BATCH_SIZE: Final = int(config("MAX_BATCH_SIZE", default="1000"))
+IMPORT_BATCH_SIZE: Final = int(config("IMPORT_BATCH_SIZE", default="1000"))
+
+SOLVED_CACHE_SIZE: Final = int(config("SOLVED_CACHE_SIZE", default="10000"))
+STATUS_CACHE_SIZE: Final = int(config("STATUS_CACHE_SIZE", default="10000"))
+STATUS_CACHE_TTL: Final = float(config("STATUS_CACHE_TTL", default="1"))
+
+LOOKUP_TABLE_PATH: Final = config("LOOKUP_TABLE_PATH", default="lookup/md5.lut")
+LOOKUP_TABLE_LENGTH: Final = int(config("LOOKUP_TABLE_LENGTH", default="5"))
+
+RAINBOW_TABLE_DIR: Final = config("RAINBOW_TABLE_DIR", default="rainbow")
+RAINBOW_COLUMNS_PER_TASK: Final = int(config("RAINBOW_COLUMNS_PER_TASK", default="50"))
@@ -0,0 +1,203 @@
+import sys
+import time
+import uuid
+from argparse import ArgumentParser, Namespace
+from contextlib import AbstractContextManager, ExitStack, nullcontext
+from typing import IO, Iterable
+
+import orjson
+
+from src.api import ApiError, add_table_matches, build_cursor, is_answered, parse_crack
+from src.core import config
+from src.core.logging import get_logger, setup_logging
+from src.models import CrackRequest
+from src.services import LookupTable, MongoDBManager, SolvedHashCache
+
+logger = get_logger("import_requests")
+
+PROGRESS_LOG_INTERVAL = 5.0
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Create crack requests from a JSONL file")
+    parser.add_argument(
+        "path",
+        help='JSONL file with one {"hash", "maxLength"[, "findAll", "priority"]} object per line, '
+        "or - for stdin",
+    )
+    parser.add_argument(
+        "--report", default="-", help="File for per-line outcomes as NDJSON, - for stdout"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=config.IMPORT_BATCH_SIZE,
+        help="Lines validated and inserted together",
+    )
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    return parser.parse_args()
+
+
+def open_stream(path: str, mode: str, stdio: IO[bytes]) -> AbstractContextManager[IO[bytes]]:
+    """Open path, or hand out stdio without closing it when path is -."""
+    return nullcontext(stdio) if path == "-" else open(path, mode)
+
+
+def parse_line(line: bytes) -> tuple[dict | None, str | None]:
+    """Decode and validate one line, returning the entry or an error message."""
+    try:
+        target_hash, max_length, find_all, priority = parse_crack(orjson.loads(line))
+    except orjson.JSONDecodeError:
+        return None, "Invalid JSON"
+    except ApiError as e:
+        return None, str(e)
+
+    return {
+        "hash": target_hash,
+        "maxLength": max_length,
+        "findAll": find_all,
+        "priority": priority,
+    }, None
+
+
+class RequestImporter:
+    """Turn a stream of JSONL lines into crack requests, batch_size lines at a time.
+
+    Lines in a batch that share maxLength, findAll and priority become one
+    batch request, so they are searched by a single cursor the same way the
+    /api/hash/crack/batch endpoint does. Only one batch is held in memory.
+    """
+
+    def __init__(
+        self,
+        mongo: MongoDBManager,
+        solved_cache: SolvedHashCache,
+        lookup_table: LookupTable,
+        batch_size: int = config.IMPORT_BATCH_SIZE,
+    ) -> None:
+        self.mongo = mongo
+        self.solved_cache = solved_cache
+        self.lookup_table = lookup_table
+        self.batch_size = max(1, batch_size)
+        self.counts = {"lines": 0, "created": 0, "ready": 0, "rejected": 0}
+
+    def run(self, lines: Iterable[bytes], report: IO[bytes]) -> dict[str, int]:
+        started = time.monotonic()
+        next_log = started + PROGRESS_LOG_INTERVAL
+        batch: list[tuple[int, dict]] = []
+
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            self.counts["lines"] += 1
+
+            entry, error = parse_line(line)
+            if entry is None:
+                self.counts["rejected"] += 1
+                report.write(orjson.dumps({"line": line_number, "error": error}) + b"\n")
+            else:
+                batch.append((line_number, entry))
+
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch, report)
+                batch = []
+
+            if time.monotonic() >= next_log:
+                next_log += PROGRESS_LOG_INTERVAL
+                self._log_rate(started)
+
+        if batch:
+            self._import_batch(batch, report)
+        report.flush()
+        self._log_rate(started)
+        return self.counts
+
+    def _log_rate(self, started: float) -> None:
+        elapsed = max(time.monotonic() - started, 1e-9)
+        logger.info(
+            f"{self.counts['lines']} lines in {elapsed:.1f}s ({self.counts['lines'] / elapsed:.0f} lines/s): "
+            f"{self.counts['created']} scheduled, {self.counts['ready']} already known, "
+            f"{self.counts['rejected']} rejected"
+        )
+
+    def _lookup_known(self, target_hash: str, max_length: int) -> tuple[list[str], int]:
+        results, searched_length = self.solved_cache.lookup(target_hash, max_length)
+        return add_table_matches(
+            self.lookup_table, target_hash, max_length, results, searched_length
+        )
+
+    def _import_batch(self, batch: list[tuple[int, dict]], report: IO[bytes]) -> None:
+        groups: dict[tuple[int, bool, int], dict] = {}
+        requests: list[tuple[int, CrackRequest]] = []
+
+        for line_number, entry in batch:
+            key = (entry["maxLength"], entry["findAll"], entry["priority"])
+            group = groups.setdefault(
+                key, {"batchId": str(uuid.uuid4()), "hashes": [], "searched": entry["maxLength"]}
+            )
+            request_obj = CrackRequest(entry["hash"], entry["maxLength"], group["batchId"])
+            request_obj.results, searched = self._lookup_known(entry["hash"], entry["maxLength"])
+            if is_answered(request_obj.results, searched, entry["maxLength"], entry["findAll"]):
+                request_obj.status = "READY"
+            else:
+                group["hashes"].append(entry["hash"])
+                group["searched"] = min(group["searched"], searched)
+            requests.append((line_number, request_obj))
+
+        try:
+            self.mongo.insert_requests([request_obj.to_dict() for _, request_obj in requests])
+            for (max_length, find_all, priority), group in groups.items():
+                if not group["hashes"]:
+                    continue
+                cursor = build_cursor(
+                    group["batchId"],
+                    max_length,
+                    target_hashes=list(dict.fromkeys(group["hashes"])),
+                    find_all=find_all,
+                    searched_length=group["searched"],
+                    priority=priority,
+                )
+                self.mongo.insert_cursor(cursor.to_dict())
+        except Exception as e:
+            logger.error(f"Failed to import lines {batch[0][0]}-{batch[-1][0]}: {e}")
+            # Requests of a group whose cursor is missing would stay IN_PROGRESS forever.
+            try:
+                self.mongo.delete_batches([group["batchId"] for group in groups.values()])
+            except Exception as cleanup_error:
+                logger.error(
+                    f"Failed to roll back lines {batch[0][0]}-{batch[-1][0]}: {cleanup_error}"
+                )
+            for line_number, _ in requests:
+                report.write(orjson.dumps({"line": line_number, "error": "Import failed"}) + b"\n")
+            self.counts["rejected"] += len(requests)
+            return
+
+        for line_number, request_obj in requests:
+            self.counts["ready" if request_obj.status == "READY" else "created"] += 1
+            report.write(
+                orjson.dumps(
+                    {
+                        "line": line_number,
+                        "requestId": request_obj.request_id,
+                        "status": request_obj.status,
+                    }
+                )
+                + b"\n"
+            )
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    setup_logging(args.verbose)
+
+    mongo = MongoDBManager()
+    lookup_table = LookupTable()
+    importer = RequestImporter(mongo, SolvedHashCache(mongo), lookup_table, args.batch_size)
+
+    with ExitStack() as stack:
+        stack.callback(lookup_table.close)
+        source = stack.enter_context(open_stream(args.path, "rb", sys.stdin.buffer))
+        report = stack.enter_context(open_stream(args.report, "wb", sys.stdout.buffer))
+        counts = importer.run(source, report)
+
+    sys.exit(1 if counts["rejected"] else 0)
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from argparse import ArgumentParser, Namespace
+
+import httpx
+
+from src.core.logging import get_logger, setup_logging
+
+logger = get_logger("load_test")
+
+KINDS = ("crack", "status")
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(
+        description="Compare manager API stacks under mixed crack and status traffic"
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        required=True,
+        metavar="NAME=URL",
+        help="Stack to test, e.g. flask=http://localhost:5055 (repeatable)",
+    )
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load per target")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients")
+    parser.add_argument(
+        "--status-ratio", type=float, default=0.9, help="Share of requests that are status polls"
+    )
+    parser.add_argument("--max-length", type=int, default=4, help="maxLength of crack requests")
+    parser.add_argument(
+        "--seed-requests", type=int, default=20, help="Requests to poll from the start"
+    )
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    return parser.parse_args()
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def submit(client: httpx.AsyncClient, max_length: int) -> httpx.Response:
+    # Random digests are never in the solved index, so every submission takes
+    # the full path down to cursor creation.
+    return await client.post(
+        "/api/hash/crack", json={"hash": os.urandom(16).hex(), "maxLength": max_length}
+    )
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    args: Namespace,
+    deadline: float,
+    request_ids: list[str],
+    latencies: dict[str, list[float]],
+    errors: dict[str, int],
+) -> None:
+    while time.monotonic() < deadline:
+        kind = "status" if random.random() < args.status_ratio else "crack"
+        start = time.perf_counter()
+        try:
+            if kind == "status":
+                response = await client.get(
+                    "/api/hash/status", params={"requestId": random.choice(request_ids)}
+                )
+            else:
+                response = await submit(client, args.max_length)
+        except httpx.HTTPError as e:
+            logger.debug(f"{kind} request failed: {e}")
+            errors[kind] += 1
+            continue
+
+        latencies[kind].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors[kind] += 1
+        elif kind == "crack":
+            request_ids.append(response.json()["requestId"])
+
+
+async def load_target(name: str, url: str, args: Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        request_ids = []
+        for _ in range(args.seed_requests):
+            response = await submit(client, args.max_length)
+            response.raise_for_status()
+            request_ids.append(response.json()["requestId"])
+
+        latencies: dict[str, list[float]] = {kind: [] for kind in KINDS}
+        errors = dict.fromkeys(KINDS, 0)
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                run_client(client, args, deadline, request_ids, latencies, errors)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.monotonic() - started
+
+    for kind in KINDS:
+        samples = latencies[kind]
+        print(
+            f"{name:<10} {kind:<7} {len(samples):>9} {errors[kind]:>7} "
+            f"{len(samples) / elapsed:>9.1f} {percentile(samples, 0.5) * 1000:>9.1f} "
+            f"{percentile(samples, 0.99) * 1000:>9.1f}"
+        )
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{name:<10} {'total':<7} {total:>9} {sum(errors.values()):>7} {total / elapsed:>9.1f}")
+
+
+async def main(args: Namespace) -> None:
+    print(
+        f"{'target':<10} {'kind':<7} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9}"
+    )
+    for target in args.target:
+        name, _, url = target.partition("=")
+        logger.info(f"Loading {name} at {url} for {args.duration:.0f}s")
+        await load_target(name, url, args)
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    setup_logging(args.verbose)
+    # httpx logs every request at INFO, which would dominate the client's own cost.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main(args))
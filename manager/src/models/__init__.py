@@ -1,4 +1,5 @@
+from .cursor import TaskCursor
 from .request import CrackRequest
 from .task import Task
 
-__all__ = ["CrackRequest", "Task"]
+__all__ = ["CrackRequest", "Task", "TaskCursor"]
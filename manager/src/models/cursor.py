@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from typing import Any
+
+
+class TaskCursor:
+    def __init__(
+        self,
+        owner_id: str,
+        max_length: int,
+        total_combinations: int,
+        task_size: int | None = None,
+        target_hash: str | None = None,
+        target_hashes: list[str] | None = None,
+        find_all: bool = False,
+        start_index: int = 0,
+        task_type: str = "bruteforce",
+        table_id: str | None = None,
+        fallback_index: int = 0,
+        priority: int = 0,
+    ) -> None:
+        self.owner_id = owner_id
+        self.find_all = find_all
+        self.max_length = max_length
+        self.target_hash = target_hash.lower() if target_hash else None
+        self.target_hashes = [h.lower() for h in target_hashes] if target_hashes else None
+        self.total_combinations = total_combinations
+        # Only rainbow cursors have a fixed task size; brute-force tasks are
+        # sized from observed throughput when they are dispatched.
+        self.task_size = task_size
+        self.start_index = start_index
+        self.next_index = start_index
+        self.outstanding = 0
+        self.completed_tasks = 0
+        self.completed_combinations = 0
+        self.done_tasks = 0
+        self.error_tasks = 0
+        self.cancelled_tasks = 0
+        self.exhausted = start_index >= total_combinations
+        self.cancelled = False
+        self.task_type = task_type
+        self.table_id = table_id
+        self.fallback_index = fallback_index
+        self.priority = priority
+        # maxLengths of followers that finish once this cursor has searched their keyspace.
+        self.follower_lengths: list[int] = []
+        self.first_dispatch_at: datetime | None = None
+        self.created_at = datetime.now(timezone.utc)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "ownerId": self.owner_id,
+            "maxLength": self.max_length,
+            "targetHash": self.target_hash,
+            "targetHashes": self.target_hashes,
+            "totalCombinations": self.total_combinations,
+            "taskSize": self.task_size,
+            "startIndex": self.start_index,
+            "nextIndex": self.next_index,
+            "outstanding": self.outstanding,
+            "completedTasks": self.completed_tasks,
+            "completedCombinations": self.completed_combinations,
+            "doneTasks": self.done_tasks,
+            "errorTasks": self.error_tasks,
+            "cancelledTasks": self.cancelled_tasks,
+            "exhausted": self.exhausted,
+            "findAll": self.find_all,
+            "cancelled": self.cancelled,
+            "taskType": self.task_type,
+            "tableId": self.table_id,
+            "fallbackIndex": self.fallback_index,
+            "priority": self.priority,
+            "followerLengths": self.follower_lengths,
+            "firstDispatchAt": self.first_dispatch_at,
+            "created_at": self.created_at,
+        }
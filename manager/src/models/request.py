@@ -4,17 +4,19 @@ from typing import Any
 
 
 class CrackRequest:
-    def __init__(self, target_hash: str, max_length: int) -> None:
+    def __init__(self, target_hash: str, max_length: int, batch_id: str | None = None) -> None:
         self.request_id = str(uuid.uuid4())
         self.hash = target_hash.lower()
         self.max_length = max_length
+        self.batch_id = batch_id
         self.status = "IN_PROGRESS"
         self.results: list[str] = []
         self.created_at = datetime.now(timezone.utc)
         self.updated_at = self.created_at
+        self.leader_id: str | None = None
 
     def to_dict(self) -> dict[str, Any]:
-        return {
+        data = {
             "requestId": self.request_id,
             "hash": self.hash,
             "maxLength": self.max_length,
@@ -23,13 +25,33 @@ class CrackRequest:
             "created_at": self.created_at,
             "updated_at": self.updated_at,
         }
+        if self.batch_id:
+            data["batchId"] = self.batch_id
+        if self.leader_id:
+            data["leaderId"] = self.leader_id
+        return data
+
+    @staticmethod
+    def status_payload(request_data: dict, max_length: int, progress: int | None = None) -> dict:
+        """Client-facing status of a stored request.
+
+        max_length trims results when a follower reports its leader's document.
+        """
+        status = request_data["status"]
+        if status == "IN_PROGRESS" and progress is not None:
+            return {"status": status, "progress": progress}
+        if status == "READY":
+            results = [r for r in request_data.get("results", []) if len(r) <= max_length]
+            return {"status": status, "results": results}
+        return {"status": status}
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "CrackRequest":
-        request = cls(data["hash"], data["maxLength"])
+        request = cls(data["hash"], data["maxLength"], data.get("batchId"))
         request.request_id = data["requestId"]
         request.status = data["status"]
         request.results = data.get("results", [])
+        request.leader_id = data.get("leaderId")
         request.created_at = data.get("created_at", datetime.now(timezone.utc))
         request.updated_at = data.get("updated_at", datetime.now(timezone.utc))
         return request
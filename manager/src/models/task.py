@@ -9,15 +9,29 @@ class Task:
         request_id: str,
         start_index: int,
         count: int,
-        target_hash: str,
+        target_hash: str | None,
         max_length: int,
+        target_hashes: list[str] | None = None,
+        task_type: str = "bruteforce",
+        table_id: str | None = None,
+        length: int | None = None,
+        prefix: str | None = None,
+        suffix_start: int | None = None,
+        task_size: int | None = None,
     ) -> None:
         self.task_id = str(uuid.uuid4())
         self.request_id = request_id
         self.start_index = start_index
         self.count = count
-        self.target_hash = target_hash.lower()
+        self.target_hash = target_hash.lower() if target_hash else None
+        self.target_hashes = [h.lower() for h in target_hashes] if target_hashes else None
         self.max_length = max_length
+        self.task_type = task_type
+        self.table_id = table_id
+        self.length = length
+        self.prefix = prefix
+        self.suffix_start = suffix_start
+        self.task_size = task_size
         self.status = "PENDING"
         self.created_at = datetime.now(timezone.utc)
         self.completed_at: datetime | None = None
@@ -37,6 +51,13 @@ class Task:
             "completed_at": self.completed_at,
             "results": self.results,
             "needs_retry": self.needs_retry,
+            "targetHashes": self.target_hashes,
+            "taskType": self.task_type,
+            "tableId": self.table_id,
+            "length": self.length,
+            "prefix": self.prefix,
+            "suffixStart": self.suffix_start,
+            "taskSize": self.task_size,
         }
 
     def to_message(self) -> dict[str, Any]:
@@ -46,7 +67,33 @@ class Task:
             "startIndex": self.start_index,
             "count": self.count,
             "targetHash": self.target_hash,
+            "targetHashes": self.target_hashes,
             "maxLength": self.max_length,
+            "taskType": self.task_type,
+            "tableId": self.table_id,
+            "length": self.length,
+            "prefix": self.prefix,
+            "suffixStart": self.suffix_start,
+        }
+
+    @staticmethod
+    def message_from_dict(data: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "taskId": data["taskId"],
+            "requestId": data["requestId"],
+            "startIndex": data["startIndex"],
+            "count": data["count"],
+            "targetHash": data.get("targetHash"),
+            "targetHashes": data.get("targetHashes"),
+            "maxLength": data["maxLength"],
+            "taskType": data.get("taskType", "bruteforce"),
+            "tableId": data.get("tableId"),
+            "length": data.get("length"),
+            "prefix": data.get("prefix"),
+            "suffixStart": data.get("suffixStart"),
+            # Requeued tasks resume from the last checkpoint a worker reported.
+            "resumeFrom": min(data.get("checkpoint", 0), data["count"]),
+            "partialResults": data.get("partialResults", []),
         }
 
     def mark_done(self, results: list[str]) -> None:
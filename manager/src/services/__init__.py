@@ -1,5 +1,23 @@
+from .dispatcher import TaskDispatcher
+from .lookup_table import LookupTable
 from .mongodb import MongoDBManager
 from .rabbitmq import RabbitMQManager
+from .rainbow_catalog import RainbowCatalog
 from .retry import TaskRetryManager
+from .solved_cache import SolvedHashCache
+from .status_bus import StatusBus
+from .status_cache import StatusCache
+from .throughput import ThroughputEstimator
 
-__all__ = ["MongoDBManager", "RabbitMQManager", "TaskRetryManager"]
+__all__ = [
+    "LookupTable",
+    "MongoDBManager",
+    "RabbitMQManager",
+    "RainbowCatalog",
+    "SolvedHashCache",
+    "StatusBus",
+    "StatusCache",
+    "TaskDispatcher",
+    "TaskRetryManager",
+    "ThroughputEstimator",
+]
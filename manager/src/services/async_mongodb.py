@@ -0,0 +1,150 @@
+from typing import cast
+
+from pymongo import AsyncMongoClient, WriteConcern
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import DuplicateKeyError
+from pymongo.read_preferences import ReadPreference
+
+from src.core import config
+from src.core.logging import get_logger
+from src.services.mongodb import PROGRESS_PROJECTION, STATUS_PROJECTION
+from src.utils import cursor_progress
+
+logger = get_logger("async_mongodb")
+
+
+class AsyncMongoDBManager:
+    """The request-path subset of MongoDBManager on pymongo's asyncio client.
+
+    Indexes and everything the dispatcher, retry manager and result consumer
+    touch stay with MongoDBManager; this class only serves the API handlers,
+    with the same collections, write concerns and read preferences.
+    """
+
+    def __init__(self) -> None:
+        self.uri = config.MONGO_URI
+        self.client: AsyncMongoClient | None = None
+        self.requests: AsyncCollection | None = None
+        self.tasks: AsyncCollection | None = None
+        self.cursors: AsyncCollection | None = None
+        self.solved: AsyncCollection | None = None
+
+    async def connect(self) -> None:
+        self.client = AsyncMongoClient(self.uri, **config.MONGO_CONNECTION_SETTINGS)
+        await self.client.admin.command("ping")
+
+        db = self.client.md5_cracker
+        majority = WriteConcern(w="majority", wtimeout=5000)
+        self.requests = db.requests.with_options(write_concern=majority)
+        self.tasks = db.tasks.with_options(write_concern=majority)
+        self.cursors = db.cursors.with_options(
+            write_concern=majority, read_preference=ReadPreference.PRIMARY
+        )
+        self.solved = db.solved.with_options(write_concern=majority)
+        logger.info("Successfully connected to MongoDB (asyncio)")
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    async def ping(self) -> None:
+        if self.client is None:
+            raise RuntimeError("MongoDB client not initialized")
+        await self.client.admin.command("ping")
+
+    async def insert_request(self, request_data: dict) -> str:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+        result = await self.requests.insert_one(request_data)
+        return str(result.inserted_id)
+
+    async def claim_search(self, request_data: dict, find_all: bool) -> bool:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+        try:
+            await self.requests.insert_one({**request_data, "leading": True, "findAll": find_all})
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def insert_requests(self, requests: list[dict]) -> list[str]:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+        result = await self.requests.insert_many(requests)
+        return [str(i) for i in result.inserted_ids]
+
+    async def insert_cursor(self, cursor_data: dict) -> str:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+        result = await self.cursors.insert_one(cursor_data)
+        return str(result.inserted_id)
+
+    async def get_cursor(self, owner_id: str) -> dict | None:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+        return cast(dict | None, await self.cursors.find_one({"ownerId": owner_id}))
+
+    async def add_follower_length(self, owner_id: str, max_length: int) -> None:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+        await self.cursors.update_one(
+            {"ownerId": owner_id}, {"$addToSet": {"followerLengths": max_length}}
+        )
+
+    async def get_request(self, request_id: str, use_secondary: bool = True) -> dict | None:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        collection = self.requests
+        if use_secondary:
+            collection = collection.with_options(read_preference=ReadPreference.SECONDARY)
+
+        return cast(dict | None, await collection.find_one({"requestId": request_id}))
+
+    async def get_requests(self, request_ids: list[str], use_secondary: bool = True) -> list[dict]:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        collection = self.requests
+        if use_secondary:
+            collection = collection.with_options(read_preference=ReadPreference.SECONDARY)
+
+        found = collection.find({"requestId": {"$in": request_ids}}, STATUS_PROJECTION)
+        return cast(list[dict], await found.to_list())
+
+    async def get_cursors_progress(self, owner_ids: list[str]) -> dict[str, int | None]:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        cursors = await self.cursors.aggregate(
+            [{"$match": {"ownerId": {"$in": owner_ids}}}, {"$project": PROGRESS_PROJECTION}]
+        )
+        return {cursor["ownerId"]: cursor_progress(cursor) async for cursor in cursors}
+
+    async def find_leader_requests(self, target_hash: str, max_length: int) -> list[dict]:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        leaders = (
+            self.requests.with_options(read_preference=ReadPreference.PRIMARY)
+            .find(
+                {
+                    "hash": target_hash,
+                    "status": "IN_PROGRESS",
+                    "maxLength": {"$gte": max_length},
+                    "leaderId": {"$exists": False},
+                }
+            )
+            .sort("maxLength", 1)
+        )
+        return cast(list[dict], await leaders.to_list())
+
+    async def get_solved(self, target_hash: str) -> dict | None:
+        if self.solved is None:
+            raise RuntimeError("MongoDB not initialized")
+        return cast(dict | None, await self.solved.find_one({"hash": target_hash}, {"_id": 0}))
+
+    async def count_by_status(self, collection: AsyncCollection, status: str) -> int:
+        primary = collection.with_options(read_preference=ReadPreference.PRIMARY)
+        return cast(int, await primary.count_documents({"status": status}))
@@ -0,0 +1,225 @@
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from threading import Thread
+from typing import cast
+
+from src.core import config
+from src.core.logging import get_logger
+from src.models import Task
+from src.services.mongodb import MongoDBManager
+from src.services.rabbitmq import RabbitMQManager
+from src.services.throughput import ThroughputEstimator
+from src.utils import (
+    create_length_partitions,
+    create_task_partitions,
+    observe_request_wait,
+    set_dispatcher_lag_source,
+    update_dispatch_publish_rate,
+    update_task_queue,
+)
+
+logger = get_logger("dispatcher")
+
+
+class TaskDispatcher:
+    def __init__(
+        self,
+        mongo: "MongoDBManager",
+        rabbitmq: "RabbitMQManager",
+        throughput: "ThroughputEstimator | None" = None,
+    ) -> None:
+        self.mongo = mongo
+        self.rabbitmq = rabbitmq
+        self.throughput = throughput
+        self.running = True
+        self.thread: threading.Thread | None = None
+        self.wakeup = threading.Event()
+        self.last_cycle = time.time()
+        set_dispatcher_lag_source(lambda: time.time() - self.last_cycle)
+
+    def start(self) -> None:
+        if self.thread and self.thread.is_alive():
+            return
+        self.running = True
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logger.info("Task dispatcher started")
+
+    def stop(self) -> None:
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+        logger.info("Task dispatcher stopped")
+
+    def wake(self) -> None:
+        self.wakeup.set()
+
+    def _run(self) -> None:
+        while self.running:
+            try:
+                dispatched = self._dispatch_cycle()
+                now = time.time()
+                elapsed = now - self.last_cycle
+                update_dispatch_publish_rate(dispatched / elapsed if elapsed > 0 else 0.0)
+                self.last_cycle = now
+                if dispatched:
+                    logger.debug(f"Dispatched {dispatched} tasks")
+            except Exception as e:
+                logger.error(f"Error in dispatcher: {e}")
+
+            self.wakeup.wait(config.DISPATCH_INTERVAL)
+            self.wakeup.clear()
+
+    def _queue_budget(self) -> int:
+        depth, consumers = self.rabbitmq.get_queue_depth()
+        update_task_queue(depth, consumers)
+        target = max(config.QUEUE_MIN_DEPTH, config.QUEUE_DEPTH_PER_CONSUMER * consumers)
+        return target - depth
+
+    def _dispatch_cycle(self) -> int:
+        cursors = self.mongo.get_open_cursors()
+        draining = self.mongo.get_draining_cursors()
+        if not cursors and not draining:
+            return 0
+
+        budget = self._queue_budget()
+        if budget <= 0:
+            return 0
+
+        # Cursors with nothing left to dispatch can still hold large in-flight
+        # tasks; idle queue capacity is used to split their tails off.
+        for cursor in draining:
+            if budget <= 0:
+                break
+            budget -= self._steal_work(cursor, budget)
+        if not cursors or budget <= 0:
+            return 0
+
+        # Shortest remaining work goes first so small requests are not starved by
+        # huge ones, and each round splits the budget by priority weight.
+        active = sorted(cursors, key=lambda c: (-c.get("priority", 0), self._remaining(c)))
+        dispatched = 0
+
+        while budget > 0 and active:
+            total_weight = sum(self._weight(cursor) for cursor in active)
+            round_budget = budget
+            still_active = []
+            for cursor in active:
+                if budget <= 0:
+                    break
+                share = max(1, round_budget * self._weight(cursor) // total_weight)
+                sent = self._dispatch_cursor(cursor, min(share, budget))
+                budget -= sent
+                dispatched += sent
+                if sent and not cursor["exhausted"]:
+                    still_active.append(cursor)
+            active = still_active
+
+        return dispatched
+
+    @staticmethod
+    def _weight(cursor: dict) -> int:
+        return 1 + cast(int, cursor.get("priority", 0))
+
+    @staticmethod
+    def _remaining(cursor: dict) -> int:
+        return cast(int, cursor["totalCombinations"] - cursor["nextIndex"])
+
+    def _steal_work(self, cursor: dict, limit: int) -> int:
+        tasks = self.mongo.get_splittable_tasks(cursor["ownerId"], 2 * config.MIN_SPLIT_SIZE)
+        tasks.sort(key=lambda task: task["count"] - task["checkpoint"], reverse=True)
+
+        requested = 0
+        for task in tasks[:limit]:
+            # Splitting halfway through the unscanned part leaves the holder room
+            # to keep going while the request travels.
+            keep = task["checkpoint"] + (task["count"] - task["checkpoint"]) // 2
+            if not self.mongo.mark_split_requested(task["taskId"]):
+                continue
+            if self.rabbitmq.publish_split(task["taskId"], keep):
+                requested += 1
+            else:
+                self.mongo.clear_split_requested(task["taskId"])
+        if requested:
+            logger.info(f"Requested {requested} splits for {cursor['ownerId']}")
+        return requested
+
+    def _dispatch_cursor(self, cursor: dict, limit: int) -> int:
+        free_slots = min(limit, config.DISPATCH_WINDOW - cursor["outstanding"])
+        if free_slots <= 0:
+            return 0
+
+        if cursor.get("taskType") == "rainbow":
+            task_size = cursor["taskSize"]
+            partitions = create_task_partitions(
+                cursor["totalCombinations"], task_size, cursor["nextIndex"]
+            )
+        else:
+            task_size = (
+                self.throughput.task_size() if self.throughput is not None else config.TASK_SIZE
+            )
+            partitions = create_length_partitions(
+                cursor["totalCombinations"], task_size, cursor["nextIndex"]
+            )
+
+        tasks = [
+            Task(
+                request_id=cursor["ownerId"],
+                start_index=partition["start_index"],
+                count=partition["count"],
+                target_hash=cursor.get("targetHash"),
+                max_length=cursor["maxLength"],
+                target_hashes=cursor.get("targetHashes"),
+                task_type=cursor.get("taskType", "bruteforce"),
+                table_id=cursor.get("tableId"),
+                length=partition.get("length"),
+                prefix=partition.get("prefix"),
+                suffix_start=partition.get("suffix_start"),
+                task_size=task_size,
+            )
+            for partition in islice(partitions, free_slots)
+        ]
+        if not tasks:
+            return 0
+
+        # The task documents go in before the range is claimed: a claimed range
+        # with no tasks behind it would never be searched, while tasks whose
+        # claim loses can simply be deleted again.
+        end_index = tasks[-1].start_index + tasks[-1].count
+        task_ids = [task.task_id for task in tasks]
+        try:
+            self.mongo.insert_tasks([task.to_dict() for task in tasks])
+            claimed = self.mongo.claim_range(cursor, end_index, len(tasks))
+        except Exception:
+            # Either a partial insert or a claim the driver could not retry;
+            # the range stays unclaimed, so none of these tasks may survive.
+            self.mongo.delete_tasks(task_ids)
+            raise
+        if not claimed:
+            logger.warning(f"Cursor for {cursor['ownerId']} moved concurrently, skipping")
+            self.mongo.delete_tasks(task_ids)
+            return 0
+
+        if cursor.get("firstDispatchAt") is None:
+            created_at = cursor["created_at"]
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            observe_request_wait(
+                (datetime.now(timezone.utc) - created_at).total_seconds(),
+                cursor.get("priority", 0),
+            )
+            cursor["firstDispatchAt"] = datetime.now(timezone.utc)
+
+        cursor["nextIndex"] = end_index
+        cursor["outstanding"] += len(tasks)
+        cursor["exhausted"] = end_index >= cursor["totalCombinations"]
+
+        _, failed_tasks = self.rabbitmq.publish_tasks([task.to_message() for task in tasks])
+        if failed_tasks:
+            logger.warning(f"Failed to publish tasks: {failed_tasks}")
+            self.mongo.mark_tasks_queued(failed_tasks)
+
+        return len(tasks)
@@ -0,0 +1,135 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from contextlib import ExitStack
+from itertools import product
+
+from src.core import config
+from src.core.logging import get_logger
+from src.utils import calculate_total_combinations, index_to_string
+
+logger = get_logger("lookup_table")
+
+MAGIC = b"MD5LUT01"
+HEADER = struct.Struct(">8sIQ")
+DIGEST_SIZE = 8
+INDEX_SIZE = 4
+RECORD_SIZE = DIGEST_SIZE + INDEX_SIZE
+
+
+class LookupTable:
+    """Memory-mapped, digest-sorted table of every candidate up to max_length.
+
+    Records are (truncated digest, keyspace index) pairs, so a lookup is a binary
+    search followed by a full md5 check of each decoded candidate to rule out
+    collisions on the truncated prefix.
+    """
+
+    def __init__(self, path: str = config.LOOKUP_TABLE_PATH) -> None:
+        self.path = path
+        self.max_length = 0
+        self.count = 0
+        self.data: mmap.mmap | None = None
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            logger.info(f"No lookup table at {self.path}, short requests use the queue")
+            return
+
+        magic, max_length, count = HEADER.unpack_from(data)
+        if magic != MAGIC or len(data) != HEADER.size + count * RECORD_SIZE:
+            data.close()
+            logger.error(f"Lookup table {self.path} is corrupt, ignoring it")
+            return
+
+        self.data = data
+        self.max_length = max_length
+        self.count = count
+        logger.info(f"Loaded lookup table {self.path} covering lengths up to {max_length}")
+
+    def lookup(self, target_hash: str) -> list[str]:
+        """Return every candidate up to max_length whose md5 is target_hash."""
+        if self.data is None:
+            return []
+
+        digest = bytes.fromhex(target_hash)
+        key = digest[:DIGEST_SIZE]
+        data = self.data
+
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * RECORD_SIZE
+            if data[offset : offset + DIGEST_SIZE] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        results = []
+        offset = HEADER.size + lo * RECORD_SIZE
+        while offset < len(data) and data[offset : offset + DIGEST_SIZE] == key:
+            index = int.from_bytes(data[offset + DIGEST_SIZE : offset + RECORD_SIZE], "big")
+            candidate = index_to_string(index, self.max_length)
+            if hashlib.md5(candidate.encode()).digest() == digest:
+                results.append(candidate)
+            offset += RECORD_SIZE
+        return results
+
+    def close(self) -> None:
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+    @staticmethod
+    def build(path: str, max_length: int) -> int:
+        """Write a table for every candidate up to max_length and return its record count.
+
+        Records are first spread over 256 bucket files by the leading digest byte,
+        then each bucket is sorted in memory, so peak memory stays at one bucket.
+        """
+        count = calculate_total_combinations(max_length)
+        if count > 1 << (8 * INDEX_SIZE):
+            raise ValueError(f"Length {max_length} does not fit a {INDEX_SIZE}-byte index")
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        alphabet = [bytes((char,)) for char in config.ALPHABET.encode()]
+
+        with tempfile.TemporaryDirectory(dir=directory) as tmp:
+            with ExitStack() as stack:
+                buckets = [
+                    stack.enter_context(open(os.path.join(tmp, f"{i:02x}"), "wb"))
+                    for i in range(256)
+                ]
+                index = 0
+                for length in range(1, max_length + 1):
+                    for prefix in product(alphabet, repeat=length - 1):
+                        base = hashlib.md5(b"".join(prefix))
+                        for suffix in alphabet:
+                            state = base.copy()
+                            state.update(suffix)
+                            digest = state.digest()
+                            buckets[digest[0]].write(
+                                digest[:DIGEST_SIZE] + index.to_bytes(INDEX_SIZE, "big")
+                            )
+                            index += 1
+
+            partial = f"{path}.partial"
+            with open(partial, "wb") as out:
+                out.write(HEADER.pack(MAGIC, max_length, count))
+                for i in range(256):
+                    with open(os.path.join(tmp, f"{i:02x}"), "rb") as bucket_file:
+                        data = bucket_file.read()
+                    records = [data[o : o + RECORD_SIZE] for o in range(0, len(data), RECORD_SIZE)]
+                    records.sort()
+                    out.write(b"".join(records))
+            os.replace(partial, path)
+
+        logger.info(f"Built lookup table {path} with {count} records")
+        return count
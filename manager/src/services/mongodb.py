@@ -1,16 +1,38 @@
-from datetime import datetime, timezone
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import cast
 
-from pymongo import MongoClient, ReturnDocument, WriteConcern
+from pymongo import MongoClient, ReturnDocument, UpdateMany, UpdateOne, WriteConcern
+from pymongo.client_session import ClientSession
 from pymongo.collection import Collection
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.errors import ConnectionFailure, DuplicateKeyError, ServerSelectionTimeoutError
 from pymongo.read_preferences import ReadPreference
 
 from src.core import config
 from src.core.logging import get_logger
-from src.utils import retry
+from src.utils import cursor_progress, retry
 
 logger = get_logger("mongodb")
 
+FINISHED_TASK_STATUSES = ["DONE", "ERROR", "CANCELLED"]
+TASK_STATUS_COUNTERS = {"DONE": "doneTasks", "ERROR": "errorTasks", "CANCELLED": "cancelledTasks"}
+STATUS_PROJECTION = {
+    "_id": 0,
+    "requestId": 1,
+    "batchId": 1,
+    "leaderId": 1,
+    "maxLength": 1,
+    "status": 1,
+    "results": 1,
+}
+PROGRESS_PROJECTION = {
+    "_id": 0,
+    "ownerId": 1,
+    "totalCombinations": 1,
+    "startIndex": 1,
+    "completedCombinations": 1,
+}
+
 
 class MongoDBManager:
     def __init__(self) -> None:
@@ -19,6 +41,9 @@ class MongoDBManager:
         self.db = None
         self.requests: Collection | None = None
         self.tasks: Collection | None = None
+        self.cursors: Collection | None = None
+        self.solved: Collection | None = None
+        self.supports_transactions = False
         self.connect()
 
     @retry(max_attempts=config.MAX_RETRIES, delay=config.RETRY_DELAY)
@@ -26,11 +51,17 @@ class MongoDBManager:
         try:
             self.client = MongoClient(self.uri, **config.MONGO_CONNECTION_SETTINGS)
             self.client.admin.command("ping")
+            self.supports_transactions = self.client.topology_description.topology_type_name in (
+                "ReplicaSetWithPrimary",
+                "Sharded",
+            )
 
             self.db = self.client.md5_cracker
 
             self.requests = self.db.requests
             self.tasks = self.db.tasks
+            self.cursors = self.db.cursors
+            self.solved = self.db.solved
 
             if self.requests is not None:
                 self.requests = self.requests.with_options(
@@ -42,6 +73,17 @@ class MongoDBManager:
                     write_concern=WriteConcern(w="majority", wtimeout=5000)
                 )
 
+            if self.cursors is not None:
+                self.cursors = self.cursors.with_options(
+                    write_concern=WriteConcern(w="majority", wtimeout=5000),
+                    read_preference=ReadPreference.PRIMARY,
+                )
+
+            if self.solved is not None:
+                self.solved = self.solved.with_options(
+                    write_concern=WriteConcern(w="majority", wtimeout=5000)
+                )
+
             self._create_indexes()
 
             logger.info("Successfully connected to MongoDB")
@@ -59,12 +101,32 @@ class MongoDBManager:
             self.requests.create_index("requestId", unique=True)
             self.requests.create_index("status")
             self.requests.create_index("created_at")
+            self.requests.create_index("batchId", sparse=True)
+            self.requests.create_index("leaderId", sparse=True)
+            self.requests.create_index([("hash", 1), ("status", 1)])
+            # At most one in-flight leader per search, so concurrent identical
+            # requests cannot both start one.
+            self.requests.create_index(
+                [("hash", 1), ("maxLength", 1)],
+                unique=True,
+                partialFilterExpression={"leading": True, "status": "IN_PROGRESS"},
+                name="inflight_leader",
+            )
 
         if self.tasks is not None:
             self.tasks.create_index("taskId", unique=True)
             self.tasks.create_index("requestId")
             self.tasks.create_index("status")
             self.tasks.create_index("needs_retry")
+            self.tasks.create_index([("requestId", 1), ("status", 1), ("startIndex", 1)])
+            self.tasks.create_index("finishToken", partialFilterExpression={"counted": False})
+
+        if self.cursors is not None:
+            self.cursors.create_index("ownerId", unique=True)
+            self.cursors.create_index("exhausted")
+
+        if self.solved is not None:
+            self.solved.create_index("hash", unique=True)
 
     def ensure_connection(self) -> None:
         try:
@@ -74,6 +136,11 @@ class MongoDBManager:
             logger.warning(f"MongoDB connection lost: {e}, reconnecting...")
             self.connect()
 
+    def ping(self) -> None:
+        if self.client is None:
+            raise RuntimeError("MongoDB client not initialized")
+        self.client.admin.command("ping")
+
     @retry(max_attempts=3)
     def insert_request(self, request_data: dict) -> str:
         if self.requests is not None:
@@ -81,6 +148,27 @@ class MongoDBManager:
             return str(result.inserted_id)
         raise RuntimeError("MongoDB not initialized")
 
+    def claim_search(self, request_data: dict, find_all: bool) -> bool:
+        """Insert a request as the leader of the search for its hash and maxLength.
+
+        Returns False when another in-flight request already leads that search.
+        """
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        try:
+            self.requests.insert_one({**request_data, "leading": True, "findAll": find_all})
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @retry(max_attempts=3)
+    def insert_requests(self, requests: list[dict]) -> list[str]:
+        if self.requests is not None:
+            result = self.requests.insert_many(requests)
+            return [str(i) for i in result.inserted_ids]
+        raise RuntimeError("MongoDB not initialized")
+
     @retry(max_attempts=3)
     def insert_tasks(self, tasks: list[dict]) -> list[str]:
         if self.tasks is not None:
@@ -88,6 +176,172 @@ class MongoDBManager:
             return [str(i) for i in result.inserted_ids]
         raise RuntimeError("MongoDB not initialized")
 
+    def delete_tasks(self, task_ids: list[str]) -> None:
+        if self.tasks is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        self.tasks.delete_many({"taskId": {"$in": task_ids}})
+
+    @retry(max_attempts=3)
+    def insert_cursor(self, cursor_data: dict) -> str:
+        if self.cursors is not None:
+            result = self.cursors.insert_one(cursor_data)
+            return str(result.inserted_id)
+        raise RuntimeError("MongoDB not initialized")
+
+    def delete_batches(self, batch_ids: list[str]) -> None:
+        """Remove the requests and cursors of batches whose creation failed midway."""
+        if self.requests is None or self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        self.cursors.delete_many({"ownerId": {"$in": batch_ids}})
+        self.requests.delete_many({"batchId": {"$in": batch_ids}})
+
+    def get_cursor(self, owner_id: str) -> dict | None:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+        return cast(dict | None, self.cursors.find_one({"ownerId": owner_id}))
+
+    def get_open_cursors(self) -> list[dict]:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+        return list(self.cursors.find({"exhausted": False}).sort("created_at", 1))
+
+    def get_draining_cursors(self) -> list[dict]:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+        return list(
+            self.cursors.find({"exhausted": True, "cancelled": False, "outstanding": {"$gt": 0}})
+        )
+
+    def claim_range(self, cursor: dict, end_index: int, task_count: int) -> bool:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        fields: dict = {
+            "nextIndex": end_index,
+            "exhausted": end_index >= cursor["totalCombinations"],
+        }
+        if cursor.get("firstDispatchAt") is None:
+            fields["firstDispatchAt"] = datetime.now(timezone.utc)
+
+        result = self.cursors.update_one(
+            {"ownerId": cursor["ownerId"], "nextIndex": cursor["nextIndex"]},
+            {"$set": fields, "$inc": {"outstanding": task_count}},
+        )
+        return cast(int, result.modified_count) == 1
+
+    def replace_cursor(self, cursor: dict, replacement: dict) -> bool:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        result = self.cursors.replace_one(
+            {"ownerId": cursor["ownerId"], "taskType": cursor["taskType"], "cancelled": False},
+            replacement,
+        )
+        return cast(int, result.modified_count) == 1
+
+    def cancel_cursor(self, owner_id: str) -> dict | None:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        return cast(
+            dict | None,
+            self.cursors.find_one_and_update(
+                {"ownerId": owner_id, "cancelled": {"$ne": True}},
+                {"$set": {"exhausted": True, "cancelled": True}},
+                return_document=ReturnDocument.AFTER,
+            ),
+        )
+
+    def count_unsolved_requests(self, owner_id: str) -> int:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        requests = self.requests.with_options(read_preference=ReadPreference.PRIMARY)
+        return cast(
+            int,
+            requests.count_documents(
+                {
+                    "$or": [{"requestId": owner_id}, {"batchId": owner_id}],
+                    "status": "IN_PROGRESS",
+                    "results": {"$size": 0},
+                }
+            ),
+        )
+
+    def add_follower_length(self, owner_id: str, max_length: int) -> None:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        self.cursors.update_one(
+            {"ownerId": owner_id}, {"$addToSet": {"followerLengths": max_length}}
+        )
+
+    def has_unfinished_tasks(self, owner_id: str, end_index: int) -> bool:
+        """Whether any task of an owner starting below end_index is still unfinished."""
+        if self.tasks is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        return (
+            self.tasks.with_options(read_preference=ReadPreference.PRIMARY).find_one(
+                {
+                    "requestId": owner_id,
+                    "status": {"$nin": FINISHED_TASK_STATUSES},
+                    "startIndex": {"$lt": end_index},
+                },
+                {"_id": 1},
+            )
+            is not None
+        )
+
+    def complete_followers(self, owner_id: str, max_length: int) -> list[str]:
+        """Finish the followers up to max_length of an owner's requests.
+
+        Each follower takes its leader's results that fit its own maxLength and
+        stops reporting the leader's status. Returns the completed requestIds.
+        """
+        if self.requests is None or self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        requests = self.requests.with_options(read_preference=ReadPreference.PRIMARY)
+        leader_results = {
+            request["requestId"]: request.get("results", [])
+            for request in requests.find(
+                {"$or": [{"requestId": owner_id}, {"batchId": owner_id}]},
+                {"_id": 0, "requestId": 1, "results": 1},
+            )
+        }
+        followers = requests.find(
+            {
+                "leaderId": {"$in": list(leader_results)},
+                "status": "IN_PROGRESS",
+                "maxLength": {"$lte": max_length},
+            },
+            {"_id": 0, "requestId": 1, "leaderId": 1, "maxLength": 1},
+        )
+
+        now = datetime.now(timezone.utc)
+        completed = []
+        for follower in followers:
+            results = [
+                r for r in leader_results[follower["leaderId"]] if len(r) <= follower["maxLength"]
+            ]
+            result = self.requests.update_one(
+                {"requestId": follower["requestId"], "status": "IN_PROGRESS"},
+                {
+                    "$set": {"status": "READY", "results": results, "completed_at": now},
+                    "$unset": {"leaderId": ""},
+                },
+            )
+            if result.modified_count:
+                completed.append(follower["requestId"])
+
+        self.cursors.update_one(
+            {"ownerId": owner_id}, {"$pull": {"followerLengths": {"$lte": max_length}}}
+        )
+        return completed
+
     def get_request(self, request_id: str, use_secondary: bool = True) -> dict | None:
         if self.requests is None:
             raise RuntimeError("MongoDB not initialized")
@@ -96,12 +350,92 @@ class MongoDBManager:
         if use_secondary:
             collection = collection.with_options(read_preference=ReadPreference.SECONDARY)
 
-        return collection.find_one({"requestId": request_id})
+        return cast(dict | None, collection.find_one({"requestId": request_id}))
+
+    def get_requests(self, request_ids: list[str], use_secondary: bool = True) -> list[dict]:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        collection = self.requests
+        if use_secondary:
+            collection = collection.with_options(read_preference=ReadPreference.SECONDARY)
+
+        return list(collection.find({"requestId": {"$in": request_ids}}, STATUS_PROJECTION))
+
+    def get_cursors_progress(self, owner_ids: list[str]) -> dict[str, int | None]:
+        if self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        cursors = self.cursors.aggregate(
+            [{"$match": {"ownerId": {"$in": owner_ids}}}, {"$project": PROGRESS_PROJECTION}]
+        )
+        return {cursor["ownerId"]: cursor_progress(cursor) for cursor in cursors}
+
+    def find_leader_requests(self, target_hash: str, max_length: int) -> list[dict]:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        return list(
+            self.requests.with_options(read_preference=ReadPreference.PRIMARY)
+            .find(
+                {
+                    "hash": target_hash,
+                    "status": "IN_PROGRESS",
+                    "maxLength": {"$gte": max_length},
+                    "leaderId": {"$exists": False},
+                }
+            )
+            .sort("maxLength", 1)
+        )
+
+    def get_owner_requests(self, owner_id: str, hashes: list[str]) -> list[dict]:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        return list(
+            self.requests.with_options(read_preference=ReadPreference.PRIMARY).find(
+                {"$or": [{"requestId": owner_id}, {"batchId": owner_id}], "hash": {"$in": hashes}},
+                {"_id": 0, "hash": 1, "maxLength": 1, "results": 1},
+            )
+        )
+
+    def get_solved(self, target_hash: str) -> dict | None:
+        if self.solved is None:
+            raise RuntimeError("MongoDB not initialized")
+        return cast(dict | None, self.solved.find_one({"hash": target_hash}, {"_id": 0}))
+
+    def record_solved(self, requests: list[dict], searched: bool) -> None:
+        """Merge finished requests into the solved-hash index.
+
+        Results are always added; searchedLength only grows when the whole
+        keyspace up to the request's maxLength was enumerated.
+        """
+        if self.solved is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        now = datetime.now(timezone.utc)
+        operations = []
+        for request in requests:
+            if not searched and not request.get("results"):
+                continue
+
+            update: dict = {
+                "$addToSet": {"results": {"$each": request.get("results", [])}},
+                "$set": {"updated_at": now},
+            }
+            if searched:
+                update["$max"] = {"searchedLength": request["maxLength"]}
+            else:
+                update["$setOnInsert"] = {"searchedLength": 0}
+            operations.append(UpdateOne({"hash": request["hash"]}, update, upsert=True))
+
+        if operations:
+            self.solved.bulk_write(operations, ordered=False)
 
     def get_task(self, task_id: str) -> dict | None:
         if self.tasks is None:
             raise RuntimeError("MongoDB not initialized")
-        return self.tasks.find_one({"taskId": task_id})
+        return cast(dict | None, self.tasks.find_one({"taskId": task_id}))
 
     def update_task_status(
         self, task_id: str, status: str, results: list[str] | None = None
@@ -123,21 +457,273 @@ class MongoDBManager:
             {"requestId": request_id}, {"$addToSet": {"results": {"$each": results}}}
         )
 
-    def mark_task_done_once(
-        self, task_id: str, status: str, results: list[str] | None = None
-    ) -> dict | None:
+    def complete_requests(self, owner_id: str, status: str) -> int:
+        if self.requests is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        owner_filter = {"$or": [{"requestId": owner_id}, {"batchId": owner_id}]}
+        leader_ids = [
+            request["requestId"]
+            for request in self.requests.find(owner_filter, {"_id": 0, "requestId": 1})
+        ]
+
+        # Followers share the owner's tasks, so they finish together with it.
+        result = self.requests.update_many(
+            {
+                "$or": [*owner_filter["$or"], {"leaderId": {"$in": leader_ids}}],
+                "status": "IN_PROGRESS",
+            },
+            {"$set": {"status": status, "completed_at": datetime.now(timezone.utc)}},
+        )
+        return cast(int, result.modified_count)
+
+    def mark_tasks_done_once(self, results: list[dict]) -> dict[str, dict]:
+        """Apply a batch of worker results, counting each task against its owner once.
+
+        Tasks are first claimed by flipping them to their finished status, then
+        the claim is settled: request result merges and owner counter increments
+        are computed from the claimed task documents and sent as unordered
+        bulk_writes, inside a transaction when the deployment supports it.
+        Returns the updated cursors of owners with newly counted tasks.
+        """
+        if self.client is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        if not self.supports_transactions:
+            return self._mark_tasks_done_once(results)
+
+        with self.client.start_session() as session:
+            return cast(
+                dict[str, dict],
+                session.with_transaction(
+                    lambda s: self._mark_tasks_done_once(results, s),
+                    write_concern=WriteConcern(w="majority", wtimeout=5000),
+                ),
+            )
+
+    def _mark_tasks_done_once(
+        self, results: list[dict], session: ClientSession | None = None
+    ) -> dict[str, dict]:
+        if self.tasks is None or self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        by_task: dict[str, dict] = {}
+        for result in results:
+            by_task.setdefault(result["taskId"], result)
+
+        # Finishing a task, tagging it with this batch's token and storing what
+        # the worker found is one atomic update per task, so when two consumers
+        # handle the same redelivered result only one of them claims it, and
+        # the claim can be settled from the task documents alone.
+        token = uuid.uuid4().hex
+        now = datetime.now(timezone.utc)
+        claims = []
+        for task_id, result in by_task.items():
+            fields = {"status": result["status"], "completed_at": now, "finishToken": token}
+            for key in ("results", "matches"):
+                if result.get(key):
+                    fields[key] = result[key]
+            claims.append(
+                UpdateOne(
+                    {"taskId": task_id, "status": {"$nin": FINISHED_TASK_STATUSES}},
+                    {"$set": {**fields, "counted": False}},
+                )
+            )
+        self.tasks.bulk_write(claims, ordered=False, session=session)
+
+        # Besides this batch's claim, settle claims an earlier attempt at the
+        # same results made but failed to count.
+        tasks = self.tasks.with_options(read_preference=ReadPreference.PRIMARY)
+        tokens = tasks.distinct(
+            "finishToken", {"taskId": {"$in": list(by_task)}, "counted": False}, session=session
+        )
+        owners: set[str] = set()
+        for claim_token in tokens:
+            owners.update(self._settle_claim(claim_token, session))
+        if not owners:
+            return {}
+
+        cursors = self.cursors.find(
+            {"ownerId": {"$in": list(owners)}}, {"finishTokens": 0}, session=session
+        )
+        return {cursor["ownerId"]: cursor for cursor in cursors}
+
+    def _settle_claim(self, token: str, session: ClientSession | None) -> set[str]:
+        """Merge the results of the tasks claimed under token and count them against their owners."""
+        if self.tasks is None or self.requests is None or self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        tasks = self.tasks.with_options(read_preference=ReadPreference.PRIMARY)
+        claimed = tasks.find(
+            {"finishToken": token, "counted": False},
+            {"requestId": 1, "status": 1, "count": 1, "results": 1, "matches": 1},
+            session=session,
+        )
+
+        request_ops: list[UpdateMany] = []
+        counters: dict[str, dict[str, int]] = {}
+        for task in claimed:
+            owner_id = task["requestId"]
+            owner_filter = {"$or": [{"requestId": owner_id}, {"batchId": owner_id}]}
+            if task.get("matches"):
+                for target_hash, values in task["matches"].items():
+                    request_ops.append(
+                        UpdateMany(
+                            {**owner_filter, "hash": target_hash},
+                            {"$addToSet": {"results": {"$each": values}}},
+                        )
+                    )
+            elif task.get("results"):
+                request_ops.append(
+                    UpdateMany(
+                        {"requestId": owner_id},
+                        {"$addToSet": {"results": {"$each": task["results"]}}},
+                    )
+                )
+
+            inc = counters.setdefault(
+                owner_id, {"outstanding": 0, "completedTasks": 0, "completedCombinations": 0}
+            )
+            inc["outstanding"] -= 1
+            inc["completedTasks"] += 1
+            inc["completedCombinations"] += task["count"]
+            if task["status"] in TASK_STATUS_COUNTERS:
+                key = TASK_STATUS_COUNTERS[task["status"]]
+                inc[key] = inc.get(key, 0) + 1
+
+        if not counters:
+            return set()
+
+        if request_ops:
+            self.requests.bulk_write(request_ops, ordered=False, session=session)
+        # Remembering the token on the cursor makes the increment idempotent,
+        # so settling a claim again after a failure below it counts nothing twice.
+        self.cursors.bulk_write(
+            [
+                UpdateOne(
+                    {"ownerId": owner_id, "finishTokens": {"$ne": token}},
+                    {
+                        "$inc": inc,
+                        "$push": {
+                            "finishTokens": {
+                                "$each": [token],
+                                "$slice": -config.CURSOR_FINISH_TOKENS,
+                            }
+                        },
+                    },
+                )
+                for owner_id, inc in counters.items()
+            ],
+            ordered=False,
+            session=session,
+        )
+        self.tasks.update_many(
+            {"finishToken": token, "counted": False}, {"$set": {"counted": True}}, session=session
+        )
+        return set(counters)
+
+    def count_by_status(self, collection: Collection, status: str) -> int:
+        primary = collection.with_options(read_preference=ReadPreference.PRIMARY)
+        return cast(int, primary.count_documents({"status": status}))
+
+    def save_checkpoints(self, checkpoints: list[dict]) -> None:
         if self.tasks is None:
             raise RuntimeError("MongoDB not initialized")
 
-        update_data: dict = {"status": status, "completed_at": datetime.now(timezone.utc)}
-        if results:
-            update_data["results"] = results
+        now = datetime.now(timezone.utc)
+        self.tasks.bulk_write(
+            [
+                UpdateOne(
+                    {"taskId": checkpoint["taskId"], "status": {"$nin": FINISHED_TASK_STATUSES}},
+                    {
+                        "$max": {"checkpoint": checkpoint["scanned"]},
+                        "$set": {"workerId": checkpoint.get("workerId"), "checkpointAt": now},
+                        "$addToSet": {"partialResults": {"$each": checkpoint.get("results", [])}},
+                    },
+                )
+                for checkpoint in checkpoints
+            ],
+            ordered=False,
+        )
+
+    def get_splittable_tasks(self, owner_id: str, min_remaining: int) -> list[dict]:
+        """Return in-flight tasks of an owner with a checkpoint and enough unscanned tail."""
+        if self.tasks is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        return list(
+            self.tasks.find(
+                {
+                    "requestId": owner_id,
+                    "status": {"$nin": FINISHED_TASK_STATUSES},
+                    "checkpoint": {"$exists": True},
+                    **self._split_not_pending(),
+                    "$expr": {"$gte": [{"$subtract": ["$count", "$checkpoint"]}, min_remaining]},
+                }
+            )
+        )
+
+    @staticmethod
+    def _split_not_pending() -> dict:
+        # A split request the holder never acknowledged, because it was rejected
+        # or lost, lapses after SPLIT_ACK_TIMEOUT so the task can be split again.
+        expired = datetime.now(timezone.utc) - timedelta(seconds=config.SPLIT_ACK_TIMEOUT)
+        return {
+            "$or": [
+                {"splitRequested": {"$ne": True}},
+                {"splitRequestedAt": {"$lt": expired}},
+            ]
+        }
+
+    def mark_split_requested(self, task_id: str) -> bool:
+        if self.tasks is None:
+            raise RuntimeError("MongoDB not initialized")
 
-        return self.tasks.find_one_and_update(
-            {"taskId": task_id, "status": {"$nin": ["DONE", "ERROR"]}},
-            {"$set": update_data},
-            return_document=ReturnDocument.AFTER,
+        result = self.tasks.update_one(
+            {"taskId": task_id, **self._split_not_pending()},
+            {"$set": {"splitRequested": True, "splitRequestedAt": datetime.now(timezone.utc)}},
         )
+        return cast(int, result.modified_count) == 1
+
+    def clear_split_requested(self, task_id: str) -> None:
+        if self.tasks is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        self.tasks.update_one(
+            {"taskId": task_id}, {"$unset": {"splitRequested": "", "splitRequestedAt": ""}}
+        )
+
+    def split_task(self, task: dict, keep: int, tail: dict) -> bool:
+        """Shrink a task to its first keep combinations and register the tail as a new task."""
+        if self.tasks is None or self.cursors is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        # Matching on the old count makes a redelivered split acknowledgement a no-op.
+        result = self.tasks.update_one(
+            {"taskId": task["taskId"], "count": task["count"]},
+            {"$set": {"count": keep}, "$unset": {"splitRequested": "", "splitRequestedAt": ""}},
+        )
+        if result.modified_count != 1:
+            return False
+
+        self.tasks.insert_one(tail)
+        self.cursors.update_one({"ownerId": task["requestId"]}, {"$inc": {"outstanding": 1}})
+        return True
+
+    def mark_tasks_queued(self, task_ids: list[str]) -> None:
+        if self.tasks is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        self.tasks.update_many(
+            {"taskId": {"$in": task_ids}},
+            {"$set": {"status": "QUEUED", "needs_retry": True}},
+        )
+
+    def mark_tasks_retried(self, task_ids: list[str]) -> None:
+        if self.tasks is None:
+            raise RuntimeError("MongoDB not initialized")
+
+        self.tasks.update_many({"taskId": {"$in": task_ids}}, {"$set": {"needs_retry": False}})
 
     def get_unfinished_tasks(self) -> list[dict]:
         if self.tasks is None:
@@ -0,0 +1,211 @@
+import threading
+import time
+
+import pika
+from pika.channel import Channel
+from pika.frame import Method
+from pika.spec import Basic, BasicProperties
+
+from src.core import config
+from src.core.logging import get_logger
+
+logger = get_logger("publisher")
+
+
+class _Batch:
+    """Outcome of one publish call, filled in by the I/O thread."""
+
+    def __init__(self, size: int) -> None:
+        self.confirmed: list[str] = []
+        self.remaining = size
+        self.done = threading.Event()
+        # Set under the publisher lock when the caller gives up waiting.
+        self.cancelled = False
+
+
+class ConfirmPublisher:
+    """Publishes with publisher confirms on a SelectConnection of its own.
+
+    The connection lives on a dedicated I/O thread, so a whole batch is
+    pipelined and its acks are handled as they arrive instead of after
+    every message, which is all BlockingChannel.confirm_delivery allows.
+    Callers on any thread hand batches over with add_callback_threadsafe
+    and wait for them. Messages are published as mandatory, so ones no queue
+    accepted come back through on_return and count as not confirmed.
+    """
+
+    def __init__(self, parameters: pika.ConnectionParameters) -> None:
+        self.parameters = parameters
+        self.connection: pika.SelectConnection | None = None
+        self.channel: Channel | None = None
+        self.ready = threading.Event()
+        self.running = False
+        self.thread: threading.Thread | None = None
+        # Only touched on the I/O thread, apart from the timeout cleanup under lock.
+        self.lock = threading.Lock()
+        self.next_delivery_tag = 1
+        self.pending: dict[int, tuple[_Batch, str]] = {}
+        self.returned: set[str] = set()
+
+    def start(self) -> None:
+        if self.thread and self.thread.is_alive():
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+        connection = self.connection
+        if connection is not None:
+            try:
+                connection.ioloop.add_callback_threadsafe(self._close)
+            except Exception as e:
+                logger.warning(f"Error stopping publisher: {e}")
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def publish(
+        self,
+        exchange: str,
+        routing_key: str,
+        messages: list[tuple[str, bytes]],
+        timeout: float = config.PUBLISH_CONFIRM_TIMEOUT,
+    ) -> list[str]:
+        """Publish (message_id, body) pairs and return the IDs the broker confirmed."""
+        if not messages:
+            return []
+        deadline = time.monotonic() + timeout
+        if not self.ready.wait(timeout) or self.connection is None:
+            logger.warning("Publisher channel not ready")
+            return []
+
+        batch = _Batch(len(messages))
+        self.connection.ioloop.add_callback_threadsafe(
+            lambda: self._publish_batch(batch, exchange, routing_key, messages)
+        )
+        if not batch.done.wait(max(deadline - time.monotonic(), 0)):
+            logger.warning(f"{batch.remaining} publishes timed out")
+            with self.lock:
+                batch.cancelled = True
+                for tag in [tag for tag, (owner, _) in self.pending.items() if owner is batch]:
+                    del self.pending[tag]
+                batch.done.set()
+        with self.lock:
+            return list(batch.confirmed)
+
+    def _run(self) -> None:
+        while self.running:
+            self.connection = pika.SelectConnection(
+                self.parameters,
+                on_open_callback=self._on_connection_open,
+                on_open_error_callback=self._on_connection_error,
+                on_close_callback=self._on_connection_closed,
+            )
+            self.connection.ioloop.start()
+            if self.running:
+                time.sleep(config.RETRY_DELAY)
+
+    def _close(self) -> None:
+        if self.connection is not None and not (
+            self.connection.is_closing or self.connection.is_closed
+        ):
+            self.connection.close()
+
+    def _on_connection_open(self, connection: pika.SelectConnection) -> None:
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_error(self, connection: pika.SelectConnection, error: Exception) -> None:
+        logger.error(f"Publisher failed to connect to RabbitMQ: {error}")
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection: pika.SelectConnection, reason: Exception) -> None:
+        self.ready.clear()
+        self.channel = None
+        self._fail_pending()
+        if self.running:
+            logger.warning(f"Publisher connection closed: {reason}, reconnecting...")
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel: Channel) -> None:
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.add_on_return_callback(self._on_return)
+        channel.confirm_delivery(
+            ack_nack_callback=self._on_delivery_confirmation,
+            callback=lambda _: self._on_confirm_selected(channel),
+        )
+
+    def _on_confirm_selected(self, channel: Channel) -> None:
+        self.channel = channel
+        self.next_delivery_tag = 1
+        self.ready.set()
+
+    def _on_channel_closed(self, _channel: Channel, reason: Exception) -> None:
+        self.ready.clear()
+        self.channel = None
+        self._fail_pending()
+        connection = self.connection
+        if self.running and connection is not None and connection.is_open:
+            logger.warning(f"Publisher channel closed: {reason}, reopening...")
+            connection.channel(on_open_callback=self._on_channel_open)
+
+    def _publish_batch(
+        self, batch: _Batch, exchange: str, routing_key: str, messages: list[tuple[str, bytes]]
+    ) -> None:
+        if self.channel is None or not self.channel.is_open:
+            batch.done.set()
+            return
+        for message_id, body in messages:
+            with self.lock:
+                # A batch that timed out was already cleaned out of pending;
+                # tags registered after that would never be removed.
+                if batch.cancelled:
+                    return
+                self.pending[self.next_delivery_tag] = (batch, message_id)
+                self.next_delivery_tag += 1
+            self.channel.basic_publish(
+                exchange=exchange,
+                routing_key=routing_key,
+                body=body,
+                properties=BasicProperties(
+                    delivery_mode=2, content_type="application/json", message_id=message_id
+                ),
+                mandatory=True,
+            )
+
+    def _on_return(
+        self, _channel: Channel, _method: Basic.Return, properties: BasicProperties, _body: bytes
+    ) -> None:
+        # The broker sends basic.return before the ack of the same message.
+        if properties.message_id:
+            self.returned.add(properties.message_id)
+
+    def _on_delivery_confirmation(self, frame: Method) -> None:
+        delivery_tag = frame.method.delivery_tag
+        acked = isinstance(frame.method, Basic.Ack)
+        with self.lock:
+            tags = (
+                [tag for tag in self.pending if tag <= delivery_tag]
+                if frame.method.multiple
+                else [delivery_tag]
+            )
+
+            for tag in tags:
+                entry = self.pending.pop(tag, None)
+                if entry is None:
+                    continue
+                batch, message_id = entry
+                returned = message_id in self.returned
+                self.returned.discard(message_id)
+                if acked and not returned:
+                    batch.confirmed.append(message_id)
+                batch.remaining -= 1
+                if batch.remaining <= 0:
+                    batch.done.set()
+
+    def _fail_pending(self) -> None:
+        with self.lock:
+            for batch, _ in self.pending.values():
+                batch.done.set()
+            self.pending.clear()
+            self.returned.clear()
@@ -1,37 +1,57 @@
 import threading
 import time
-from datetime import datetime, timezone
 from typing import Callable
 
 import orjson
 import pika
 from pika.adapters.blocking_connection import BlockingChannel
-from pika.spec import Basic, BasicProperties
-from pymongo.read_preferences import ReadPreference
 
 from src.core import config
 from src.core.logging import get_logger
+from src.models import Task, TaskCursor
 from src.services.mongodb import MongoDBManager
-from src.utils import retry
+from src.services.publisher import ConfirmPublisher
+from src.services.solved_cache import SolvedHashCache
+from src.services.status_bus import StatusBus
+from src.services.status_cache import StatusCache
+from src.services.throughput import ThroughputEstimator
+from src.utils import calculate_total_combinations, retry
 
 logger = get_logger("rabbitmq")
 TASK_EXCHANGE = "task.exchange"
 RESULT_EXCHANGE = "result.exchange"
+RESULT_DEAD_QUEUE = "result.dead"
+ATTEMPTS_HEADER = "x-attempts"
 
 
 class RabbitMQManager:
-    def __init__(self, mongo_manager: "MongoDBManager") -> None:
+    def __init__(
+        self,
+        mongo_manager: "MongoDBManager",
+        solved_cache: "SolvedHashCache | None" = None,
+        throughput: "ThroughputEstimator | None" = None,
+        status_bus: "StatusBus | None" = None,
+        status_cache: "StatusCache | None" = None,
+        consume: bool = True,
+    ) -> None:
         self.parameters: pika.ConnectionParameters | None = None
         self.host = config.RABBITMQ_HOST
         self.port = config.RABBITMQ_PORT
         self.user = config.RABBITMQ_USER
         self.password = config.RABBITMQ_PASS
         self.mongo = mongo_manager
+        self.solved_cache = solved_cache
+        self.throughput = throughput
+        self.status_bus = status_bus
+        self.status_cache = status_cache
         self.pub_connection: pika.BlockingConnection | None = None
         self.pub_channel: BlockingChannel | None = None
+        self.publisher: ConfirmPublisher | None = None
         self.result_callback: Callable | None = None
+        self.publish_lock = threading.Lock()
         self.connect()
-        self.start_consuming()
+        if consume:
+            self.start_consuming()
 
     @retry(max_attempts=config.MAX_RETRIES, delay=config.RETRY_DELAY)
     def connect(self) -> None:
@@ -57,6 +77,9 @@ class RabbitMQManager:
     def connect_publisher(self) -> None:
         self.pub_connection = pika.BlockingConnection(self.parameters)
         self.pub_channel = self.pub_connection.channel()
+        if self.publisher is None and self.parameters is not None:
+            self.publisher = ConfirmPublisher(self.parameters)
+            self.publisher.start()
 
     def _setup_queues(self) -> None:
         if self.pub_channel:
@@ -67,12 +90,18 @@ class RabbitMQManager:
             self.pub_channel.exchange_declare(
                 exchange=RESULT_EXCHANGE, exchange_type="direct", durable=True
             )
+            self.pub_channel.exchange_declare(
+                exchange=config.CANCEL_EXCHANGE, exchange_type="fanout", durable=True
+            )
             self.pub_channel.queue_declare(
                 queue="task.queue", durable=True, arguments=queue_arguments
             )
             self.pub_channel.queue_declare(
                 queue="result.queue", durable=True, arguments=queue_arguments
             )
+            self.pub_channel.queue_declare(
+                queue=RESULT_DEAD_QUEUE, durable=True, arguments=queue_arguments
+            )
             self.pub_channel.queue_bind(
                 exchange=TASK_EXCHANGE, queue="task.queue", routing_key="task.queue"
             )
@@ -88,87 +117,328 @@ class RabbitMQManager:
             self.connect()
 
     def publish_task(self, task: dict) -> bool:
-        try:
-            self.ensure_connection()
-            if self.pub_channel:
-                self.pub_channel.basic_publish(
-                    exchange=TASK_EXCHANGE,
-                    routing_key="task.queue",
-                    body=orjson.dumps(task),
-                    properties=pika.BasicProperties(
-                        delivery_mode=2, content_type="application/json"
-                    ),
+        confirmed, _ = self.publish_tasks([task])
+        return bool(confirmed)
+
+    def publish_tasks(self, tasks: list[dict]) -> tuple[list[str], list[str]]:
+        """Publish a batch of tasks with publisher confirms.
+
+        Returns the task IDs the broker confirmed and the ones it nacked; tasks
+        still unconfirmed after PUBLISH_CONFIRM_TIMEOUT are reported as nacked.
+        """
+        confirmed: list[str] = []
+        nacked: list[str] = []
+        if not tasks:
+            return confirmed, nacked
+
+        messages = [(task["taskId"], orjson.dumps(task)) for task in tasks]
+        for offset in range(0, len(messages), config.PUBLISH_BATCH_SIZE):
+            try:
+                if not self.publisher:
+                    raise RuntimeError("RabbitMQ publisher not initialized")
+                confirmed.extend(
+                    self.publisher.publish(
+                        TASK_EXCHANGE,
+                        "task.queue",
+                        messages[offset : offset + config.PUBLISH_BATCH_SIZE],
+                    )
                 )
-                return True
+            except Exception as e:
+                logger.error(f"Failed to publish tasks: {e}")
+
+        confirmed_ids = set(confirmed)
+        nacked = [task["taskId"] for task in tasks if task["taskId"] not in confirmed_ids]
+        if nacked:
+            logger.warning(f"{len(nacked)} of {len(tasks)} tasks were not confirmed by the broker")
+
+        return confirmed, nacked
+
+    def publish_cancel(self, request_id: str) -> bool:
+        try:
+            with self.publish_lock:
+                self.ensure_connection()
+                if self.pub_channel:
+                    self.pub_channel.basic_publish(
+                        exchange=config.CANCEL_EXCHANGE,
+                        routing_key="",
+                        body=orjson.dumps({"requestId": request_id}),
+                        properties=pika.BasicProperties(content_type="application/json"),
+                    )
+                    return True
+                return False
+        except Exception as e:
+            logger.error(f"Failed to publish cancellation: {e}")
             return False
+
+    def publish_split(self, task_id: str, keep: int) -> bool:
+        """Ask whichever worker holds task_id to stop after its first keep combinations."""
+        try:
+            with self.publish_lock:
+                self.ensure_connection()
+                if self.pub_channel:
+                    self.pub_channel.basic_publish(
+                        exchange=config.CANCEL_EXCHANGE,
+                        routing_key="",
+                        body=orjson.dumps({"type": "split", "taskId": task_id, "keep": keep}),
+                        properties=pika.BasicProperties(content_type="application/json"),
+                    )
+                    return True
+                return False
         except Exception as e:
-            logger.error(f"Failed to publish task: {e}")
+            logger.error(f"Failed to publish split request: {e}")
             return False
 
-    def _handle_result(
-        self,
-        ch: BlockingChannel,
-        method: Basic.Deliver,
-        _: BasicProperties,
-        body: bytes,
-    ) -> None:
+    def get_queue_depth(self, queue: str = "task.queue") -> tuple[int, int]:
+        with self.publish_lock:
+            self.ensure_connection()
+            if not self.pub_channel:
+                raise RuntimeError("RabbitMQ channel not initialized")
+            declared = self.pub_channel.queue_declare(queue=queue, passive=True)
+            return declared.method.message_count, declared.method.consumer_count
+
+    def _handle_results(self, ch: BlockingChannel, batch: list[tuple[int, int, bytes]]) -> None:
+        last_tag = batch[-1][0]
         try:
-            result = orjson.loads(body)
-            task_id = result["taskId"]
-            request_id = result["requestId"]
+            self._process_results([body for _, _, body in batch])
+            ch.basic_ack(delivery_tag=last_tag, multiple=True)
+            return
+        except Exception as e:
+            logger.error(f"Error handling results: {e}, retrying one at a time")
 
-            logger.info(f"Received result for task {task_id}, status: {result['status']}")
+        try:
+            self.mongo.ping()
+        except Exception as e:
+            # Nothing can be applied while MongoDB is down, so the batch goes back
+            # whole instead of being dead-lettered message by message.
+            logger.error(f"MongoDB unavailable, requeueing {len(batch)} results: {e}")
+            ch.basic_nack(delivery_tag=last_tag, multiple=True, requeue=True)
+            time.sleep(config.RETRY_DELAY)
+            return
 
-            updated_task = self.mongo.mark_task_done_once(
-                task_id, result["status"], result.get("results", [])
-            )
-            if updated_task is None:
-                logger.info(f"Duplicate result for task {task_id}, message acknowledged")
-                ch.basic_ack(delivery_tag=method.delivery_tag)
-                return
+        for delivery_tag, attempts, body in batch:
+            try:
+                self._process_results([body])
+            except Exception as e:
+                self._retry_result(ch, body, attempts + 1, e)
+            ch.basic_ack(delivery_tag=delivery_tag)
 
-            if result.get("results"):
-                self.mongo.add_results_to_request(request_id, result["results"])
+    def _retry_result(
+        self, ch: BlockingChannel, body: bytes, attempts: int, error: Exception
+    ) -> None:
+        # Failures are counted in a header rather than read off the redelivered
+        # flag, which the whole-batch requeue above sets on every message.
+        if attempts < config.RESULT_MAX_ATTEMPTS:
+            logger.warning(f"Result failed, retrying it (attempt {attempts}): {error}")
+            routing_key = "result.queue"
+        else:
+            logger.error(
+                f"Result failed {attempts} times, moving it to {RESULT_DEAD_QUEUE}: {error}"
+            )
+            routing_key = RESULT_DEAD_QUEUE
+        ch.basic_publish(
+            exchange="",
+            routing_key=routing_key,
+            body=body,
+            properties=pika.BasicProperties(
+                delivery_mode=2,
+                content_type="application/json",
+                headers={ATTEMPTS_HEADER: attempts},
+            ),
+        )
+
+    def _process_results(self, bodies: list[bytes]) -> None:
+        results = []
+        checkpoints = []
+        splits = []
+        for body in bodies:
+            try:
+                message = orjson.loads(body)
+                message_type = message.get("type", "result")
+                if message_type == "checkpoint":
+                    checkpoints.append(message)
+                    continue
+                if message_type == "split":
+                    splits.append(message)
+                    continue
+
+                logger.debug(f"Received result for task {message['taskId']}: {message['status']}")
+                results.append(message)
+                if self.throughput is not None and message["status"] == "DONE":
+                    self.throughput.observe(
+                        message.get("combinations", 0), message.get("elapsed", 0.0)
+                    )
+            except (orjson.JSONDecodeError, KeyError) as e:
+                logger.error(f"Dropping malformed result: {e}")
+
+        if checkpoints:
+            self.mongo.save_checkpoints(checkpoints)
+        # A worker acknowledges a split before sending the shrunk task's result,
+        # so tails are registered before their parent can complete the request.
+        for split in splits:
+            self._apply_split(split)
+
+        cursors = self.mongo.mark_tasks_done_once(results) if results else {}
+        logger.info(f"Processed batch of {len(bodies)} results")
+
+        solved_owners = {result["requestId"] for result in results if result.get("results")}
+        for owner_id, cursor in cursors.items():
+            if self.status_bus is not None:
+                self.status_bus.publish_progress(cursor)
+            if self.status_cache is not None:
+                self.status_cache.update_progress(cursor)
+            if owner_id in solved_owners and not cursor.get("findAll"):
+                cursor = self._cancel_if_solved(owner_id) or cursor
+            self._complete_covered_followers(cursor)
+            self._check_request_completion(owner_id, cursor)
+
+    def _apply_split(self, split: dict) -> None:
+        task = self.mongo.get_task(split["taskId"])
+        keep = split["keep"]
+        if task is None or not 0 < keep < task["count"]:
+            return
 
-            self._check_request_completion(request_id)
+        tail = Task(
+            request_id=task["requestId"],
+            start_index=task["startIndex"] + keep,
+            count=task["count"] - keep,
+            target_hash=task.get("targetHash"),
+            max_length=task["maxLength"],
+            target_hashes=task.get("targetHashes"),
+            task_type=task.get("taskType", "bruteforce"),
+            table_id=task.get("tableId"),
+            length=task.get("length"),
+            prefix=task.get("prefix"),
+            suffix_start=(
+                task["suffixStart"] + keep if task.get("suffixStart") is not None else None
+            ),
+            task_size=task.get("taskSize"),
+        )
+        if not self.mongo.split_task(task, keep, tail.to_dict()):
+            return
 
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+        _, failed = self.publish_tasks([tail.to_message()])
+        if failed:
+            self.mongo.mark_tasks_queued(failed)
+        logger.info(
+            f"Split {tail.count} combinations off task {task['taskId']} into {tail.task_id}"
+        )
+
+    def _complete_covered_followers(self, cursor: dict) -> None:
+        """Finish followers with a shorter maxLength once their keyspace has been searched.
+
+        Tasks finish out of order, so a length counts as searched only when the
+        cursor has dispatched past it and none of its tasks is still unfinished.
+        """
+        # Finished cursors complete their followers along with their own requests.
+        finished = cursor["exhausted"] and cursor["outstanding"] <= 0
+        if finished or cursor.get("taskType") == "rainbow":
+            return
 
-        except Exception as e:
-            logger.error(f"Error handling result: {e}")
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+        covered = 0
+        for length in sorted(cursor.get("followerLengths", [])):
+            end_index = calculate_total_combinations(length)
+            if cursor["nextIndex"] < end_index or self.mongo.has_unfinished_tasks(
+                cursor["ownerId"], end_index
+            ):
+                break
+            covered = length
+        if not covered:
+            return
 
-    def _check_request_completion(self, request_id: str) -> None:
+        completed = self.mongo.complete_followers(cursor["ownerId"], covered)
+        if not completed:
+            return
+        # Followers are cached under their leader's owner.
+        if self.status_cache is not None:
+            self.status_cache.invalidate(cursor["ownerId"])
+        if self.status_bus is not None:
+            self.status_bus.publish_followers_completed(cursor["ownerId"])
+        logger.info(f"Completed {len(completed)} followers of {cursor['ownerId']}")
+
+    def _cancel_if_solved(self, request_id: str) -> dict | None:
+        if self.mongo.count_unsolved_requests(request_id) > 0:
+            return None
+
+        cursor = self.mongo.cancel_cursor(request_id)
+        if cursor is None:
+            return None
+
+        self.publish_cancel(request_id)
+        self.mongo.complete_requests(request_id, "READY")
+        if self.status_cache is not None:
+            self.status_cache.invalidate(request_id)
+        if self.status_bus is not None:
+            self.status_bus.publish_completed(request_id, "READY")
+        if self.solved_cache is not None:
+            self.solved_cache.record(cursor, searched=False)
+        logger.info(f"Request {request_id} solved, cancelling remaining tasks")
+        return cursor
+
+    def _check_request_completion(self, request_id: str, cursor: dict | None) -> None:
         try:
-            if self.mongo.tasks is None:
-                logger.warning("MongoDB tasks collection is not available")
+            if cursor is None:
+                logger.warning(f"No task cursor for request {request_id}")
                 return
-            primary_tasks = self.mongo.tasks.with_options(
-                read_preference=ReadPreference.PRIMARY
-            )
-            total_tasks = primary_tasks.count_documents({"requestId": request_id})
-            completed_tasks = primary_tasks.count_documents(
-                {"requestId": request_id, "status": {"$in": ["DONE", "ERROR"]}}
-            )
 
-            if completed_tasks == total_tasks and total_tasks > 0:
-                request = self.mongo.get_request(request_id, use_secondary=False)
-                if request and self.mongo.requests is not None:
-                    status = "READY"
-
-                    self.mongo.requests.update_one(
-                        {"requestId": request_id},
-                        {
-                            "$set": {
-                                "status": status,
-                                "completed_at": datetime.now(timezone.utc),
-                            }
-                        },
-                    )
+            if cursor["exhausted"] and cursor["outstanding"] <= 0:
+                if cursor.get("taskType") == "rainbow" and not cursor["cancelled"]:
+                    self._fall_back_to_bruteforce(cursor)
+                    return
+
+                status = "READY"
+                if self.mongo.complete_requests(request_id, status):
                     logger.info(f"Request {request_id} completed with status {status}")
+                    if self.status_cache is not None:
+                        self.status_cache.invalidate(request_id)
+                    if self.status_bus is not None:
+                        self.status_bus.publish_completed(request_id, status)
+                    if self.solved_cache is not None:
+                        self.solved_cache.record(cursor, searched=not cursor.get("cancelled"))
         except Exception as e:
             logger.error(f"Error checking request completion: {e}")
 
+    def _fall_back_to_bruteforce(self, cursor: dict) -> None:
+        fallback = TaskCursor(
+            owner_id=cursor["ownerId"],
+            max_length=cursor["maxLength"],
+            total_combinations=calculate_total_combinations(cursor["maxLength"]),
+            target_hash=cursor.get("targetHash"),
+            target_hashes=cursor.get("targetHashes"),
+            find_all=cursor["findAll"],
+            start_index=cursor["fallbackIndex"],
+            priority=cursor.get("priority", 0),
+        ).to_dict()
+        fallback["created_at"] = cursor["created_at"]
+        fallback["firstDispatchAt"] = cursor.get("firstDispatchAt")
+        fallback["followerLengths"] = cursor.get("followerLengths", [])
+
+        if self.mongo.replace_cursor(cursor, fallback):
+            logger.info(
+                f"Rainbow table {cursor['tableId']} missed for {cursor['ownerId']}, "
+                "falling back to brute force"
+            )
+
+    def _consume_batches(self, channel: BlockingChannel) -> None:
+        batch: list[tuple[int, int, bytes]] = []
+        deadline = 0.0
+
+        for method, properties, body in channel.consume(
+            "result.queue", inactivity_timeout=config.RESULT_BATCH_TIMEOUT
+        ):
+            if method is not None:
+                if not batch:
+                    deadline = time.monotonic() + config.RESULT_BATCH_TIMEOUT
+                attempts = (properties.headers or {}).get(ATTEMPTS_HEADER, 0)
+                batch.append((method.delivery_tag, attempts, body))
+
+            if batch and (
+                method is None
+                or len(batch) >= config.RESULT_BATCH_SIZE
+                or time.monotonic() >= deadline
+            ):
+                self._handle_results(channel, batch)
+                batch = []
+
     def start_consuming(self) -> None:
         def consume() -> None:
             while True:
@@ -182,22 +452,19 @@ class RabbitMQManager:
                     channel.queue_declare(
                         queue="result.queue", durable=True, arguments=queue_arguments
                     )
+                    channel.queue_declare(
+                        queue=RESULT_DEAD_QUEUE, durable=True, arguments=queue_arguments
+                    )
                     channel.queue_bind(
                         exchange=RESULT_EXCHANGE,
                         queue="result.queue",
                         routing_key="result.queue",
                     )
 
-                    channel.basic_qos(prefetch_count=10)
-
-                    channel.basic_consume(
-                        queue="result.queue",
-                        on_message_callback=self._handle_result,
-                        auto_ack=False,
-                    )
+                    channel.basic_qos(prefetch_count=config.RESULT_BATCH_SIZE)
 
                     logger.info("Consumer started")
-                    channel.start_consuming()
+                    self._consume_batches(channel)
 
                 except Exception as e:
                     logger.error(f"Consumer crashed: {e}, reconnecting in 5s...")
@@ -210,6 +477,9 @@ class RabbitMQManager:
     def close(self) -> None:
         logger.info("Closing RabbitMQ connections...")
 
+        if self.publisher:
+            self.publisher.stop()
+
         try:
             if self.pub_channel and self.pub_channel.is_open:
                 self.pub_channel.close()
@@ -0,0 +1,59 @@
+import os
+
+import orjson
+
+from src.core import config
+from src.core.logging import get_logger
+
+logger = get_logger("rainbow_catalog")
+
+MANIFEST_NAME = "manifest.json"
+
+
+class RainbowCatalog:
+    """Index of the rainbow tables built by the worker's build_rainbow_table tool.
+
+    Only manifests are read here; the chain shards are opened by the workers
+    that run the lookup tasks.
+    """
+
+    def __init__(self, directory: str = config.RAINBOW_TABLE_DIR) -> None:
+        self.directory = directory
+        self.tables: dict[int, dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        tables: dict[int, dict] = {}
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            logger.info(f"No rainbow tables under {self.directory}")
+            names = []
+
+        for name in names:
+            path = os.path.join(self.directory, name, MANIFEST_NAME)
+            try:
+                with open(path, "rb") as f:
+                    manifest = orjson.loads(f.read())
+            except (OSError, orjson.JSONDecodeError):
+                continue
+
+            if manifest.get("alphabet") != config.ALPHABET:
+                logger.warning(f"Skipping rainbow table {name} built for another alphabet")
+                continue
+
+            current = tables.get(manifest["maxLength"])
+            if current is None or manifest.get("coverage", 0) > current.get("coverage", 0):
+                tables[manifest["maxLength"]] = manifest
+
+        for max_length, manifest in sorted(tables.items()):
+            logger.info(
+                f"Rainbow table {manifest['tableId']} for maxLength {max_length}: "
+                f"coverage {manifest.get('coverage', 0):.2%}, "
+                f"{manifest.get('falseAlarmRate', 0):.2f} false alarms per lookup"
+            )
+        self.tables = tables
+
+    def find(self, max_length: int) -> dict | None:
+        """Return the best table whose index space matches max_length exactly."""
+        return self.tables.get(max_length)
@@ -4,6 +4,7 @@ from threading import Thread
 
 from src.core import config
 from src.core.logging import get_logger
+from src.models import Task
 from src.services.mongodb import MongoDBManager
 from src.services.rabbitmq import RabbitMQManager
 
@@ -41,37 +42,31 @@ class TaskRetryManager:
 
     def _process_failed_tasks(self) -> None:
         failed_tasks = self.mongo.get_failed_tasks()
+        if not failed_tasks:
+            return
 
-        for task in failed_tasks:
-            task_message = {
-                "taskId": task["taskId"],
-                "requestId": task["requestId"],
-                "startIndex": task["startIndex"],
-                "count": task["count"],
-                "targetHash": task["targetHash"],
-                "maxLength": task["maxLength"],
-            }
+        confirmed, nacked = self.rabbitmq.publish_tasks(
+            [Task.message_from_dict(task) for task in failed_tasks]
+        )
 
-            if self.rabbitmq.publish_task(task_message):
-                self.mongo.mark_task_retried(task["taskId"])
-                logger.info(f"Successfully retried task {task['taskId']}")
-            else:
-                logger.warning(f"Failed to retry task {task['taskId']}")
+        if confirmed:
+            self.mongo.mark_tasks_retried(confirmed)
+            logger.info(f"Successfully retried {len(confirmed)} tasks")
+        if nacked:
+            logger.warning(f"Failed to retry tasks: {nacked}")
 
     def _requeue_unfinished_tasks(self) -> None:
         unfinished_tasks = self.mongo.get_unfinished_tasks()
-        for task in unfinished_tasks:
-            task_message = {
-                "taskId": task["taskId"],
-                "requestId": task["requestId"],
-                "startIndex": task["startIndex"],
-                "count": task["count"],
-                "targetHash": task["targetHash"],
-                "maxLength": task["maxLength"],
-            }
+        if not unfinished_tasks:
+            return
 
-            if self.rabbitmq.publish_task(task_message):
-                if task["status"] == "QUEUED":
-                    self.mongo.mark_task_retried(task["taskId"])
-            else:
-                logger.warning(f"Failed to requeue unfinished task {task['taskId']}")
+        confirmed, nacked = self.rabbitmq.publish_tasks(
+            [Task.message_from_dict(task) for task in unfinished_tasks]
+        )
+
+        queued = {task["taskId"] for task in unfinished_tasks if task["status"] == "QUEUED"}
+        retried = [task_id for task_id in confirmed if task_id in queued]
+        if retried:
+            self.mongo.mark_tasks_retried(retried)
+        if nacked:
+            logger.warning(f"Failed to requeue unfinished tasks: {nacked}")
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from src.core import config
+from src.core.logging import get_logger
+from src.services.mongodb import MongoDBManager
+
+logger = get_logger("solved_cache")
+
+
+class SolvedHashCache:
+    """Bounded in-process LRU in front of the Mongo solved-hash index.
+
+    Entries hold the plaintexts found for a digest and the largest length whose
+    keyspace has been fully searched. Only hits are cached, so a hash solved by
+    another request is picked up from Mongo on the next lookup.
+    """
+
+    def __init__(self, mongo: "MongoDBManager", max_size: int = config.SOLVED_CACHE_SIZE) -> None:
+        self.mongo = mongo
+        self.max_size = max_size
+        self.entries: OrderedDict[str, dict] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, target_hash: str) -> dict | None:
+        target_hash = target_hash.lower()
+        entry = self._cached(target_hash)
+        if entry is not None:
+            return entry
+
+        entry = self.mongo.get_solved(target_hash)
+        if entry is not None:
+            self._put(target_hash, entry)
+        return entry
+
+    def lookup(self, target_hash: str, max_length: int) -> tuple[list[str], int]:
+        """Return the known plaintexts up to max_length and the length searched so far."""
+        try:
+            entry = self.get(target_hash)
+        except Exception as e:
+            logger.warning(f"Solved-hash lookup failed for {target_hash}: {e}")
+            return [], 0
+
+        return self._known(entry, max_length)
+
+    async def lookup_async(
+        self,
+        target_hash: str,
+        max_length: int,
+        get_solved: Callable[[str], Awaitable[dict | None]],
+    ) -> tuple[list[str], int]:
+        """lookup for the asyncio API, reading misses through an async driver."""
+        target_hash = target_hash.lower()
+        try:
+            entry = self._cached(target_hash)
+            if entry is None:
+                entry = await get_solved(target_hash)
+                if entry is not None:
+                    self._put(target_hash, entry)
+        except Exception as e:
+            logger.warning(f"Solved-hash lookup failed for {target_hash}: {e}")
+            return [], 0
+
+        return self._known(entry, max_length)
+
+    @staticmethod
+    def _known(entry: dict | None, max_length: int) -> tuple[list[str], int]:
+        if entry is None:
+            return [], 0
+
+        results = [r for r in entry.get("results", []) if len(r) <= max_length]
+        return results, min(entry.get("searchedLength", 0), max_length)
+
+    def record(self, cursor: dict, searched: bool) -> None:
+        """Store the outcome of the hashes a finished cursor was searching for."""
+        owner_id = cursor["ownerId"]
+        hashes = cursor.get("targetHashes") or [cursor["targetHash"]]
+        try:
+            requests = self.mongo.get_owner_requests(owner_id, hashes)
+            self.mongo.record_solved(requests, searched)
+        except Exception as e:
+            logger.error(f"Failed to record solved hashes for {owner_id}: {e}")
+            return
+
+        with self.lock:
+            for request in requests:
+                self.entries.pop(request["hash"], None)
+
+    def _cached(self, target_hash: str) -> dict | None:
+        with self.lock:
+            entry = self.entries.get(target_hash)
+            if entry is not None:
+                self.entries.move_to_end(target_hash)
+            return entry
+
+    def _put(self, target_hash: str, entry: dict) -> None:
+        with self.lock:
+            self.entries[target_hash] = entry
+            self.entries.move_to_end(target_hash)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
@@ -0,0 +1,59 @@
+import threading
+from typing import Callable
+
+from src.core.logging import get_logger
+from src.utils import cursor_progress
+
+logger = get_logger("status_bus")
+
+Subscriber = Callable[[dict], None]
+
+
+class StatusBus:
+    """In-process pub/sub of request status, fed by the result consumer.
+
+    Events are keyed by cursor owner (a requestId or batchId) and carry a
+    status payload: {"status": "IN_PROGRESS", "progress": n} while tasks
+    finish, then {"status": "READY"} once the owner's requests complete.
+    Subscribers are called on the consumer thread and must not block.
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: dict[str, set[Subscriber]] = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, owner_id: str, callback: Subscriber) -> Callable[[], None]:
+        with self.lock:
+            self.subscribers.setdefault(owner_id, set()).add(callback)
+
+        def unsubscribe() -> None:
+            with self.lock:
+                callbacks = self.subscribers.get(owner_id)
+                if callbacks is not None:
+                    callbacks.discard(callback)
+                    if not callbacks:
+                        del self.subscribers[owner_id]
+
+        return unsubscribe
+
+    def publish(self, owner_id: str, event: dict) -> None:
+        with self.lock:
+            callbacks = list(self.subscribers.get(owner_id, ()))
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.warning(f"Status subscriber for {owner_id} failed: {e}")
+
+    def publish_progress(self, cursor: dict) -> None:
+        progress = cursor_progress(cursor)
+        if progress is not None:
+            self.publish(cursor["ownerId"], {"status": "IN_PROGRESS", "progress": progress})
+
+    def publish_completed(self, owner_id: str, status: str) -> None:
+        self.publish(owner_id, {"status": status})
+
+    def publish_followers_completed(self, owner_id: str) -> None:
+        # Followers listen on their leader's owner; any event other than
+        # progress makes a stream re-read its own request.
+        self.publish(owner_id, {"status": "FOLLOWERS_READY"})
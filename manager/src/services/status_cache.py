@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+
+from src.core import config
+from src.core.logging import get_logger
+from src.utils import cursor_progress, observe_status_cache_eviction, observe_status_cache_lookup
+
+logger = get_logger("status_cache")
+
+
+class StatusCache:
+    """Bounded in-process LRU of status payloads keyed by requestId.
+
+    Entries remember the cursor owner whose results change them. The result
+    consumer refreshes the progress of an owner's entries as tasks finish and
+    drops them once its requests complete, so READY payloads, which never
+    change again, are kept until evicted. In-progress entries also expire
+    after STATUS_CACHE_TTL seconds, which bounds how stale they get when
+    another manager replica consumed the results.
+
+    Readers take the generation before reading MongoDB and pass it to put.
+    Every invalidation bumps it, so a payload read before an invalidation,
+    possibly from a lagging secondary, is not cached after it.
+    """
+
+    def __init__(
+        self, max_size: int = config.STATUS_CACHE_SIZE, ttl: float = config.STATUS_CACHE_TTL
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        # requestId -> (payload, owner_id, expires_at); expires_at is None for READY payloads.
+        self.entries: OrderedDict[str, tuple[dict, str, float | None]] = OrderedDict()
+        self.owners: dict[str, set[str]] = {}
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get(self, request_id: str) -> tuple[dict, str] | None:
+        """Return the cached payload and cursor owner of a request."""
+        with self.lock:
+            entry = self.entries.get(request_id)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(request_id)
+                observe_status_cache_eviction("expired")
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(request_id)
+
+        observe_status_cache_lookup(entry is not None)
+        return (entry[0], entry[1]) if entry is not None else None
+
+    def put(self, request_id: str, payload: dict, owner_id: str, generation: int) -> None:
+        if payload.get("status") not in ("IN_PROGRESS", "READY"):
+            return
+        expires_at = None if payload["status"] == "READY" else time.monotonic() + self.ttl
+
+        with self.lock:
+            if generation != self.generation:
+                return
+            if request_id in self.entries:
+                self._remove(request_id)
+            self.entries[request_id] = (payload, owner_id, expires_at)
+            self.owners.setdefault(owner_id, set()).add(request_id)
+            while len(self.entries) > self.max_size:
+                self._remove(next(iter(self.entries)))
+                observe_status_cache_eviction("size")
+
+    def update_progress(self, cursor: dict) -> None:
+        """Move the in-progress entries of a cursor's owner to its current progress."""
+        # Entries of finished cursors are about to be invalidated, not refreshed.
+        if cursor["cancelled"] or (cursor["exhausted"] and cursor["outstanding"] <= 0):
+            return
+        progress = cursor_progress(cursor)
+        if progress is None:
+            return
+
+        payload = {"status": "IN_PROGRESS", "progress": progress}
+        expires_at = time.monotonic() + self.ttl
+        with self.lock:
+            for request_id in self.owners.get(cursor["ownerId"], ()):
+                entry = self.entries[request_id]
+                if entry[0]["status"] == "IN_PROGRESS":
+                    self.entries[request_id] = (payload, entry[1], expires_at)
+
+    def invalidate(self, owner_id: str) -> None:
+        """Drop the entries of an owner whose requests just changed status."""
+        with self.lock:
+            self.generation += 1
+            for request_id in list(self.owners.get(owner_id, ())):
+                self._remove(request_id)
+
+    def _remove(self, request_id: str) -> None:
+        _, owner_id, _ = self.entries.pop(request_id)
+        request_ids = self.owners[owner_id]
+        request_ids.discard(request_id)
+        if not request_ids:
+            del self.owners[owner_id]
@@ -0,0 +1,43 @@
+import threading
+
+from src.core import config
+from src.core.logging import get_logger
+from src.utils import update_task_size
+
+logger = get_logger("throughput")
+
+
+class ThroughputEstimator:
+    """Pick brute-force task sizes from the throughput workers report.
+
+    Each finished task contributes its combinations per second to an
+    exponentially weighted average, so the estimate follows the worker pool
+    as nodes join or leave. New tasks are sized to take TARGET_TASK_DURATION
+    on an average worker.
+    """
+
+    def __init__(self) -> None:
+        self.rate: float | None = None
+        self.lock = threading.Lock()
+        update_task_size(config.TASK_SIZE)
+
+    def observe(self, combinations: int, elapsed: float) -> None:
+        if combinations <= 0 or elapsed <= 0:
+            return
+
+        rate = combinations / elapsed
+        with self.lock:
+            if self.rate is None:
+                self.rate = rate
+            else:
+                self.rate += config.THROUGHPUT_SMOOTHING * (rate - self.rate)
+        update_task_size(self.task_size())
+
+    def task_size(self) -> int:
+        with self.lock:
+            rate = self.rate
+        if rate is None:
+            return config.TASK_SIZE
+
+        size = int(rate * config.TARGET_TASK_DURATION)
+        return max(config.MIN_TASK_SIZE, min(config.MAX_TASK_SIZE, size))
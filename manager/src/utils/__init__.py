@@ -1,16 +1,48 @@
 from .decorators import retry, track_request
+from .metrics import (
+    REQUEST_STATUS_LABELS,
+    TASK_STATUSES,
+    observe_request_wait,
+    observe_status_cache_eviction,
+    observe_status_cache_lookup,
+    set_dispatcher_lag_source,
+    update_dispatch_publish_rate,
+    update_request_counts,
+    update_task_counts,
+    update_task_queue,
+    update_task_size,
+)
 from .task_partitioner import (
     calculate_total_combinations,
+    create_length_partitions,
     create_task_partitions,
+    cursor_progress,
+    index_to_string,
     validate_hash,
     validate_max_length,
+    validate_priority,
 )
 
 __all__ = [
+    "REQUEST_STATUS_LABELS",
+    "TASK_STATUSES",
     "track_request",
     "retry",
     "calculate_total_combinations",
+    "create_length_partitions",
     "create_task_partitions",
+    "cursor_progress",
+    "index_to_string",
     "validate_hash",
     "validate_max_length",
+    "validate_priority",
+    "observe_request_wait",
+    "observe_status_cache_eviction",
+    "observe_status_cache_lookup",
+    "set_dispatcher_lag_source",
+    "update_dispatch_publish_rate",
+    "update_request_counts",
+    "update_task_counts",
+    "update_task_queue",
+    "update_task_size",
 ]
@@ -1,3 +1,4 @@
+import inspect
 import time
 from functools import wraps
 from typing import Any, Callable, TypeVar, cast
@@ -10,6 +11,18 @@ F = TypeVar("F", bound=Callable[..., Any])
 
 
 def track_request(endpoint: F) -> F:
+    if inspect.iscoroutinefunction(endpoint):
+
+        @wraps(endpoint)
+        async def decorated_async(*args: Any, **kwargs: Any) -> Any:
+            start_time = time.time()
+            response = await endpoint(*args, **kwargs)
+            duration = time.time() - start_time
+            logger.info(f"{endpoint.__name__} took {duration:.3f}s")
+            return response
+
+        return cast(F, decorated_async)
+
     @wraps(endpoint)
     def decorated(*args: Any, **kwargs: Any) -> Any:
         start_time = time.time()
@@ -0,0 +1,91 @@
+from typing import Callable
+
+from prometheus_client import Counter, Gauge, Histogram
+
+REQUEST_STATUS_LABELS = {"IN_PROGRESS": "in_progress", "READY": "completed", "ERROR": "failed"}
+TASK_STATUSES = ("PENDING", "QUEUED", "DONE", "ERROR", "CANCELLED")
+
+manager_requests_in_progress = Gauge(
+    "manager_requests_in_progress", "Requests currently in progress"
+)
+
+manager_tasks_total = Gauge("manager_tasks_total", "Total tasks in system", ["status"])
+
+manager_requests_total_by_status = Gauge(
+    "manager_requests_total_by_status", "Total requests by status", ["status"]
+)
+
+task_queue_depth = Gauge("manager_task_queue_depth", "Messages ready in task.queue")
+
+task_queue_consumers = Gauge("manager_task_queue_consumers", "Consumers attached to task.queue")
+
+dispatch_publish_rate = Gauge(
+    "manager_dispatch_publish_rate", "Tasks published per second by the dispatcher"
+)
+
+dispatcher_lag = Gauge(
+    "manager_dispatcher_lag_seconds", "Seconds since the dispatcher last completed a cycle"
+)
+
+task_size = Gauge("manager_task_size", "Combinations per newly dispatched brute-force task")
+
+request_wait = Histogram(
+    "manager_request_wait_seconds",
+    "Seconds from request submission until its first task is dispatched",
+    ["priority"],
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+status_cache_hits = Counter("manager_status_cache_hits_total", "Status reads served from the cache")
+
+status_cache_misses = Counter(
+    "manager_status_cache_misses_total", "Status reads that missed the cache"
+)
+
+status_cache_evictions = Counter(
+    "manager_status_cache_evictions_total",
+    "Status cache entries evicted by size or expiry",
+    ["reason"],
+)
+
+
+def update_request_counts(counts: dict[str, int]) -> None:
+    """Set the request gauges from counts keyed by the statuses in REQUEST_STATUS_LABELS."""
+    manager_requests_in_progress.set(counts["IN_PROGRESS"])
+    for status, label in REQUEST_STATUS_LABELS.items():
+        manager_requests_total_by_status.labels(status=label).set(counts[status])
+
+
+def update_task_counts(counts: dict[str, int]) -> None:
+    """Set the task gauges from counts keyed by the statuses in TASK_STATUSES."""
+    for status in TASK_STATUSES:
+        manager_tasks_total.labels(status=status.lower()).set(counts[status])
+
+
+def update_task_queue(depth: int, consumers: int) -> None:
+    task_queue_depth.set(depth)
+    task_queue_consumers.set(consumers)
+
+
+def update_dispatch_publish_rate(rate: float) -> None:
+    dispatch_publish_rate.set(rate)
+
+
+def set_dispatcher_lag_source(source: Callable[[], float]) -> None:
+    dispatcher_lag.set_function(source)
+
+
+def update_task_size(size: int) -> None:
+    task_size.set(size)
+
+
+def observe_request_wait(seconds: float, priority: int) -> None:
+    request_wait.labels(priority=str(priority)).observe(seconds)
+
+
+def observe_status_cache_lookup(hit: bool) -> None:
+    (status_cache_hits if hit else status_cache_misses).inc()
+
+
+def observe_status_cache_eviction(reason: str) -> None:
+    status_cache_evictions.labels(reason=reason).inc()
@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from src.core import config
 
 
@@ -8,19 +10,91 @@ def calculate_total_combinations(max_length: int) -> int:
     return total
 
 
-def create_task_partitions(total_combinations: int, task_size: int) -> list[dict]:
+def cursor_progress(cursor: dict) -> int | None:
+    """Percentage of a cursor's scheduled keyspace that has been searched.
+
+    Task sizes change as throughput is learned, so progress is measured in
+    combinations rather than tasks.
+    """
+    scheduled = cursor["totalCombinations"] - cursor.get("startIndex", 0)
+    if scheduled <= 0:
+        return None
+    return int(cursor.get("completedCombinations", 0) / scheduled * 100)
+
+
+def index_to_string(index: int, max_length: int, fixed: bool = False) -> str:
+    """Decode a keyspace index the same way the worker's StringGenerator does.
+
+    With fixed=True the index is taken within strings of exactly max_length.
+    """
+    length = max_length if fixed else 1
+    while not fixed and length <= max_length and index >= config.ALPHABET_SIZE**length:
+        index -= config.ALPHABET_SIZE**length
+        length += 1
+
+    if length > max_length or index >= config.ALPHABET_SIZE**length:
+        raise ValueError(f"Index exceeds maximum combinations for length {max_length}")
+
+    chars: list[str] = []
+    for _ in range(length):
+        index, char_index = divmod(index, config.ALPHABET_SIZE)
+        chars.append(config.ALPHABET[char_index])
+
+    return "".join(reversed(chars))
+
+
+def create_task_partitions(
+    total_combinations: int, task_size: int, start: int = 0
+) -> Iterator[dict]:
     if task_size <= 0:
         raise ValueError("task_size must be positive")
 
-    partitions = []
-    start = 0
-
     while start < total_combinations:
         count = min(task_size, total_combinations - start)
-        partitions.append({"start_index": start, "count": count})
+        yield {"start_index": start, "count": count}
         start += count
 
-    return partitions
+
+def _suffix_length(length: int, task_size: int) -> int:
+    suffix_length = 1
+    while suffix_length < length and config.ALPHABET_SIZE**suffix_length < task_size:
+        suffix_length += 1
+    return suffix_length
+
+
+def create_length_partitions(
+    total_combinations: int, task_size: int, start: int = 0
+) -> Iterator[dict]:
+    """Slice the index space into tasks that never cross a length or prefix boundary.
+
+    Strings of each length are grouped into blocks sharing a fixed prefix, where
+    the suffix block is the smallest power of the alphabet holding task_size
+    candidates (or the whole length when shorter). Every partition carries its
+    length, prefix and suffix offset next to the global start_index and count.
+    """
+    if task_size <= 0:
+        raise ValueError("task_size must be positive")
+
+    length = 1
+    length_start = 0
+    while start < total_combinations:
+        while start >= length_start + config.ALPHABET_SIZE**length:
+            length_start += config.ALPHABET_SIZE**length
+            length += 1
+
+        suffix_length = _suffix_length(length, task_size)
+        block_size = config.ALPHABET_SIZE**suffix_length
+
+        prefix_index, suffix_start = divmod(start - length_start, block_size)
+        count = min(task_size, block_size - suffix_start, total_combinations - start)
+        yield {
+            "start_index": start,
+            "count": count,
+            "length": length,
+            "prefix": index_to_string(prefix_index, length - suffix_length, fixed=True),
+            "suffix_start": suffix_start,
+        }
+        start += count
 
 
 def validate_hash(target_hash: str) -> bool:
@@ -34,3 +108,11 @@ def validate_max_length(max_length: int) -> bool:
         isinstance(max_length, int)
         and config.MIN_ALLOWED_LENGTH <= max_length <= config.MAX_ALLOWED_LENGTH
     )
+
+
+def validate_priority(priority: int) -> bool:
+    return bool(
+        isinstance(priority, int)
+        and not isinstance(priority, bool)
+        and config.MIN_PRIORITY <= priority <= config.MAX_PRIORITY
+    )
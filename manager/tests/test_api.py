@@ -0,0 +1,19 @@
+import pytest
+
+from src.api import wants_ndjson
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, False),
+        ("*/*", False),
+        ("application/json", False),
+        ("application/x-ndjson", True),
+        ("application/json;q=0.5, application/x-ndjson", True),
+        ("application/json, application/x-ndjson;q=0.5", False),
+        ("application/x-ndjson-seq", False),
+    ],
+)
+def test_wants_ndjson_negotiates_accept_header(accept: str | None, expected: bool) -> None:
+    assert wants_ndjson(accept) is expected
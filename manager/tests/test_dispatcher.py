@@ -0,0 +1,160 @@
+from typing import cast
+
+import pytest
+
+from src.models import TaskCursor
+from src.services import MongoDBManager, RabbitMQManager, TaskDispatcher
+from src.utils import calculate_total_combinations, index_to_string
+
+MAX_LENGTH = 3
+TOTAL = calculate_total_combinations(MAX_LENGTH)
+
+
+class Mongo:
+    """In-memory stand-in for the task and cursor writes the dispatcher makes."""
+
+    def __init__(self, cursors: list[dict]) -> None:
+        self.cursors = {cursor["ownerId"]: dict(cursor) for cursor in cursors}
+        self.tasks: dict[str, dict] = {}
+        self.lose_claims = False
+
+    def get_open_cursors(self) -> list[dict]:
+        return [dict(cursor) for cursor in self.cursors.values() if not cursor["exhausted"]]
+
+    def get_draining_cursors(self) -> list[dict]:
+        return []
+
+    def insert_tasks(self, tasks: list[dict]) -> list[str]:
+        self.tasks.update((task["taskId"], task) for task in tasks)
+        return [task["taskId"] for task in tasks]
+
+    def delete_tasks(self, task_ids: list[str]) -> None:
+        for task_id in task_ids:
+            self.tasks.pop(task_id, None)
+
+    def claim_range(self, cursor: dict, end_index: int, task_count: int) -> bool:
+        stored = self.cursors[cursor["ownerId"]]
+        if self.lose_claims or stored["nextIndex"] != cursor["nextIndex"]:
+            return False
+        stored["nextIndex"] = end_index
+        stored["exhausted"] = end_index >= stored["totalCombinations"]
+        stored["outstanding"] += task_count
+        return True
+
+    def mark_tasks_queued(self, task_ids: list[str]) -> None:
+        pass
+
+
+class RabbitMQ:
+    def __init__(self, depth: int = 0, consumers: int = 1) -> None:
+        self.depth = depth
+        self.consumers = consumers
+        self.published: list[dict] = []
+
+    def get_queue_depth(self) -> tuple[int, int]:
+        return self.depth, self.consumers
+
+    def publish_tasks(self, messages: list[dict]) -> tuple[list[str], list[str]]:
+        self.published.extend(messages)
+        return [message["taskId"] for message in messages], []
+
+
+@pytest.fixture(autouse=True)
+def small_tasks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.core.config.TASK_SIZE", 100)
+    monkeypatch.setattr("src.core.config.DISPATCH_WINDOW", 4)
+
+
+def cursor(owner_id: str = "r1", **fields: object) -> dict:
+    data = TaskCursor(owner_id, MAX_LENGTH, TOTAL, target_hash="0" * 32).to_dict()
+    data.update(fields)
+    return data
+
+
+def dispatcher(mongo: Mongo, rabbitmq: RabbitMQ) -> TaskDispatcher:
+    return TaskDispatcher(cast(MongoDBManager, mongo), cast(RabbitMQManager, rabbitmq))
+
+
+def candidates(tasks: list[dict]) -> list[str]:
+    """Expand dispatched tasks into the candidates they cover, in dispatch order."""
+    covered = []
+    for task in sorted(tasks, key=lambda task: task["startIndex"]):
+        for index in range(task["startIndex"], task["startIndex"] + task["count"]):
+            covered.append(index_to_string(index, MAX_LENGTH))
+    return covered
+
+
+def test_cursor_advances_over_whole_keyspace() -> None:
+    mongo = Mongo([cursor()])
+    rabbitmq = RabbitMQ()
+    tasks = dispatcher(mongo, rabbitmq)
+
+    while not mongo.cursors["r1"]["exhausted"]:
+        current = mongo.get_open_cursors()[0]
+        assert tasks._dispatch_cursor(current, limit=2) > 0
+        mongo.cursors["r1"]["outstanding"] = 0
+
+    stored = mongo.cursors["r1"]
+    assert stored["nextIndex"] == TOTAL
+    assert candidates(list(mongo.tasks.values())) == [
+        index_to_string(index, MAX_LENGTH) for index in range(TOTAL)
+    ]
+    assert len(rabbitmq.published) == len(mongo.tasks)
+
+
+def test_dispatch_updates_the_passed_cursor() -> None:
+    mongo = Mongo([cursor()])
+    current = mongo.get_open_cursors()[0]
+
+    sent = dispatcher(mongo, RabbitMQ())._dispatch_cursor(current, limit=2)
+
+    assert sent == 2
+    assert current["nextIndex"] == mongo.cursors["r1"]["nextIndex"] > 0
+    assert current["outstanding"] == 2
+    assert current["firstDispatchAt"] is not None
+
+
+def test_dispatch_window_caps_outstanding_tasks() -> None:
+    mongo = Mongo([cursor(outstanding=3)])
+
+    sent = dispatcher(mongo, RabbitMQ())._dispatch_cursor(mongo.get_open_cursors()[0], limit=10)
+
+    assert sent == 1
+    assert mongo.cursors["r1"]["outstanding"] == 4
+
+
+def test_full_dispatch_window_sends_nothing() -> None:
+    mongo = Mongo([cursor(outstanding=4)])
+
+    sent = dispatcher(mongo, RabbitMQ())._dispatch_cursor(mongo.get_open_cursors()[0], limit=10)
+
+    assert sent == 0
+    assert mongo.tasks == {}
+
+
+def test_lost_claim_leaves_no_tasks_behind() -> None:
+    mongo = Mongo([cursor()])
+    mongo.lose_claims = True
+    rabbitmq = RabbitMQ()
+
+    sent = dispatcher(mongo, rabbitmq)._dispatch_cursor(mongo.get_open_cursors()[0], limit=2)
+
+    assert sent == 0
+    assert mongo.tasks == {}
+    assert rabbitmq.published == []
+    assert mongo.cursors["r1"]["nextIndex"] == 0
+
+
+def test_cycle_respects_queue_budget_and_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.core.config.QUEUE_MIN_DEPTH", 10)
+    monkeypatch.setattr("src.core.config.QUEUE_DEPTH_PER_CONSUMER", 4)
+    mongo = Mongo([cursor("r1"), cursor("r2")])
+    rabbitmq = RabbitMQ(depth=4, consumers=3)
+
+    # The queue has room for 8 more tasks, but each cursor may only have
+    # DISPATCH_WINDOW of them out.
+    dispatched = dispatcher(mongo, rabbitmq)._dispatch_cycle()
+
+    assert dispatched == 8
+    assert mongo.cursors["r1"]["outstanding"] == 4
+    assert mongo.cursors["r2"]["outstanding"] == 4
@@ -0,0 +1,106 @@
+import hashlib
+import io
+from collections.abc import Iterator
+from pathlib import Path
+from typing import cast
+
+import orjson
+
+from src.import_requests import RequestImporter
+from src.services import LookupTable, MongoDBManager, SolvedHashCache
+
+KNOWN = hashlib.md5(b"abc").hexdigest()
+
+
+class Mongo:
+    """Records the writes an import makes, optionally failing the cursor insert."""
+
+    def __init__(self, fail_cursors: bool = False) -> None:
+        self.fail_cursors = fail_cursors
+        self.requests: list[dict] = []
+        self.cursors: list[dict] = []
+        self.deleted_batches: list[str] = []
+
+    def insert_requests(self, requests: list[dict]) -> list[str]:
+        self.requests.extend(requests)
+        return [request["requestId"] for request in requests]
+
+    def insert_cursor(self, cursor_data: dict) -> str:
+        if self.fail_cursors:
+            raise RuntimeError("write failed")
+        self.cursors.append(cursor_data)
+        return cast(str, cursor_data["ownerId"])
+
+    def delete_batches(self, batch_ids: list[str]) -> None:
+        self.deleted_batches.extend(batch_ids)
+
+
+class SolvedCache:
+    def lookup(self, target_hash: str, max_length: int) -> tuple[list[str], int]:
+        return (["abc"], max_length) if target_hash == KNOWN else ([], 0)
+
+
+def importer(mongo: Mongo, tmp_path: Path, batch_size: int = 2) -> RequestImporter:
+    return RequestImporter(
+        cast(MongoDBManager, mongo),
+        cast(SolvedHashCache, SolvedCache()),
+        LookupTable(str(tmp_path / "missing.lut")),
+        batch_size,
+    )
+
+
+def line(target_hash: str, max_length: int = 4) -> bytes:
+    return orjson.dumps({"hash": target_hash, "maxLength": max_length}) + b"\n"
+
+
+def outcomes(report: io.BytesIO) -> list[dict]:
+    return [orjson.loads(row) for row in report.getvalue().splitlines()]
+
+
+def test_reports_outcome_of_every_line(tmp_path: Path) -> None:
+    mongo = Mongo()
+    report = io.BytesIO()
+    lines = [line("a" * 32), b"not json\n", b"\n", line(KNOWN), line("xyz"), line("b" * 32, 5)]
+
+    counts = importer(mongo, tmp_path).run(lines, report)
+
+    assert counts == {"lines": 5, "created": 2, "ready": 1, "rejected": 2}
+    by_line = {outcome["line"]: outcome for outcome in outcomes(report)}
+    assert sorted(by_line) == [1, 2, 4, 5, 6]
+    assert by_line[1]["status"] == "IN_PROGRESS"
+    assert by_line[2]["error"] == "Invalid JSON"
+    assert by_line[4]["status"] == "READY"
+    assert by_line[5]["error"] == "Invalid MD5 hash"
+    assert by_line[6]["status"] == "IN_PROGRESS"
+    assert len(mongo.requests) == 3
+    assert len(mongo.cursors) == 2
+
+
+def test_batches_are_reported_while_streaming(tmp_path: Path) -> None:
+    report = io.BytesIO()
+    reported_before: list[int] = []
+
+    def lines() -> Iterator[bytes]:
+        for i in range(5):
+            reported_before.append(len(outcomes(report)))
+            yield line(f"{i:032x}")
+
+    importer(Mongo(), tmp_path, batch_size=2).run(lines(), report)
+
+    # Each batch of two is written out before the next line is read.
+    assert reported_before == [0, 0, 2, 2, 4]
+    assert len(outcomes(report)) == 5
+
+
+def test_failed_batch_is_rolled_back_and_reported(tmp_path: Path) -> None:
+    mongo = Mongo(fail_cursors=True)
+    report = io.BytesIO()
+
+    counts = importer(mongo, tmp_path).run([line("a" * 32), line(KNOWN)], report)
+
+    assert counts == {"lines": 2, "created": 0, "ready": 0, "rejected": 2}
+    assert outcomes(report) == [
+        {"line": 1, "error": "Import failed"},
+        {"line": 2, "error": "Import failed"},
+    ]
+    assert mongo.deleted_batches == [mongo.requests[0]["batchId"]]
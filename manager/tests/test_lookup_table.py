@@ -0,0 +1,55 @@
+import hashlib
+from collections.abc import Iterator
+from itertools import product
+from pathlib import Path
+
+import pytest
+
+from src.services.lookup_table import LookupTable
+
+ALPHABET = "abc"
+MAX_LENGTH = 3
+
+
+@pytest.fixture
+def table(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[LookupTable]:
+    monkeypatch.setattr("src.core.config.ALPHABET", ALPHABET)
+    monkeypatch.setattr("src.core.config.ALPHABET_SIZE", len(ALPHABET))
+    path = str(tmp_path / "md5.lut")
+    LookupTable.build(path, MAX_LENGTH)
+    table = LookupTable(path)
+    yield table
+    table.close()
+
+
+def candidates() -> list[str]:
+    return [
+        "".join(chars)
+        for length in range(1, MAX_LENGTH + 1)
+        for chars in product(ALPHABET, repeat=length)
+    ]
+
+
+def test_build_covers_every_candidate(table: LookupTable) -> None:
+    assert table.max_length == MAX_LENGTH
+    assert table.count == len(candidates())
+    for candidate in candidates():
+        assert table.lookup(hashlib.md5(candidate.encode()).hexdigest()) == [candidate]
+
+
+def test_truncated_digest_match_is_rejected(table: LookupTable) -> None:
+    # Same leading bytes as a stored record, different full digest.
+    digest = bytearray(hashlib.md5(b"abc").digest())
+    digest[-1] ^= 0xFF
+
+    assert table.lookup(digest.hex()) == []
+
+
+def test_lookup_outside_table_finds_nothing(table: LookupTable) -> None:
+    assert table.lookup(hashlib.md5(b"abcd").hexdigest()) == []
+
+
+def test_missing_table_finds_nothing(tmp_path: Path) -> None:
+    table = LookupTable(str(tmp_path / "missing.lut"))
+
+    assert table.lookup(hashlib.md5(b"a").hexdigest()) == []
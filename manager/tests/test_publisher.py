@@ -0,0 +1,80 @@
+from collections.abc import Callable
+from typing import cast
+
+import pika
+from pika.channel import Channel as PikaChannel
+from pika.frame import Method
+from pika.spec import Basic, BasicProperties
+
+from src.services.publisher import ConfirmPublisher
+
+MESSAGES = [("m1", b"{}"), ("m2", b"{}"), ("m3", b"{}")]
+
+
+class Channel:
+    is_open = True
+
+    def __init__(self) -> None:
+        self.published: list[str] = []
+
+    def basic_publish(self, properties: BasicProperties, **_: object) -> None:
+        self.published.append(properties.message_id)
+
+
+class IOLoop:
+    """Runs callbacks handed to the I/O thread right away, or holds them as a busy loop would."""
+
+    def __init__(self, on_callback: Callable[[Callable[[], None]], None] | None) -> None:
+        self.on_callback = on_callback
+        self.callbacks: list[Callable[[], None]] = []
+
+    def add_callback_threadsafe(self, callback: Callable[[], None]) -> None:
+        if self.on_callback is None:
+            self.callbacks.append(callback)
+        else:
+            self.on_callback(callback)
+
+
+class Connection:
+    def __init__(self, on_callback: Callable[[Callable[[], None]], None] | None = None) -> None:
+        self.ioloop = IOLoop(on_callback)
+
+
+def publisher(
+    on_callback: Callable[[Callable[[], None]], None] | None = None,
+) -> tuple[ConfirmPublisher, Channel, Connection]:
+    confirm_publisher = ConfirmPublisher(pika.ConnectionParameters())
+    channel = Channel()
+    connection = Connection(on_callback)
+    confirm_publisher.channel = cast(PikaChannel, channel)
+    confirm_publisher.connection = cast(pika.SelectConnection, connection)
+    confirm_publisher.ready.set()
+    return confirm_publisher, channel, connection
+
+
+def test_batch_confirmed_by_multiple_ack() -> None:
+    def publish_and_ack(callback: Callable[[], None]) -> None:
+        callback()
+        ack = Basic.Ack(delivery_tag=len(MESSAGES), multiple=True)
+        confirm_publisher._on_delivery_confirmation(Method(1, ack))
+
+    confirm_publisher, channel, _ = publisher(publish_and_ack)
+
+    confirmed = confirm_publisher.publish("", "task.queue", MESSAGES, timeout=1)
+
+    assert confirmed == ["m1", "m2", "m3"]
+    assert channel.published == ["m1", "m2", "m3"]
+    assert confirm_publisher.pending == {}
+
+
+def test_timed_out_batch_leaves_nothing_pending() -> None:
+    confirm_publisher, channel, connection = publisher()
+
+    confirmed = confirm_publisher.publish("", "task.queue", MESSAGES, timeout=0.01)
+    # The I/O thread only gets to the batch after the caller gave up on it.
+    for callback in connection.ioloop.callbacks:
+        callback()
+
+    assert confirmed == []
+    assert channel.published == []
+    assert confirm_publisher.pending == {}
@@ -0,0 +1,43 @@
+import pytest
+
+from src.utils import create_length_partitions
+from src.utils.task_partitioner import index_to_string
+
+ALPHABET = "abc"
+MAX_LENGTH = 4
+TOTAL = sum(len(ALPHABET) ** length for length in range(1, MAX_LENGTH + 1))
+
+
+@pytest.fixture(autouse=True)
+def small_alphabet(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.core.config.ALPHABET", ALPHABET)
+    monkeypatch.setattr("src.core.config.ALPHABET_SIZE", len(ALPHABET))
+
+
+def candidates(partition: dict) -> list[str]:
+    """Expand a partition from its length, prefix and suffix offset alone."""
+    suffix_length = partition["length"] - len(partition["prefix"])
+    return [
+        partition["prefix"] + index_to_string(suffix, suffix_length, fixed=True)
+        for suffix in range(
+            partition["suffix_start"], partition["suffix_start"] + partition["count"]
+        )
+    ]
+
+
+@pytest.mark.parametrize("task_size", [1, 2, 4, 5, 9, 30])
+@pytest.mark.parametrize("start", [0, 2, 11, 40])
+def test_length_partitions_cover_index_to_string(task_size: int, start: int) -> None:
+    partitions = list(create_length_partitions(TOTAL, task_size, start))
+
+    next_index = start
+    for partition in partitions:
+        assert partition["start_index"] == next_index
+        assert 0 < partition["count"] <= task_size
+        want = [
+            index_to_string(index, MAX_LENGTH)
+            for index in range(next_index, next_index + partition["count"])
+        ]
+        assert candidates(partition) == want
+        next_index += partition["count"]
+    assert next_index == TOTAL
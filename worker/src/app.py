@@ -5,15 +5,18 @@ import orjson
 from pika.adapters.blocking_connection import BlockingChannel
 from pika.spec import Basic, BasicProperties
 
-from src.core.config import WORKER_ID
+from src.core.config import WORKER_ID, WORKER_PROCS
 from src.core.logging import get_logger, setup_logging
-from src.services import RabbitMQClient, TaskProcessor
+from src.services import CheckpointStore, ControlListener, RabbitMQClient, TaskProcessor
 from src.utils import SignalHandler, start_metrics_server, update_memory_usage
 
 
 def parse_arguments() -> Namespace:
     parser = ArgumentParser()
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    parser.add_argument(
+        "--procs", type=int, default=WORKER_PROCS, help="Number of hashing processes per task"
+    )
     return parser.parse_args()
 
 
@@ -28,19 +31,33 @@ class WorkerApp:
         self.worker_id = WORKER_ID
         logger.info(f"Initializing worker {self.worker_id}")
 
-        self.processor = TaskProcessor(self.worker_id)
+        self.signal_handler = SignalHandler()
+
+        # The hashing pool forks, so it starts before any AMQP or Mongo socket
+        # exists for the children to inherit.
+        self.processor = TaskProcessor(
+            self.worker_id,
+            procs=args.procs,
+            heartbeat=lambda: self.rabbitmq.process_data_events(),
+            is_cancelled=lambda request_id: self.control.is_cancelled(request_id),
+            publish=lambda result: self.rabbitmq.publish_result(result),
+            take_split=lambda task_id: self.control.take_split(task_id),
+            is_stopping=lambda: not self.signal_handler.is_running(),
+        )
         self.rabbitmq = RabbitMQClient()
+        self.control = ControlListener(wants_split=self.processor.is_running)
+        self.control.start()
+        self.checkpoints = CheckpointStore()
 
         start_metrics_server()
         update_memory_usage()
 
-        self.signal_handler = SignalHandler(self.shutdown)
-
         logger.info(f"Worker {self.worker_id} initialized successfully")
 
     def shutdown(self) -> None:
         logger.info("Initiating graceful shutdown...")
-        self.rabbitmq.stop_consuming()
+        self.processor.close()
+        self.control.stop()
         self.rabbitmq.close()
 
         logger.info("All resources released")
@@ -62,6 +79,9 @@ class WorkerApp:
 
             update_memory_usage()
 
+            if method.redelivered:
+                self.checkpoints.resume(task_data)
+
             result = self.processor.process_task(task_data)
 
             if result is None:
@@ -88,12 +108,12 @@ class WorkerApp:
     def run(self) -> int:
         logger.info(f"Worker {self.worker_id} started, waiting for tasks...")
         try:
-            self.rabbitmq.consume_tasks(self._callback)
-        except KeyboardInterrupt:
-            logger.info("Worker stopped by user")
+            self.rabbitmq.consume_tasks(self._callback, self.signal_handler.is_running)
         except Exception as e:
             logger.error(f"Fatal error: {e}")
             return 1
+        finally:
+            self.shutdown()
 
         return 0
 
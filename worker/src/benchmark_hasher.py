@@ -0,0 +1,92 @@
+import os
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Callable
+
+from src.core import MD5Hasher, StringGenerator, create_hasher
+from src.core.config import ALPHABET, HASHER_BATCH_SIZE
+from src.core.logging import get_logger, setup_logging
+from src.services.processor import _take_batch, _target_digests
+
+logger = get_logger("benchmark_hasher")
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Compare candidate hashing paths on one keyspace range")
+    parser.add_argument("--count", type=int, default=2_000_000, help="Candidates per path")
+    parser.add_argument("--max-length", type=int, default=6, help="maxLength of the range")
+    parser.add_argument(
+        "--start", type=int, default=50_000_000, help="Index of the first candidate"
+    )
+    parser.add_argument("--targets", type=int, default=1, help="Target digests searched at once")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    return parser.parse_args()
+
+
+def per_string(args: Namespace, target_hashes: list[str]) -> int:
+    """The path tasks took before blocks: one string, encode and fresh md5 per candidate."""
+    generator = StringGenerator(ALPHABET)
+    found = 0
+    for candidate in generator.generate_range(args.start, args.count, args.max_length):
+        for target_hash in target_hashes:
+            if MD5Hasher.check_match(candidate, target_hash):
+                found += 1
+    return found
+
+
+def blocks(backend: str) -> Callable[[Namespace, list[str]], int]:
+    """The block path TaskProcessor runs, with the given hasher backend."""
+
+    def run(args: Namespace, target_hashes: list[str]) -> int:
+        generator = StringGenerator(ALPHABET)
+        hasher = create_hasher(backend, HASHER_BATCH_SIZE)
+        target_digests = _target_digests(target_hashes)
+        found = 0
+        scanned = 0
+        candidates = generator.iter_blocks(args.start, args.count, args.max_length)
+        while batch := _take_batch(candidates, hasher.batch_size, args.count - scanned):
+            found += len(hasher.find_block_matches(batch, generator.suffixes, target_digests))
+            scanned += sum(hi - lo for _, lo, hi in batch)
+        return found
+
+    return run
+
+
+def main(args: Namespace) -> None:
+    generator = StringGenerator(ALPHABET)
+    # The last candidate of the range is always a target, so every path has
+    # to scan all of it and report exactly one match.
+    last = generator.index_to_string(args.start + args.count - 1, args.max_length)
+    target_hashes = [MD5Hasher.hash_string(last)] + [
+        os.urandom(16).hex() for _ in range(args.targets - 1)
+    ]
+
+    paths: dict[str, Callable[[Namespace, list[str]], int]] = {
+        "per-string": per_string,
+        "blocks/hashlib": blocks("hashlib"),
+    }
+    if create_hasher("numpy", HASHER_BATCH_SIZE).name == "numpy":
+        paths["blocks/numpy"] = blocks("numpy")
+    else:
+        logger.warning("numpy is not installed, skipping the numpy backend")
+
+    print(f"{'path':<15} {'candidates':>11} {'seconds':>8} {'cand/s':>12} {'speedup':>8}")
+    baseline = None
+    for name, run in paths.items():
+        started = time.perf_counter()
+        found = run(args, target_hashes)
+        elapsed = time.perf_counter() - started
+        if found != 1:
+            raise RuntimeError(f"{name} found {found} matches instead of 1")
+
+        rate = args.count / elapsed
+        baseline = baseline or rate
+        print(
+            f"{name:<15} {args.count:>11} {elapsed:>8.2f} {rate:>12,.0f} {rate / baseline:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    setup_logging(args.verbose)
+    main(args)
@@ -1,4 +1,5 @@
 from .generator import StringGenerator
-from .hasher import MD5Hasher
+from .hasher import MD5Hasher, NumpyMD5Hasher, create_hasher
+from .rainbow import RainbowTable
 
-__all__ = ["MD5Hasher", "StringGenerator"]
+__all__ = ["MD5Hasher", "NumpyMD5Hasher", "RainbowTable", "StringGenerator", "create_hasher"]
@@ -15,9 +15,30 @@ RABBITMQ_PORT: Final = int(config("RABBITMQ_PORT", default="5672"))
 RABBITMQ_USER: Final = config("RABBITMQ_USER", default="guest")
 RABBITMQ_PASS: Final = config("RABBITMQ_PASS", default="guest")
 RABBITMQ_CONNECTION_SETTINGS = {"heartbeat": 600, "blocked_connection_timeout": 300}
+CANCEL_EXCHANGE: Final = "cancel.exchange"
+CANCELLED_REQUESTS_CACHE_SIZE: Final = 10000
+SPLIT_REQUESTS_CACHE_SIZE: Final = 1000
+
+MONGO_URI: Final = config("MONGO_URI", default="")
+MONGO_CONNECTION_SETTINGS = {
+    "readPreference": "primaryPreferred",
+    "serverSelectionTimeoutMS": 2000,
+    "connectTimeoutMS": 2000,
+}
 
 METRICS_PORT: Final = int(config("METRICS_PORT", default="7077"))
 
 MAX_RETRIES: Final = 5
 RETRY_DELAY: Final = 2
+CONSUME_POLL_INTERVAL: Final = 1.0
 PROGRESS_REPORT_INTERVAL: Final = 10000
+
+WORKER_PROCS: Final = int(config("WORKER_PROCS", default="1"))
+POOL_POLL_INTERVAL: Final = 1.0
+CANCEL_CHECK_BLOCKS: Final = 1000
+CHECKPOINT_INTERVAL: Final = float(config("CHECKPOINT_INTERVAL", default="2"))
+POOL_ROUND_SIZE: Final = int(config("POOL_ROUND_SIZE", default="1000000"))
+HASHER_BACKEND: Final = config("HASHER_BACKEND", default="hashlib")
+HASHER_BATCH_SIZE: Final = int(config("HASHER_BATCH_SIZE", default="65536"))
+
+RAINBOW_TABLE_DIR: Final = config("RAINBOW_TABLE_DIR", default="rainbow")
@@ -1,4 +1,4 @@
-from typing import Generator
+from typing import Generator, Iterator
 
 from src.core.logging import get_logger
 
@@ -9,6 +9,16 @@ class StringGenerator:
     def __init__(self, alphabet: str) -> None:
         self.alphabet = alphabet
         self.alphabet_size = len(alphabet)
+        self.alphabet_bytes = alphabet.encode()
+        self.suffixes = [bytes((char,)) for char in self.alphabet_bytes]
+        self._successor = self._build_successor_table()
+
+    def _build_successor_table(self) -> bytes:
+        table = bytearray(range(256))
+        for i in range(self.alphabet_size - 1):
+            table[self.alphabet_bytes[i]] = self.alphabet_bytes[i + 1]
+        table[self.alphabet_bytes[-1]] = self.alphabet_bytes[0]
+        return bytes(table)
 
     def index_to_string(self, index: int, max_length: int) -> str:
         length = 1
@@ -36,3 +46,102 @@ class StringGenerator:
     def generate_range(self, start_index: int, count: int, max_length: int) -> Generator:
         for i in range(count):
             yield self.index_to_string(start_index + i, max_length)
+
+    def iter_range(self, start_index: int, count: int, max_length: int) -> Iterator[bytes]:
+        """Yield the same candidates as generate_range, as bytes.
+
+        The start index is decoded once; every following candidate is produced by
+        stepping a digit buffer forward like an odometer, rolling over into the
+        next length when the current one is exhausted.
+        """
+        if count <= 0:
+            return
+
+        digits = bytearray(self.index_to_string(start_index, max_length).encode())
+        first = self.alphabet_bytes[0]
+        last = self.alphabet_bytes[-1]
+        successor = self._successor
+
+        for _ in range(count - 1):
+            yield bytes(digits)
+
+            pos = len(digits) - 1
+            while pos >= 0 and digits[pos] == last:
+                digits[pos] = first
+                pos -= 1
+
+            if pos >= 0:
+                digits[pos] = successor[digits[pos]]
+            elif len(digits) < max_length:
+                digits.append(first)
+            else:
+                raise ValueError(
+                    f"Index {start_index + count - 1} exceeds maximum combinations for length {max_length}"
+                )
+
+        yield bytes(digits)
+
+    def iter_blocks(
+        self, start_index: int, count: int, max_length: int
+    ) -> Iterator[tuple[bytes, int, int]]:
+        """Yield the range as (prefix, lo, hi) blocks sharing every character but the last.
+
+        Each block stands for the candidates prefix + alphabet[i] for i in [lo, hi),
+        so callers can reuse per-prefix work across up to alphabet_size candidates.
+        """
+        if count <= 0:
+            return
+
+        start = self.index_to_string(start_index, max_length).encode()
+        yield from self._blocks_from(start, count, max_length)
+
+    def iter_prefix_blocks(
+        self, prefix: str, length: int, suffix_start: int, count: int
+    ) -> Iterator[tuple[bytes, int, int]]:
+        """Yield iter_blocks-style blocks for a task pinned to one length and prefix.
+
+        suffix_start is the offset within the strings of the given length that
+        start with prefix, so no length has to be derived from a global index.
+        """
+        if count <= 0:
+            return
+
+        suffix = bytearray()
+        for _ in range(length - len(prefix)):
+            suffix_start, char_index = divmod(suffix_start, self.alphabet_size)
+            suffix.append(self.alphabet_bytes[char_index])
+        suffix.reverse()
+
+        yield from self._blocks_from(prefix.encode() + bytes(suffix), count, length)
+
+    def _blocks_from(
+        self, start: bytes, count: int, max_length: int
+    ) -> Iterator[tuple[bytes, int, int]]:
+        prefix = bytearray(start[:-1])
+        lo = self.alphabet_bytes.index(start[-1])
+        first = self.alphabet_bytes[0]
+        last = self.alphabet_bytes[-1]
+        successor = self._successor
+        remaining = count
+
+        while True:
+            hi = min(self.alphabet_size, lo + remaining)
+            yield bytes(prefix), lo, hi
+            remaining -= hi - lo
+            if remaining <= 0:
+                return
+            lo = 0
+
+            pos = len(prefix) - 1
+            while pos >= 0 and prefix[pos] == last:
+                prefix[pos] = first
+                pos -= 1
+
+            if pos >= 0:
+                prefix[pos] = successor[prefix[pos]]
+            elif len(prefix) + 1 < max_length:
+                prefix.append(first)
+            else:
+                raise ValueError(
+                    f"Range of {count} candidates from {start.decode()!r} exceeds length {max_length}"
+                )
@@ -1,11 +1,36 @@
 import hashlib
+import math
+from typing import TYPE_CHECKING, Collection, Sequence
 
 from src.core.logging import get_logger
 
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+try:
+    import numpy as np
+except ImportError:  # the vectorized backend is optional
+    HAS_NUMPY = False
+else:
+    HAS_NUMPY = True
+
 logger = get_logger("md5_hasher")
 
+# (prefix, lo, hi) blocks as produced by StringGenerator.iter_blocks.
+Block = tuple[bytes, int, int]
+
 
 class MD5Hasher:
+    """hashlib backend and the interface every hasher backend implements.
+
+    Backends receive batches of generator blocks and return the candidates
+    whose digest is one of the targets; batch_size is the number of
+    candidates a backend wants per call.
+    """
+
+    name = "hashlib"
+    batch_size = 1
+
     @staticmethod
     def hash_string(text: str) -> str:
         return hashlib.md5(text.encode()).hexdigest()
@@ -14,7 +39,201 @@ class MD5Hasher:
     def check_match(candidate: str, target_hash: str) -> bool:
         return hashlib.md5(candidate.encode()).hexdigest() == target_hash.lower()
 
+    @staticmethod
+    def check_digest(candidate: bytes, target_digest: bytes) -> bool:
+        return hashlib.md5(candidate).digest() == target_digest
+
     @staticmethod
     def find_matches(strings: list[str], target_hash: str) -> list[str]:
         target = target_hash.lower()
         return [s for s in strings if hashlib.md5(s.encode()).hexdigest() == target]
+
+    def find_suffix_matches(
+        self, prefix: bytes, suffixes: Sequence[bytes], target_digests: Collection[bytes]
+    ) -> list[int]:
+        """Return indices of suffixes for which md5(prefix + suffix) is in target_digests."""
+        base = hashlib.md5(prefix)
+        matches = []
+        for i, suffix in enumerate(suffixes):
+            state = base.copy()
+            state.update(suffix)
+            if state.digest() in target_digests:
+                matches.append(i)
+        return matches
+
+    def find_block_matches(
+        self,
+        blocks: Sequence[Block],
+        suffixes: Sequence[bytes],
+        target_digests: Collection[bytes],
+    ) -> list[bytes]:
+        """Return every candidate prefix + suffixes[i], lo <= i < hi, hashing to a target."""
+        matches = []
+        for prefix, lo, hi in blocks:
+            for i in self.find_suffix_matches(prefix, suffixes[lo:hi], target_digests):
+                matches.append(prefix + suffixes[lo + i])
+        return matches
+
+
+# Per-round shift amounts and sine-derived constants from RFC 1321.
+_SHIFTS = [7, 12, 17, 22] * 4 + [5, 9, 14, 20] * 4 + [4, 11, 16, 23] * 4 + [6, 10, 15, 21] * 4
+_CONSTANTS = [int(abs(math.sin(i + 1)) * 2**32) & 0xFFFFFFFF for i in range(64)]
+_INITIAL_STATE = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476)
+# Candidates must fit a single 64-byte block next to the padding and bit length.
+_MAX_CANDIDATE_LENGTH = 55
+
+
+class NumpyMD5Hasher(MD5Hasher):
+    """Computes MD5 over whole arrays of equal-length candidates with NumPy.
+
+    Each batch is grouped by candidate length and packed into an (n, 16)
+    uint32 array of padded message blocks; the 64 MD5 steps then run once
+    per group instead of once per candidate. Only the first digest word is
+    compared in bulk, and the few candidates that pass are confirmed with
+    hashlib.
+    """
+
+    name = "numpy"
+
+    def __init__(self, batch_size: int) -> None:
+        if not HAS_NUMPY:
+            raise RuntimeError("The numpy hasher backend requires numpy to be installed")
+        self.batch_size = batch_size
+        # Candidates too long for one message block; calling super() instead
+        # would dispatch back into find_suffix_matches below.
+        self._fallback = MD5Hasher()
+        self._verify()
+
+    def find_suffix_matches(
+        self, prefix: bytes, suffixes: Sequence[bytes], target_digests: Collection[bytes]
+    ) -> list[int]:
+        matches = self.find_block_matches([(prefix, 0, len(suffixes))], suffixes, target_digests)
+        return [suffixes.index(match[len(prefix) :]) for match in matches]
+
+    def find_block_matches(
+        self,
+        blocks: Sequence[Block],
+        suffixes: Sequence[bytes],
+        target_digests: Collection[bytes],
+    ) -> list[bytes]:
+        if not blocks or not target_digests:
+            return []
+
+        first_words = np.array(
+            [int.from_bytes(digest[:4], "little") for digest in target_digests], dtype=np.uint32
+        )
+
+        groups: dict[int, list[Block]] = {}
+        for block in blocks:
+            groups.setdefault(len(block[0]), []).append(block)
+
+        matches = []
+        for prefix_length, group in groups.items():
+            if prefix_length + 1 > _MAX_CANDIDATE_LENGTH:
+                matches.extend(self._fallback.find_block_matches(group, suffixes, target_digests))
+                continue
+
+            candidates = self._pack(group, suffixes, prefix_length + 1)
+            a = self._digest_first_word(candidates.view("<u4"))
+            for row in np.flatnonzero(np.isin(a, first_words)):
+                candidate = candidates[row, : prefix_length + 1].tobytes()
+                if hashlib.md5(candidate).digest() in target_digests:
+                    matches.append(candidate)
+        return matches
+
+    @staticmethod
+    def _pack(blocks: list[Block], suffixes: Sequence[bytes], length: int) -> "NDArray[np.uint8]":
+        """Lay the candidates of equal-length blocks out as padded 64-byte messages."""
+        counts = [hi - lo for _, lo, hi in blocks]
+        messages: NDArray[np.uint8] = np.zeros((sum(counts), 64), dtype=np.uint8)
+        if length > 1:
+            prefixes: NDArray[np.uint8] = np.frombuffer(
+                b"".join(prefix for prefix, _, _ in blocks), dtype=np.uint8
+            )
+            messages[:, : length - 1] = np.repeat(
+                prefixes.reshape(len(blocks), length - 1), counts, axis=0
+            )
+        messages[:, length - 1] = np.frombuffer(
+            b"".join(b"".join(suffixes[lo:hi]) for _, lo, hi in blocks), dtype=np.uint8
+        )
+        messages[:, length] = 0x80
+        messages[:, 56:64] = np.frombuffer((length * 8).to_bytes(8, "little"), dtype=np.uint8)
+        return messages
+
+    @staticmethod
+    def _digest_first_word(words: "NDArray[np.uint32]") -> "NDArray[np.uint32]":
+        """Run the MD5 compression function and return the first output word per row.
+
+        Operations are done in place on a few preallocated arrays, and message
+        words that are zero for every row (the padding) are skipped.
+        """
+        m = [words[:, i].copy() if words[:, i].any() else None for i in range(16)]
+        a: NDArray[np.uint32]
+        b: NDArray[np.uint32]
+        c: NDArray[np.uint32]
+        d: NDArray[np.uint32]
+        a, b, c, d = (np.full(len(words), value, dtype=np.uint32) for value in _INITIAL_STATE)
+        f: NDArray[np.uint32] = np.empty(len(words), dtype=np.uint32)
+        t: NDArray[np.uint32] = np.empty(len(words), dtype=np.uint32)
+
+        for i in range(64):
+            if i < 16:
+                np.bitwise_and(b, c, out=f)
+                np.invert(b, out=t)
+                t &= d
+                f |= t
+                g = i
+            elif i < 32:
+                np.bitwise_and(d, b, out=f)
+                np.invert(d, out=t)
+                t &= c
+                f |= t
+                g = (5 * i + 1) % 16
+            elif i < 48:
+                np.bitwise_xor(b, c, out=f)
+                f ^= d
+                g = (3 * i + 5) % 16
+            else:
+                np.invert(d, out=t)
+                t |= b
+                np.bitwise_xor(c, t, out=f)
+                g = (7 * i) % 16
+
+            f += a
+            f += np.uint32(_CONSTANTS[i])
+            if m[g] is not None:
+                f += m[g]
+            shift = _SHIFTS[i]
+            np.left_shift(f, np.uint32(shift), out=t)
+            f >>= np.uint32(32 - shift)
+            f |= t
+            f += b
+            # The old a is no longer needed and becomes the next scratch array.
+            a, b, c, d, f = d, f, b, c, a
+
+        a += np.uint32(_INITIAL_STATE[0])
+        return a
+
+    def _verify(self) -> None:
+        """Check the vectorized rounds against hashlib before any task is trusted to them."""
+        suffixes = [bytes((char,)) for char in b"abcxyz019"]
+        blocks = [(b"", 0, 9), (b"q", 0, 9), (b"hello", 0, 9), (b"x" * 40, 0, 9), (b"y" * 54, 0, 9)]
+        candidates = [prefix + suffix for prefix, lo, hi in blocks for suffix in suffixes[lo:hi]]
+        targets = {hashlib.md5(candidate).digest() for candidate in candidates}
+
+        found = self.find_block_matches(blocks, suffixes, targets)
+        if sorted(found) != sorted(candidates):
+            raise RuntimeError("numpy hasher backend disagrees with hashlib")
+
+
+def create_hasher(backend: str, batch_size: int) -> MD5Hasher:
+    """Instantiate the configured backend, falling back to hashlib if it is unavailable."""
+    if backend == "hashlib":
+        return MD5Hasher()
+    if backend == "numpy":
+        try:
+            return NumpyMD5Hasher(batch_size)
+        except RuntimeError as e:
+            logger.warning(f"{e}, falling back to hashlib")
+            return MD5Hasher()
+    raise ValueError(f"Unknown hasher backend {backend!r}")
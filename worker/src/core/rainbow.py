@@ -0,0 +1,169 @@
+import hashlib
+import mmap
+import os
+import random
+import struct
+from datetime import datetime, timezone
+
+import orjson
+
+from src.core.config import ALPHABET
+from src.core.generator import StringGenerator
+from src.core.logging import get_logger
+
+logger = get_logger("rainbow")
+
+CHAIN_RECORD = struct.Struct(">QQ")
+MANIFEST_NAME = "manifest.json"
+
+
+def total_combinations(max_length: int) -> int:
+    return sum(len(ALPHABET) ** length for length in range(1, max_length + 1))
+
+
+class RainbowChains:
+    """Chain arithmetic over the same index space the manager partitions.
+
+    A chain starts at a keyspace index x0 and steps x -> R_i(md5(s(x))) for
+    columns i = 0..chain_length-1, where s decodes an index like
+    StringGenerator.index_to_string and R_i folds the digest back into the
+    index space with a column-dependent offset.
+    """
+
+    def __init__(self, max_length: int, chain_length: int) -> None:
+        self.max_length = max_length
+        self.chain_length = chain_length
+        self.keyspace = total_combinations(max_length)
+        self.generator = StringGenerator(ALPHABET)
+
+    def candidate(self, index: int) -> bytes:
+        return self.generator.index_to_string(index, self.max_length).encode()
+
+    def reduce(self, digest: bytes, column: int) -> int:
+        return (int.from_bytes(digest[:8], "little") + column) % self.keyspace
+
+    def walk(self, index: int, first_column: int, last_column: int) -> int:
+        for column in range(first_column, last_column):
+            index = self.reduce(hashlib.md5(self.candidate(index)).digest(), column)
+        return index
+
+    def endpoint(self, start: int) -> int:
+        return self.walk(start, 0, self.chain_length)
+
+
+class RainbowShard:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = len(self.data) // CHAIN_RECORD.size
+
+    def starts_for(self, end: int) -> list[int]:
+        """Binary-search the endpoint-sorted records and return matching chain starts."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if CHAIN_RECORD.unpack_from(self.data, mid * CHAIN_RECORD.size)[0] < end:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        starts = []
+        while lo < self.count:
+            record_end, start = CHAIN_RECORD.unpack_from(self.data, lo * CHAIN_RECORD.size)
+            if record_end != end:
+                break
+            starts.append(start)
+            lo += 1
+        return starts
+
+    def close(self) -> None:
+        self.data.close()
+
+
+class RainbowTable:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_NAME), "rb") as f:
+            self.manifest = orjson.loads(f.read())
+        if self.manifest["alphabet"] != ALPHABET:
+            raise ValueError(f"Rainbow table {directory} was built for a different alphabet")
+
+        self.chains = RainbowChains(self.manifest["maxLength"], self.manifest["chainLength"])
+        self.shards = [
+            RainbowShard(os.path.join(directory, name)) for name in self.manifest["shards"]
+        ]
+
+    def lookup_column(self, target_digest: bytes, column: int) -> tuple[list[str], int]:
+        """Try the hypothesis that target_digest sits in the given column of some chain.
+
+        Returns the plaintexts found and the number of false alarms, i.e. endpoint
+        hits whose regenerated chain did not contain the target.
+        """
+        chains = self.chains
+        end = chains.walk(chains.reduce(target_digest, column), column + 1, chains.chain_length)
+
+        found: list[str] = []
+        false_alarms = 0
+        for shard in self.shards:
+            for start in shard.starts_for(end):
+                candidate = chains.candidate(chains.walk(start, 0, column))
+                if hashlib.md5(candidate).digest() != target_digest:
+                    false_alarms += 1
+                elif candidate.decode() not in found:
+                    found.append(candidate.decode())
+        return found, false_alarms
+
+    def lookup(
+        self, target_digest: bytes, first_column: int = 0, count: int | None = None
+    ) -> tuple[list[str], int]:
+        last_column = self.chains.chain_length if count is None else first_column + count
+        found: list[str] = []
+        false_alarms = 0
+        # Later columns are cheaper to test, so they go first.
+        for column in reversed(range(first_column, last_column)):
+            matches, alarms = self.lookup_column(target_digest, column)
+            false_alarms += alarms
+            if matches:
+                found.extend(matches)
+                break
+        return found, false_alarms
+
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+
+
+def build_shard(
+    directory: str, shard: int, starts: list[int], max_length: int, chain_length: int
+) -> str:
+    """Compute the chains for one shard and write them sorted by endpoint."""
+    chains = RainbowChains(max_length, chain_length)
+    records: dict[int, int] = {}
+    for start in starts:
+        # Chains that merge into an endpoint already stored add no coverage.
+        records.setdefault(chains.endpoint(start), start)
+
+    name = f"shard-{shard:04d}.bin"
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(b"".join(CHAIN_RECORD.pack(end, records[end]) for end in sorted(records)))
+    logger.info(f"Wrote {name} with {len(records)} of {len(starts)} chains")
+    return name
+
+
+def measure_table(table: RainbowTable, samples: int, seed: int = 0) -> tuple[float, float]:
+    """Estimate coverage and false alarms per lookup from random keyspace samples."""
+    rng = random.Random(seed)
+    hits = 0
+    false_alarms = 0
+    for _ in range(samples):
+        candidate = table.chains.candidate(rng.randrange(table.chains.keyspace))
+        found, alarms = table.lookup(hashlib.md5(candidate).digest())
+        hits += candidate.decode() in found
+        false_alarms += alarms
+    return hits / samples if samples else 0.0, false_alarms / samples if samples else 0.0
+
+
+def write_manifest(directory: str, manifest: dict) -> None:
+    manifest = {**manifest, "created_at": datetime.now(timezone.utc).isoformat()}
+    with open(os.path.join(directory, MANIFEST_NAME), "wb") as f:
+        f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
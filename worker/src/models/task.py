@@ -1,5 +1,5 @@
 import json
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from typing import Any
 
 
@@ -9,18 +9,36 @@ class Task:
     requestId: str
     startIndex: int
     count: int
-    targetHash: str
+    targetHash: str | None
     maxLength: int
+    targetHashes: list[str] = field(default_factory=list)
+    taskType: str = "bruteforce"
+    tableId: str | None = None
+    length: int | None = None
+    prefix: str | None = None
+    suffixStart: int | None = None
+    resumeFrom: int = 0
+    partialResults: list[str] = field(default_factory=list)
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "Task":
+        target_hash = data.get("targetHash")
+        target_hashes = data.get("targetHashes") or [target_hash]
         return cls(
             taskId=data["taskId"],
             requestId=data["requestId"],
             startIndex=data["startIndex"],
             count=data["count"],
-            targetHash=data["targetHash"],
+            targetHash=target_hash,
             maxLength=data["maxLength"],
+            targetHashes=[h.lower() for h in target_hashes],
+            taskType=data.get("taskType") or "bruteforce",
+            tableId=data.get("tableId"),
+            length=data.get("length"),
+            prefix=data.get("prefix"),
+            suffixStart=data.get("suffixStart"),
+            resumeFrom=data.get("resumeFrom") or 0,
+            partialResults=data.get("partialResults") or [],
         )
 
     @classmethod
@@ -37,13 +55,19 @@ class TaskResult:
     requestId: str
     results: list[str]
     status: str
+    matches: dict[str, list[str]] = field(default_factory=dict)
+    combinations: int = 0
+    elapsed: float = 0.0
 
     def to_dict(self) -> dict[str, Any]:
         result = {
             "taskId": self.taskId,
             "requestId": self.requestId,
             "results": self.results,
+            "matches": self.matches,
             "status": self.status,
+            "combinations": self.combinations,
+            "elapsed": self.elapsed,
         }
         return result
 
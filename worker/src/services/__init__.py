@@ -1,4 +1,6 @@
+from .checkpoints import CheckpointStore
+from .control import ControlListener
 from .processor import TaskProcessor
 from .rabbitmq import RabbitMQClient
 
-__all__ = ["RabbitMQClient", "TaskProcessor"]
+__all__ = ["CheckpointStore", "ControlListener", "RabbitMQClient", "TaskProcessor"]
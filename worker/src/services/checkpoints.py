@@ -0,0 +1,49 @@
+from pymongo import MongoClient
+from pymongo.collection import Collection
+
+from src.core import config
+from src.core.logging import get_logger
+
+logger = get_logger("checkpoints")
+
+
+class CheckpointStore:
+    """Read-only view of the checkpoints the manager keeps on task documents.
+
+    Only consulted for redelivered messages; a worker that cannot reach Mongo
+    simply rescans the task from its start.
+    """
+
+    def __init__(self, uri: str = config.MONGO_URI) -> None:
+        self.tasks: Collection | None = None
+        if not uri:
+            return
+        try:
+            client: MongoClient = MongoClient(uri, **config.MONGO_CONNECTION_SETTINGS)
+            self.tasks = client.md5_cracker.tasks
+        except Exception as e:
+            logger.warning(f"Checkpoint store unavailable: {e}")
+
+    def get(self, task_id: str) -> dict | None:
+        if self.tasks is None:
+            return None
+        try:
+            stored: dict | None = self.tasks.find_one(
+                {"taskId": task_id}, {"_id": 0, "checkpoint": 1, "partialResults": 1, "count": 1}
+            )
+            return stored
+        except Exception as e:
+            logger.warning(f"Failed to read checkpoint for task {task_id}: {e}")
+            return None
+
+    def resume(self, task_data: dict) -> None:
+        """Continue a redelivered task from its checkpoint, within the range it still owns."""
+        stored = self.get(task_data["taskId"])
+        if stored is None:
+            return
+        # A split acknowledged before the redelivery shrank the task and handed
+        # its tail to another task; the message body still has the old count.
+        task_data["count"] = min(task_data["count"], stored.get("count", task_data["count"]))
+        if stored.get("checkpoint") and not task_data.get("resumeFrom"):
+            task_data["resumeFrom"] = min(stored["checkpoint"], task_data["count"])
+            task_data["partialResults"] = stored.get("partialResults", [])
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+import orjson
+import pika
+from pika.adapters.blocking_connection import BlockingChannel
+from pika.spec import Basic, BasicProperties
+
+from src.core import config
+from src.core.logging import get_logger
+
+logger = get_logger("control")
+
+
+class ControlListener:
+    """Consume cancel.exchange on a connection and thread of its own.
+
+    Tasks run inside the task consumer's callback, and pika does not dispatch
+    deliveries on a connection while one of its callbacks is running, so
+    control messages sharing that connection only arrived after the task they
+    were meant to interrupt had finished. Here cancellations and split
+    requests are recorded as they arrive and the task loop polls them through
+    is_cancelled and take_split. Split requests are fanned out to every
+    worker, so only those for a task wants_split claims are kept.
+    """
+
+    def __init__(self, wants_split: Callable[[str], bool] | None = None) -> None:
+        self.parameters = pika.ConnectionParameters(
+            host=config.RABBITMQ_HOST,
+            port=config.RABBITMQ_PORT,
+            credentials=pika.PlainCredentials(config.RABBITMQ_USER, config.RABBITMQ_PASS),
+            **config.RABBITMQ_CONNECTION_SETTINGS,
+        )
+        self.cancelled_requests: OrderedDict[str, None] = OrderedDict()
+        self.split_requests: OrderedDict[str, int] = OrderedDict()
+        self.wants_split = wants_split
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=config.CONSUME_POLL_INTERVAL + 1)
+
+    def _run(self) -> None:
+        while self.running:
+            try:
+                connection = pika.BlockingConnection(self.parameters)
+                try:
+                    channel = connection.channel()
+                    channel.exchange_declare(
+                        exchange=config.CANCEL_EXCHANGE, exchange_type="fanout", durable=True
+                    )
+                    declared = channel.queue_declare(queue="", exclusive=True)
+                    channel.queue_bind(exchange=config.CANCEL_EXCHANGE, queue=declared.method.queue)
+                    channel.basic_consume(
+                        queue=declared.method.queue,
+                        on_message_callback=self._on_message,
+                        auto_ack=True,
+                    )
+                    logger.info("Listening for cancellations and split requests")
+                    while self.running:
+                        connection.process_data_events(time_limit=config.CONSUME_POLL_INTERVAL)
+                finally:
+                    if connection.is_open:
+                        connection.close()
+            except Exception as e:
+                logger.error(f"Control listener failed: {e}, reconnecting...")
+                time.sleep(config.RETRY_DELAY)
+
+    def _on_message(
+        self,
+        _ch: BlockingChannel | None,
+        _method: Basic.Deliver | None,
+        _properties: BasicProperties | None,
+        body: bytes,
+    ) -> None:
+        try:
+            message = orjson.loads(body)
+            if message.get("type") == "split":
+                self._remember_split(message["taskId"], message["keep"])
+                return
+            request_id = message["requestId"]
+        except (orjson.JSONDecodeError, KeyError) as e:
+            logger.error(f"Invalid control message: {e}")
+            return
+
+        with self.lock:
+            self.cancelled_requests[request_id] = None
+            self.cancelled_requests.move_to_end(request_id)
+            while len(self.cancelled_requests) > config.CANCELLED_REQUESTS_CACHE_SIZE:
+                self.cancelled_requests.popitem(last=False)
+        logger.info(f"Request {request_id} cancelled")
+
+    def _remember_split(self, task_id: str, keep: int) -> None:
+        if self.wants_split is not None and not self.wants_split(task_id):
+            return
+        # Bounded in case a split arrives just as its task finishes and is never taken.
+        with self.lock:
+            self.split_requests[task_id] = keep
+            self.split_requests.move_to_end(task_id)
+            while len(self.split_requests) > config.SPLIT_REQUESTS_CACHE_SIZE:
+                self.split_requests.popitem(last=False)
+
+    def is_cancelled(self, request_id: str) -> bool:
+        with self.lock:
+            return request_id in self.cancelled_requests
+
+    def take_split(self, task_id: str) -> int | None:
+        with self.lock:
+            return self.split_requests.pop(task_id, None)
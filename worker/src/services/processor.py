@@ -1,12 +1,28 @@
+import os
+import signal
 import time
-from typing import Any
+from multiprocessing import Event, Pool
+from multiprocessing.pool import Pool as PoolType
+from multiprocessing.synchronize import Event as EventType
+from typing import Any, Callable, Iterator
 
-from src.core import MD5Hasher, StringGenerator
-from src.core.config import ALPHABET, PROGRESS_REPORT_INTERVAL
+from src.core import MD5Hasher, RainbowTable, StringGenerator, create_hasher
+from src.core.config import (
+    ALPHABET,
+    CANCEL_CHECK_BLOCKS,
+    CHECKPOINT_INTERVAL,
+    HASHER_BACKEND,
+    HASHER_BATCH_SIZE,
+    POOL_POLL_INTERVAL,
+    POOL_ROUND_SIZE,
+    PROGRESS_REPORT_INTERVAL,
+    RAINBOW_TABLE_DIR,
+)
 from src.core.logging import get_logger
 from src.models import Task, TaskResult
 from src.utils import (
     dec_tasks_in_progress,
+    inc_rainbow_false_alarms,
     inc_tasks_in_progress,
     inc_tasks_processed,
     update_combinations_speed,
@@ -15,56 +31,429 @@ from src.utils import (
 logger = get_logger("task_processor")
 
 
+def split_range(start_index: int, count: int, parts: int) -> list[tuple[int, int]]:
+    base, extra = divmod(count, parts)
+    ranges = []
+    start = start_index
+    for part in range(parts):
+        size = base + (1 if part < extra else 0)
+        if size > 0:
+            ranges.append((start, size))
+        start += size
+    return ranges
+
+
+_cancel_event: EventType | None = None
+_hasher: MD5Hasher = MD5Hasher()
+
+
+def _init_pool_process(cancel_event: EventType) -> None:
+    global _cancel_event, _hasher
+    _cancel_event = cancel_event
+    _hasher = create_hasher(HASHER_BACKEND, HASHER_BATCH_SIZE)
+    # Shutdown is driven by the parent's main loop, which terminates the pool.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def _target_digests(target_hashes: list[str]) -> frozenset[bytes]:
+    return frozenset(bytes.fromhex(target_hash) for target_hash in target_hashes)
+
+
+def _iter_task_blocks(
+    generator: StringGenerator,
+    start: int,
+    count: int,
+    max_length: int,
+    length: int | None = None,
+    prefix: str | None = None,
+) -> Iterator[tuple[bytes, int, int]]:
+    # Length-aligned tasks count start within their prefix; older tasks use a global index.
+    if length is not None and prefix is not None:
+        return generator.iter_prefix_blocks(prefix, length, start, count)
+    return generator.iter_blocks(start, count, max_length)
+
+
+def _take_batch(
+    blocks: Iterator[tuple[bytes, int, int]], batch_size: int, limit: int
+) -> list[tuple[bytes, int, int]]:
+    """Pull blocks until they hold batch_size candidates, never more than limit in total."""
+    batch = []
+    size = 0
+    while size < min(batch_size, limit):
+        block = next(blocks, None)
+        if block is None:
+            break
+        prefix, lo, hi = block
+        hi = min(hi, lo + limit - size)
+        batch.append((prefix, lo, hi))
+        size += hi - lo
+    return batch
+
+
+def _task_start(task: Task) -> int:
+    return task.suffixStart if task.suffixStart is not None else task.startIndex
+
+
+def _scan_range(
+    start_index: int,
+    count: int,
+    max_length: int,
+    target_hashes: list[str],
+    length: int | None = None,
+    prefix: str | None = None,
+) -> list[str]:
+    generator = StringGenerator(ALPHABET)
+    target_digests = _target_digests(target_hashes)
+    suffixes = generator.suffixes
+    results: list[str] = []
+    scanned = 0
+    next_cancel_check = CANCEL_CHECK_BLOCKS
+
+    blocks = _iter_task_blocks(generator, start_index, count, max_length, length, prefix)
+    while batch := _take_batch(blocks, _hasher.batch_size, count - scanned):
+        for match in _hasher.find_block_matches(batch, suffixes, target_digests):
+            results.append(match.decode())
+        scanned += sum(hi - lo for _, lo, hi in batch)
+
+        next_cancel_check -= len(batch)
+        if next_cancel_check <= 0:
+            next_cancel_check = CANCEL_CHECK_BLOCKS
+            if _cancel_event and _cancel_event.is_set():
+                break
+
+    return results
+
+
+_rainbow_tables: dict[str, RainbowTable] = {}
+
+
+def _rainbow_table(table_id: str) -> RainbowTable:
+    table = _rainbow_tables.get(table_id)
+    if table is None:
+        table = RainbowTable(os.path.join(RAINBOW_TABLE_DIR, table_id))
+        _rainbow_tables[table_id] = table
+    return table
+
+
+def _scan_columns(
+    table_id: str,
+    first_column: int,
+    count: int,
+    target_hashes: list[str],
+    should_stop: Callable[[], bool] | None = None,
+) -> tuple[list[str], int, bool]:
+    """Test the given chain columns of a rainbow table for every target.
+
+    Returns the plaintexts found, the false alarms hit and whether the scan
+    was stopped early by a cancellation.
+    """
+    table = _rainbow_table(table_id)
+    results: list[str] = []
+    false_alarms = 0
+
+    for target_digest in _target_digests(target_hashes):
+        for column in reversed(range(first_column, first_column + count)):
+            if (_cancel_event and _cancel_event.is_set()) or (should_stop and should_stop()):
+                return results, false_alarms, True
+
+            found, alarms = table.lookup_column(target_digest, column)
+            false_alarms += alarms
+            if found:
+                results.extend(found)
+                break
+
+    return results, false_alarms, False
+
+
 class TaskProcessor:
-    def __init__(self, worker_id: str) -> None:
+    def __init__(
+        self,
+        worker_id: str,
+        procs: int = 1,
+        heartbeat: Callable[[], None] | None = None,
+        is_cancelled: Callable[[str], bool] | None = None,
+        publish: Callable[[dict], bool] | None = None,
+        take_split: Callable[[str], int | None] | None = None,
+        is_stopping: Callable[[], bool] | None = None,
+    ) -> None:
         self.worker_id = worker_id
         self.generator = StringGenerator(ALPHABET)
-        self.hasher = MD5Hasher()
+        self.hasher = create_hasher(HASHER_BACKEND, HASHER_BATCH_SIZE)
         self.current_task: Task | None = None
         self.combinations_processed = 0
+        self.procs = max(1, procs)
+        self.heartbeat = heartbeat
+        self.is_cancelled = is_cancelled
+        self.publish = publish
+        self.take_split = take_split
+        self.is_stopping = is_stopping
+        self.next_checkpoint = 0.0
+        self.scanned = 0
+        self.found: list[str] = []
+        self.pool: PoolType | None = None
+        self.cancel_event = Event()
+
+        if self.procs > 1:
+            self.pool = Pool(
+                self.procs, initializer=_init_pool_process, initargs=(self.cancel_event,)
+            )
+            logger.info(f"Started hashing pool with {self.procs} processes")
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+            logger.info("Hashing pool stopped")
+
+    def is_running(self, task_id: str) -> bool:
+        task = self.current_task
+        return task is not None and task.taskId == task_id
+
+    def _stopping(self) -> bool:
+        return self.is_stopping is not None and self.is_stopping()
+
+    def _should_stop(self, task: Task) -> bool:
+        if self.heartbeat:
+            self.heartbeat()
+        if self._stopping():
+            return True
+        return self.is_cancelled is not None and self.is_cancelled(task.requestId)
+
+    def _checkpoint(self, task: Task, force: bool = False) -> None:
+        """Report how far into the task range this worker has scanned and what it found."""
+        now = time.time()
+        if self.publish is None or (now < self.next_checkpoint and not force):
+            return
+        self.next_checkpoint = now + CHECKPOINT_INTERVAL
+        self.publish(
+            {
+                "type": "checkpoint",
+                "taskId": task.taskId,
+                "requestId": task.requestId,
+                "workerId": self.worker_id,
+                "scanned": self.scanned,
+                "results": list(self.found),
+            }
+        )
+
+    def _flush_checkpoint(self, task: Task) -> None:
+        """Publish a final checkpoint for a task interrupted by shutdown."""
+        if task.taskType == "rainbow":
+            return
+        try:
+            self._checkpoint(task, force=True)
+            logger.info(f"Flushed checkpoint for task {task.taskId} at {self.scanned}")
+        except Exception as e:
+            logger.error(f"Failed to flush checkpoint for task {task.taskId}: {e}")
+
+    def _apply_split(self, task: Task, scanned: int) -> None:
+        """Give up the tail of the range if the manager asked for it and it is still unscanned.
 
-    def _process_combinations(self, task: Task) -> list[str]:
-        results: list[str] = []
+        The acknowledgement travels on the result queue ahead of the task's own
+        result, so the manager registers the tail before the task completes.
+        """
+        if self.take_split is None or self.publish is None:
+            return
+        keep = self.take_split(task.taskId)
+        if keep is None:
+            return
+        if not scanned < keep < task.count:
+            logger.debug(f"Rejected split of task {task.taskId} at {keep}, scanned {scanned}")
+            return
 
-        for i, candidate in enumerate(
-            self.generator.generate_range(task.startIndex, task.count, task.maxLength)
+        if self.publish(
+            {"type": "split", "taskId": task.taskId, "requestId": task.requestId, "keep": keep}
         ):
-            if self.hasher.check_match(candidate, task.targetHash):
-                logger.info(f"Found match: '{candidate}' for task {task.taskId}")
-                results.append(candidate)
+            logger.info(f"Task {task.taskId} gave up {task.count - keep} combinations")
+            task.count = keep
+
+    def _process_combinations(self, task: Task) -> tuple[list[str], bool]:
+        results = self.found
+        target_digests = _target_digests(task.targetHashes)
+        suffixes = self.generator.suffixes
+        processed = task.resumeFrom
+        next_report = processed + PROGRESS_REPORT_INTERVAL
+
+        blocks = _iter_task_blocks(
+            self.generator,
+            _task_start(task) + processed,
+            task.count - processed,
+            task.maxLength,
+            task.length,
+            task.prefix,
+        )
+        # task.count shrinks when the tail of the range is split off.
+        while batch := _take_batch(blocks, self.hasher.batch_size, task.count - processed):
+            for candidate in self.hasher.find_block_matches(batch, suffixes, target_digests):
+                match = candidate.decode()
+                logger.info(f"Found match: '{match}' for task {task.taskId}")
+                results.append(match)
 
-            self.combinations_processed += 1
+            size = sum(hi - lo for _, lo, hi in batch)
+            processed += size
+            self.scanned = processed
+            self.combinations_processed += size
 
-            if (i + 1) % PROGRESS_REPORT_INTERVAL == 0:
-                logger.debug(f"Task {task.taskId}: processed {i + 1}/{task.count} combinations")
+            if processed >= next_report:
+                next_report += PROGRESS_REPORT_INTERVAL
+                logger.debug(f"Task {task.taskId}: processed {processed}/{task.count} combinations")
                 update_combinations_speed(self.combinations_processed / time.time())
 
-        return results
+                if self._should_stop(task):
+                    logger.info(f"Task {task.taskId} cancelled after {processed} combinations")
+                    return results, False
+                self._checkpoint(task)
+                self._apply_split(task, processed)
+
+            if processed >= task.count:
+                break
+
+        return results, True
+
+    def _run_in_pool(
+        self, task: Task, pool: PoolType, func: Callable, args: list[tuple]
+    ) -> tuple[list[Any], bool]:
+        pending = pool.starmap_async(func, args)
+
+        cancelled = False
+        while not pending.ready():
+            pending.wait(POOL_POLL_INTERVAL)
+            if not cancelled and self._should_stop(task):
+                logger.info(f"Task {task.taskId} cancelled, stopping pool")
+                cancelled = True
+                self.cancel_event.set()
+
+        self.cancel_event.clear()
+        return pending.get(), cancelled
+
+    def _process_combinations_parallel(self, task: Task, pool: PoolType) -> tuple[list[str], bool]:
+        # The range is scanned in rounds so checkpoints and splits can be
+        # handled between them while the pool stays busy within a round.
+        start_time = time.time()
+        results = self.found
+        scanned = task.resumeFrom
+        cancelled = False
+
+        while scanned < task.count and not cancelled:
+            round_count = min(task.count - scanned, POOL_ROUND_SIZE * self.procs)
+            ranges = split_range(_task_start(task) + scanned, round_count, self.procs)
+            chunks, cancelled = self._run_in_pool(
+                task,
+                pool,
+                _scan_range,
+                [
+                    (start, count, task.maxLength, task.targetHashes, task.length, task.prefix)
+                    for start, count in ranges
+                ],
+            )
+            results.extend(match for chunk in chunks for match in chunk)
+            if not cancelled:
+                scanned += round_count
+                self.scanned = scanned
+                self._checkpoint(task)
+                self._apply_split(task, scanned)
+
+        for match in results:
+            logger.info(f"Found match: '{match}' for task {task.taskId}")
+
+        self.combinations_processed += scanned - task.resumeFrom
+        elapsed = time.time() - start_time
+        if elapsed > 0 and not cancelled:
+            update_combinations_speed((scanned - task.resumeFrom) / elapsed)
+
+        return results, not cancelled
+
+    def _process_rainbow(self, task: Task) -> tuple[list[str], bool]:
+        if not task.tableId:
+            raise ValueError(f"Rainbow task {task.taskId} has no tableId")
+
+        if self.pool is not None:
+            ranges = split_range(task.startIndex, task.count, self.procs)
+            chunks, cancelled = self._run_in_pool(
+                task,
+                self.pool,
+                _scan_columns,
+                [(task.tableId, start, count, task.targetHashes) for start, count in ranges],
+            )
+        else:
+            chunk = _scan_columns(
+                task.tableId,
+                task.startIndex,
+                task.count,
+                task.targetHashes,
+                should_stop=lambda: self._should_stop(task),
+            )
+            chunks, cancelled = [chunk], chunk[2]
+
+        results = list(dict.fromkeys(match for found, _, _ in chunks for match in found))
+        false_alarms = sum(alarms for _, alarms, _ in chunks)
+        inc_rainbow_false_alarms(false_alarms)
+        for match in results:
+            logger.info(f"Found match: '{match}' in rainbow table {task.tableId}")
+        logger.debug(f"Task {task.taskId}: {false_alarms} rainbow false alarms")
+
+        return results, not cancelled and not any(stopped for _, _, stopped in chunks)
+
+    def _tag_matches(self, results: list[str]) -> dict[str, list[str]]:
+        matches: dict[str, list[str]] = {}
+        for match in results:
+            matches.setdefault(self.hasher.hash_string(match), []).append(match)
+        return matches
 
     def process_task(self, task_data: dict[str, Any]) -> TaskResult | None:
         task_start_time = time.time()
         task = Task.from_dict(task_data)
         self.current_task = task
+        self.next_checkpoint = time.time() + CHECKPOINT_INTERVAL
+        self.scanned = task.resumeFrom
+        self.found = list(task.partialResults)
+        results: list[str]
+        completed: bool
         try:
             inc_tasks_in_progress()
 
             logger.info(
                 f"Worker {self.worker_id} processing task {task.taskId}: start={task.startIndex}, count={task.count}"
             )
+            if task.resumeFrom:
+                logger.info(f"Resuming task {task.taskId} from checkpoint {task.resumeFrom}")
+
+            if self.is_cancelled is not None and self.is_cancelled(task.requestId):
+                logger.info(f"Skipping task {task.taskId} of cancelled request {task.requestId}")
+                results, completed = [], False
+            elif task.taskType == "rainbow":
+                results, completed = self._process_rainbow(task)
+            elif self.pool is not None:
+                results, completed = self._process_combinations_parallel(task, self.pool)
+            else:
+                results, completed = self._process_combinations(task)
 
-            results = self._process_combinations(task)
+            if not completed and self._stopping():
+                # The task goes back to the queue; the checkpoint lets the next
+                # holder resume instead of rescanning.
+                self._flush_checkpoint(task)
+                return None
 
             processing_time = time.time() - task_start_time
-            status = "DONE"
+            status = "DONE" if completed else "CANCELLED"
+            results = list(dict.fromkeys(results))
 
             result = TaskResult(
                 taskId=task.taskId,
                 requestId=task.requestId,
                 results=results,
                 status=status,
+                matches=self._tag_matches(results),
+                # Lets the manager size future tasks from observed throughput.
+                combinations=(
+                    task.count - task.resumeFrom if completed and task.taskType != "rainbow" else 0
+                ),
+                elapsed=processing_time,
             )
 
-            inc_tasks_processed("success" if status == "DONE" else "interrupted")
+            inc_tasks_processed("success" if status == "DONE" else "cancelled")
 
             logger.info(
                 f"Task {task.taskId} completed with {len(results)} matches in {processing_time:.2f}s"
@@ -47,9 +47,7 @@ class RabbitMQClient:
     def _setup_queues(self) -> None:
         if self.channel:
             queue_arguments = {"x-queue-type": "classic"}
-            self.channel.queue_declare(
-                queue="task.queue", durable=True, arguments=queue_arguments
-            )
+            self.channel.queue_declare(queue="task.queue", durable=True, arguments=queue_arguments)
             self.channel.queue_declare(
                 queue="result.queue", durable=True, arguments=queue_arguments
             )
@@ -79,24 +77,27 @@ class RabbitMQClient:
             logger.error(f"Failed to publish task: {e}")
             return False
 
-    def consume_tasks(self, callback: Callable) -> None:
+    def process_data_events(self) -> None:
+        if self.connection and self.connection.is_open:
+            self.connection.process_data_events(time_limit=0)
+
+    def consume_tasks(self, callback: Callable, is_running: Callable[[], bool]) -> None:
+        """Deliver tasks to callback until is_running() turns false."""
         try:
             self.ensure_connection()
-            if self.channel:
-                self.channel.basic_consume(
+            if self.channel and self.connection:
+                consumer_tag = self.channel.basic_consume(
                     queue="task.queue", on_message_callback=callback, auto_ack=False
                 )
                 logger.info("Started consuming tasks from task.queue")
-                self.channel.start_consuming()
+                while is_running():
+                    self.connection.process_data_events(time_limit=config.CONSUME_POLL_INTERVAL)
+                self.channel.basic_cancel(consumer_tag)
+                logger.info("Stopped consuming tasks")
         except Exception as e:
             logger.error(f"Error in consume_tasks: {e}")
             raise
 
-    def stop_consuming(self) -> None:
-        if self.channel:
-            self.channel.stop_consuming()
-            logger.info("Stopped consuming tasks")
-
     def close(self) -> None:
         if self.connection and self.connection.is_open:
             self.connection.close()
@@ -1,6 +1,7 @@
 from .decorators import retry
 from .metrics import (
     dec_tasks_in_progress,
+    inc_rainbow_false_alarms,
     inc_tasks_in_progress,
     inc_tasks_processed,
     start_metrics_server,
@@ -17,5 +18,6 @@ __all__ = [
     "update_combinations_speed",
     "inc_tasks_in_progress",
     "inc_tasks_processed",
+    "inc_rainbow_false_alarms",
     "dec_tasks_in_progress",
 ]
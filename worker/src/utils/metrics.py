@@ -11,6 +11,10 @@ tasks_in_progress = Gauge("worker_tasks_in_progress", "Tasks currently in progre
 
 combinations_speed = Gauge("worker_combinations_per_second", "Combinations processed per second")
 
+rainbow_false_alarms = Counter(
+    "worker_rainbow_false_alarms_total", "Rainbow endpoint hits that did not contain the target"
+)
+
 memory_usage = Gauge("worker_memory_usage_bytes", "Memory usage in bytes")
 
 
@@ -38,6 +42,10 @@ def update_combinations_speed(speed: float) -> None:
     combinations_speed.set(speed)
 
 
+def inc_rainbow_false_alarms(count: int) -> None:
+    rainbow_false_alarms.inc(count)
+
+
 def update_memory_usage() -> None:
     from psutil import Process
 
@@ -1,6 +1,5 @@
 import signal
-import sys
-from typing import Any, Callable
+from typing import Any
 
 from src.core.logging import get_logger
 
@@ -8,8 +7,15 @@ logger = get_logger("signal_handler")
 
 
 class SignalHandler:
-    def __init__(self, shutdown_callback: Callable[[], None]) -> None:
-        self.shutdown_callback = shutdown_callback
+    """Turn SIGTERM/SIGINT into a stop flag.
+
+    The handler runs between two bytecodes of whatever the main thread is
+    doing, possibly in the middle of a pika or pymongo call, so it only flips
+    the flag; the main loop notices it, flushes the running task and closes
+    the connections itself.
+    """
+
+    def __init__(self) -> None:
         self.running = True
 
         signal.signal(signal.SIGTERM, self._handle_signal)
@@ -18,13 +24,10 @@ class SignalHandler:
         logger.info("Signal handlers registered (SIGTERM, SIGINT)")
 
     def _handle_signal(self, signum: int, _: Any) -> None:
-        signal_name = signal.Signals(signum).name
-        logger.info(f"Received signal {signal_name}, initiating graceful shutdown...")
-
         self.running = False
-
-        logger.info("Shutdown complete")
-        sys.exit(0)
+        logger.info(
+            f"Received signal {signal.Signals(signum).name}, stopping after current task..."
+        )
 
     def is_running(self) -> bool:
         return self.running
@@ -0,0 +1,57 @@
+from typing import cast
+
+from pymongo.collection import Collection
+
+from src.services import CheckpointStore
+
+
+class Tasks:
+    """Just enough of a pymongo collection to serve one stored task document."""
+
+    def __init__(self, document: dict | None) -> None:
+        self.document = document
+
+    def find_one(self, _filter: dict, _projection: dict) -> dict | None:
+        return self.document
+
+
+def store(document: dict | None) -> CheckpointStore:
+    checkpoints = CheckpointStore(uri="")
+    checkpoints.tasks = cast(Collection, Tasks(document))
+    return checkpoints
+
+
+def task(count: int = 1000) -> dict:
+    return {"taskId": "t1", "requestId": "r1", "startIndex": 0, "count": count}
+
+
+def test_resume_from_checkpoint() -> None:
+    task_data = task()
+    store({"checkpoint": 400, "partialResults": ["abc"], "count": 1000}).resume(task_data)
+
+    assert task_data["resumeFrom"] == 400
+    assert task_data["partialResults"] == ["abc"]
+    assert task_data["count"] == 1000
+
+
+def test_resume_clamps_to_count_left_after_split() -> None:
+    task_data = task()
+    store({"checkpoint": 400, "count": 600}).resume(task_data)
+
+    assert task_data["count"] == 600
+    assert task_data["resumeFrom"] == 400
+
+
+def test_resume_past_split_point_scans_nothing() -> None:
+    task_data = task()
+    store({"checkpoint": 800, "count": 600}).resume(task_data)
+
+    assert task_data["count"] == 600
+    assert task_data["resumeFrom"] == 600
+
+
+def test_resume_without_stored_task_keeps_message() -> None:
+    task_data = task()
+    store(None).resume(task_data)
+
+    assert task_data == task()
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import orjson
+import pytest
+
+from src.services import ControlListener, TaskProcessor
+
+COUNT = 50_000_000
+
+
+def task(task_id: str = "t1", request_id: str = "r1") -> dict:
+    return {
+        "taskId": task_id,
+        "requestId": request_id,
+        "startIndex": 0,
+        "count": COUNT,
+        "targetHash": "0" * 32,
+        "maxLength": 6,
+    }
+
+
+def deliver_when_running(
+    processor: TaskProcessor, listener: ControlListener, message: dict
+) -> threading.Thread:
+    """Deliver a control message from another thread once the task has started scanning."""
+
+    def deliver() -> None:
+        while processor.scanned == 0:
+            time.sleep(0.001)
+        listener._on_message(None, None, None, orjson.dumps(message))
+
+    thread = threading.Thread(target=deliver, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_cancel_interrupts_running_task() -> None:
+    listener = ControlListener()
+    processor = TaskProcessor("test", is_cancelled=listener.is_cancelled)
+    thread = deliver_when_running(processor, listener, {"requestId": "r1"})
+
+    result = processor.process_task(task())
+    thread.join()
+
+    assert result is not None
+    assert result.status == "CANCELLED"
+    assert 0 < processor.scanned < COUNT
+
+
+def test_cancel_of_other_request_does_not_interrupt() -> None:
+    listener = ControlListener()
+    listener._on_message(None, None, None, orjson.dumps({"requestId": "other"}))
+    processor = TaskProcessor("test", is_cancelled=listener.is_cancelled)
+
+    result = processor.process_task({**task(), "count": 20_000})
+
+    assert result is not None
+    assert result.status == "DONE"
+
+
+def test_cancel_cache_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.core.config.CANCELLED_REQUESTS_CACHE_SIZE", 2)
+    listener = ControlListener()
+    for request_id in ("a", "b", "c"):
+        listener._on_message(None, None, None, orjson.dumps({"requestId": request_id}))
+
+    assert not listener.is_cancelled("a")
+    assert listener.is_cancelled("b") and listener.is_cancelled("c")
+
+
+def test_split_shrinks_running_task() -> None:
+    published: list[dict] = []
+
+    def publish(message: dict) -> bool:
+        published.append(message)
+        return True
+
+    listener = ControlListener()
+    processor = TaskProcessor("test", publish=publish, take_split=listener.take_split)
+    listener.wants_split = processor.is_running
+    keep = 1_000_000
+    message = {"type": "split", "taskId": "t1", "keep": keep}
+    thread = deliver_when_running(processor, listener, message)
+
+    result = processor.process_task(task())
+    thread.join()
+
+    assert result is not None
+    assert result.status == "DONE"
+    assert processor.scanned == keep
+    splits = [message for message in published if message.get("type") == "split"]
+    assert splits == [{"type": "split", "taskId": "t1", "requestId": "r1", "keep": keep}]
+
+
+def test_split_of_task_not_running_is_dropped() -> None:
+    processor = TaskProcessor("test")
+    listener = ControlListener(wants_split=processor.is_running)
+    message = {"type": "split", "taskId": "t1", "keep": 10}
+    listener._on_message(None, None, None, orjson.dumps(message))
+
+    assert listener.split_requests == {}
@@ -0,0 +1,152 @@
+import pytest
+
+from src.core import StringGenerator
+from src.core.config import ALPHABET
+
+
+def total_combinations(alphabet_size: int, max_length: int) -> int:
+    return sum(alphabet_size**length for length in range(1, max_length + 1))
+
+
+def expected(generator: StringGenerator, start: int, count: int, max_length: int) -> list[bytes]:
+    return [
+        generator.index_to_string(index, max_length).encode()
+        for index in range(start, start + count)
+    ]
+
+
+def expand(blocks: list[tuple[bytes, int, int]], generator: StringGenerator) -> list[bytes]:
+    return [prefix + generator.suffixes[i] for prefix, lo, hi in blocks for i in range(lo, hi)]
+
+
+@pytest.fixture
+def small() -> StringGenerator:
+    return StringGenerator("abc")
+
+
+@pytest.fixture
+def full() -> StringGenerator:
+    return StringGenerator(ALPHABET)
+
+
+def test_index_to_string_boundaries(full: StringGenerator) -> None:
+    size = len(ALPHABET)
+    assert full.index_to_string(0, 3) == "a"
+    assert full.index_to_string(size - 1, 3) == "9"
+    assert full.index_to_string(size, 3) == "aa"
+    assert full.index_to_string(size + size**2 - 1, 3) == "99"
+    assert full.index_to_string(total_combinations(size, 3) - 1, 3) == "999"
+    with pytest.raises(ValueError):
+        full.index_to_string(total_combinations(size, 3), 3)
+
+
+@pytest.mark.parametrize("max_length", [1, 2, 4])
+def test_iter_range_covers_whole_keyspace(small: StringGenerator, max_length: int) -> None:
+    total = total_combinations(3, max_length)
+    assert list(small.iter_range(0, total, max_length)) == expected(small, 0, total, max_length)
+
+
+@pytest.mark.parametrize("max_length", [1, 2, 4])
+def test_iter_blocks_covers_whole_keyspace(small: StringGenerator, max_length: int) -> None:
+    total = total_combinations(3, max_length)
+    blocks = list(small.iter_blocks(0, total, max_length))
+    assert expand(blocks, small) == expected(small, 0, total, max_length)
+
+
+def test_partial_ranges_match_index_to_string(small: StringGenerator) -> None:
+    total = total_combinations(3, 4)
+    for start in range(total):
+        for count in (1, 2, 3, 4, 7, total - start):
+            count = min(count, total - start)
+            want = expected(small, start, count, 4)
+            assert list(small.iter_range(start, count, 4)) == want
+            assert expand(list(small.iter_blocks(start, count, 4)), small) == want
+
+
+def test_blocks_share_every_character_but_the_last(small: StringGenerator) -> None:
+    for _prefix, lo, hi in small.iter_blocks(1, 30, 4):
+        assert 0 <= lo < hi <= 3
+    # A range starting mid-block yields a short first block.
+    assert list(small.iter_blocks(4, 4, 2)) == [(b"a", 1, 3), (b"b", 0, 2)]
+
+
+@pytest.mark.parametrize("boundary", [1, 2, 3])
+def test_ranges_across_length_boundaries(full: StringGenerator, boundary: int) -> None:
+    # The last strings of one length followed by the first of the next.
+    first_of_next = total_combinations(len(ALPHABET), boundary)
+    start = first_of_next - 20
+    want = expected(full, start, 40, boundary + 1)
+    assert list(full.iter_range(start, 40, boundary + 1)) == want
+    assert expand(list(full.iter_blocks(start, 40, boundary + 1)), full) == want
+
+
+@pytest.mark.parametrize("count", [0, -1])
+def test_empty_ranges(full: StringGenerator, count: int) -> None:
+    assert list(full.iter_range(5, count, 3)) == []
+    assert list(full.iter_blocks(5, count, 3)) == []
+
+
+def test_last_candidate_of_keyspace(small: StringGenerator) -> None:
+    last = total_combinations(3, 3) - 1
+    assert list(small.iter_range(last, 1, 3)) == [b"ccc"]
+    assert list(small.iter_blocks(last, 1, 3)) == [(b"cc", 2, 3)]
+
+
+def test_ranges_past_the_keyspace_raise(small: StringGenerator) -> None:
+    total = total_combinations(3, 3)
+    with pytest.raises(ValueError):
+        list(small.iter_range(total - 2, 3, 3))
+    with pytest.raises(ValueError):
+        list(small.iter_blocks(total - 2, 3, 3))
+    with pytest.raises(ValueError):
+        list(small.iter_range(total, 1, 3))
+
+
+def prefix_partitions(alphabet_size: int, max_length: int, task_size: int) -> list[dict]:
+    """Lay out tasks the way the manager's create_length_partitions does."""
+    partitions = []
+    length_start = 0
+    for length in range(1, max_length + 1):
+        suffix_length = 1
+        while suffix_length < length and alphabet_size**suffix_length < task_size:
+            suffix_length += 1
+        block_size = alphabet_size**suffix_length
+        for prefix_index in range(alphabet_size ** (length - suffix_length)):
+            for suffix_start in range(0, block_size, task_size):
+                partitions.append(
+                    {
+                        "start": length_start + prefix_index * block_size + suffix_start,
+                        "count": min(task_size, block_size - suffix_start),
+                        "length": length,
+                        "prefix_index": prefix_index,
+                        "prefix_length": length - suffix_length,
+                        "suffix_start": suffix_start,
+                    }
+                )
+        length_start += alphabet_size**length
+    return partitions
+
+
+@pytest.mark.parametrize("task_size", [1, 2, 4, 5, 9, 30])
+def test_prefix_blocks_cover_keyspace_across_lengths(
+    small: StringGenerator, task_size: int
+) -> None:
+    max_length = 4
+    candidates: list[bytes] = []
+    for partition in prefix_partitions(3, max_length, task_size):
+        prefix_length = partition["prefix_length"]
+        prefix = (
+            small.index_to_string(
+                total_combinations(3, prefix_length - 1) + partition["prefix_index"], prefix_length
+            )
+            if prefix_length
+            else ""
+        )
+        blocks = small.iter_prefix_blocks(
+            prefix, partition["length"], partition["suffix_start"], partition["count"]
+        )
+        got = expand(list(blocks), small)
+        assert got == expected(small, partition["start"], partition["count"], max_length)
+        candidates.extend(got)
+    total = total_combinations(3, max_length)
+    assert candidates == expected(small, 0, total, max_length)
@@ -0,0 +1,86 @@
+import hashlib
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.core import MD5Hasher, NumpyMD5Hasher  # noqa: E402
+from src.core.config import ALPHABET  # noqa: E402
+
+SUFFIXES = [bytes((char,)) for char in ALPHABET.encode()]
+
+
+@pytest.fixture(scope="module")
+def hasher() -> NumpyMD5Hasher:
+    return NumpyMD5Hasher(batch_size=4096)
+
+
+def random_block(rng: random.Random, prefix_length: int) -> tuple[bytes, int, int]:
+    prefix = bytes(rng.choice(ALPHABET.encode()) for _ in range(prefix_length))
+    lo = rng.randrange(len(SUFFIXES))
+    return prefix, lo, rng.randrange(lo + 1, len(SUFFIXES) + 1)
+
+
+def candidates(blocks: list[tuple[bytes, int, int]]) -> list[bytes]:
+    return [prefix + SUFFIXES[i] for prefix, lo, hi in blocks for i in range(lo, hi)]
+
+
+def hashlib_matches(blocks: list[tuple[bytes, int, int]], targets: set[bytes]) -> list[bytes]:
+    return [c for c in candidates(blocks) if hashlib.md5(c).digest() in targets]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_blocks_match_hashlib(hasher: NumpyMD5Hasher, seed: int) -> None:
+    rng = random.Random(seed)
+    blocks = [random_block(rng, rng.randrange(0, 12)) for _ in range(200)]
+    everything = candidates(blocks)
+    targets = {hashlib.md5(c).digest() for c in rng.sample(everything, 25)}
+    targets |= {hashlib.md5(b"not-a-candidate-%d" % i).digest() for i in range(5)}
+
+    found = hasher.find_block_matches(blocks, SUFFIXES, targets)
+    assert sorted(found) == sorted(hashlib_matches(blocks, targets))
+    assert sorted(found) == sorted(MD5Hasher().find_block_matches(blocks, SUFFIXES, targets))
+
+
+# Candidates of 1 and 55 bytes are the shortest and longest that fit one padded
+# message block; from 56 bytes on the hasher falls back to hashlib.
+@pytest.mark.parametrize("length", [1, 2, 54, 55, 56, 57, 64])
+def test_edge_lengths(hasher: NumpyMD5Hasher, length: int) -> None:
+    rng = random.Random(length)
+    blocks = [random_block(rng, length - 1) for _ in range(20)]
+    everything = candidates(blocks)
+    targets = {hashlib.md5(c).digest() for c in everything[::3]}
+
+    found = hasher.find_block_matches(blocks, SUFFIXES, targets)
+    assert sorted(found) == sorted(hashlib_matches(blocks, targets))
+
+
+def test_mixed_lengths_in_one_batch(hasher: NumpyMD5Hasher) -> None:
+    rng = random.Random(42)
+    blocks = [random_block(rng, length) for length in (0, 3, 54, 55, 7, 0, 60, 3)]
+    targets = {hashlib.md5(c).digest() for c in candidates(blocks)}
+
+    found = hasher.find_block_matches(blocks, SUFFIXES, targets)
+    assert sorted(found) == sorted(candidates(blocks))
+
+
+def test_single_candidate_blocks(hasher: NumpyMD5Hasher) -> None:
+    blocks = [(b"abc", 0, 1), (b"abc", len(SUFFIXES) - 1, len(SUFFIXES)), (b"", 5, 6)]
+    targets = {hashlib.md5(c).digest() for c in candidates(blocks)}
+    assert sorted(hasher.find_block_matches(blocks, SUFFIXES, targets)) == sorted(
+        candidates(blocks)
+    )
+
+
+def test_no_blocks_or_no_targets(hasher: NumpyMD5Hasher) -> None:
+    target = {hashlib.md5(b"a").digest()}
+    assert hasher.find_block_matches([], SUFFIXES, target) == []
+    assert hasher.find_block_matches([(b"", 0, len(SUFFIXES))], SUFFIXES, set()) == []
+
+
+def test_find_suffix_matches_returns_indices(hasher: NumpyMD5Hasher) -> None:
+    targets = {hashlib.md5(b"pass" + s).digest() for s in (b"b", b"7")}
+    assert sorted(hasher.find_suffix_matches(b"pass", SUFFIXES, targets)) == sorted(
+        MD5Hasher().find_suffix_matches(b"pass", SUFFIXES, targets)
+    )